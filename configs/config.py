@@ -5,3 +5,188 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Tutor session persistence
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "file")
+SESSION_STORE_DIR = os.getenv("SESSION_STORE_DIR", "temp_db/sessions")
+SESSION_LEGACY_FILE = os.getenv(
+    "SESSION_LEGACY_FILE", "temp_db/conversation_db_v3.json"
+)
+SESSION_SHARD_DEPTH = int(os.getenv("SESSION_SHARD_DEPTH", "2"))
+SESSION_COMPACT_AFTER = int(os.getenv("SESSION_COMPACT_AFTER", "50"))
+SESSION_CAS_MAX_RETRIES = int(os.getenv("SESSION_CAS_MAX_RETRIES", "3"))
+
+# In-process LRU of hot tutor sessions with write-behind flushing. The cache
+# is authoritative for the sessions it holds: only enable it when a single
+# worker serves a session (or with session partitioning across nodes). It is
+# ignored for the mongo backend unless session partitioning is configured.
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "false").lower() == "true"
+SESSION_CACHE_MAX_SESSIONS = int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "1000"))
+SESSION_CACHE_MAX_MEMORY_MB = int(os.getenv("SESSION_CACHE_MAX_MEMORY_MB", "64"))
+SESSION_CACHE_FLUSH_INTERVAL = float(os.getenv("SESSION_CACHE_FLUSH_INTERVAL", "2.0"))
+SESSION_CACHE_FLUSH_BATCH_SIZE = int(os.getenv("SESSION_CACHE_FLUSH_BATCH_SIZE", "100"))
+
+# Expiry and archival of idle tutor sessions
+QUESTION_BANK_DIR = os.getenv("QUESTION_BANK_DIR", "./question_bank")
+SESSION_JANITOR_ENABLED = os.getenv("SESSION_JANITOR_ENABLED", "true").lower() == "true"
+SESSION_ARCHIVE_DIR = os.getenv("SESSION_ARCHIVE_DIR", "temp_db/archive")
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "72"))
+SESSION_JANITOR_INTERVAL_MINUTES = float(
+    os.getenv("SESSION_JANITOR_INTERVAL_MINUTES", "60")
+)
+
+# Session partitioning across nodes (disabled unless SESSION_CLUSTER_NODES is set)
+SESSION_CLUSTER_NODES = [
+    node.strip() for node in os.getenv("SESSION_CLUSTER_NODES", "").split(",") if node.strip()
+]
+SESSION_NODE_URL = os.getenv("SESSION_NODE_URL", "")
+SESSION_CLUSTER_ROUTING = os.getenv("SESSION_CLUSTER_ROUTING", "forward")  # or "redirect"
+SESSION_CLUSTER_VIRTUAL_NODES = int(os.getenv("SESSION_CLUSTER_VIRTUAL_NODES", "100"))
+SESSION_CLUSTER_PROBE_INTERVAL = float(os.getenv("SESSION_CLUSTER_PROBE_INTERVAL", "5"))
+
+# Shared HTTP connection pools for LLM provider clients
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+
+# Cached Gemini model objects and live chat sessions for /v2/chat
+GEMINI_MODEL_CACHE_SIZE = int(os.getenv("GEMINI_MODEL_CACHE_SIZE", "16"))
+GEMINI_CHAT_CACHE_SIZE = int(os.getenv("GEMINI_CHAT_CACHE_SIZE", "1000"))
+
+# LLM response cache used by APIUtils. TTLs are in seconds, per prompt type,
+# e.g. "followup=86400,check_answer=86400"; a TTL of 0 disables caching.
+# The disk tier is swept down to LLM_CACHE_DISK_MAX_MB, oldest entries first.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "temp_db/llm_cache")
+LLM_CACHE_DISK_MAX_MB = int(os.getenv("LLM_CACHE_DISK_MAX_MB", "512"))
+LLM_CACHE_DEFAULT_TTL = float(os.getenv("LLM_CACHE_DEFAULT_TTL", "3600"))
+LLM_CACHE_TTLS = {
+    prompt_type.strip(): float(ttl)
+    for prompt_type, ttl in (
+        item.split("=", 1)
+        for item in os.getenv(
+            "LLM_CACHE_TTLS",
+            "followup=86400,tutor_question=604800,check_answer=86400,tutor_guidance=86400,"
+            "evaluate_answer=86400,check_answer_escalated=86400,evaluate_answer_escalated=86400",
+        ).split(",")
+        if "=" in item
+    )
+}
+
+# Maximum concurrent LLM calls when rephrasing a Socratic plan
+TUTOR_PHRASING_CONCURRENCY = int(os.getenv("TUTOR_PHRASING_CONCURRENCY", "5"))
+
+# Coalescing of identical in-flight LLM requests. Across workers, the
+# worker holding a lease calls the provider and the others wait for its
+# result in the persistent response cache tier.
+LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "true").lower() == "true"
+LLM_COALESCE_ACROSS_WORKERS = (
+    os.getenv("LLM_COALESCE_ACROSS_WORKERS", "false").lower() == "true"
+)
+LLM_COALESCE_LEASE_SECONDS = float(os.getenv("LLM_COALESCE_LEASE_SECONDS", "60"))
+LLM_COALESCE_POLL_INTERVAL = float(os.getenv("LLM_COALESCE_POLL_INTERVAL", "0.1"))
+
+# Token-bucket scheduling of provider calls using the rate limits in
+# ModelRegistry; interactive turns are admitted ahead of background work
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+
+# Hedging and circuit breaking across equivalent models in ModelRegistry.
+# A call is hedged to the next equivalent once it passes the primary
+# model's p95 latency (capped by its latency budget).
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RECOVERY_SECONDS = float(os.getenv("LLM_BREAKER_RECOVERY_SECONDS", "30"))
+
+# OpenRouter provider used by the lightweight tutor pipeline stages
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_APP_NAME = os.getenv("OPENROUTER_APP_NAME", "LAAI Tutor")
+
+# Per-task model routing over ModelRegistry.TASK_MODELS. The objective is
+# "quality" (first candidate within the latency target), "latency" or
+# "cost", with per-task overrides, e.g. "check_answer=latency,followup=cost"
+LLM_ROUTER_ENABLED = os.getenv("LLM_ROUTER_ENABLED", "true").lower() == "true"
+LLM_ROUTER_OBJECTIVE = os.getenv("LLM_ROUTER_OBJECTIVE", "quality")
+LLM_ROUTER_OBJECTIVES = {
+    task.strip(): objective.strip()
+    for task, objective in (
+        item.split("=", 1)
+        for item in os.getenv("LLM_ROUTER_OBJECTIVES", "").split(",")
+        if "=" in item
+    )
+}
+LLM_ROUTER_LATENCY_TARGET = float(os.getenv("LLM_ROUTER_LATENCY_TARGET", "8"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+# Seconds between trial calls to a model excluded for its error rate
+LLM_ROUTER_PROBE_INTERVAL = float(os.getenv("LLM_ROUTER_PROBE_INTERVAL", "30"))
+
+# Prompt token budgets. Counts use tiktoken when installed and a
+# 4-characters-per-token estimate otherwise. Set TOKEN_USAGE_LOG to a path
+# to append one JSON line per request with its token counts.
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+TOKEN_USAGE_LOG = os.getenv("TOKEN_USAGE_LOG", "")
+CAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("CAG_CONTEXT_TOKEN_BUDGET", "30000"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "16000"))
+
+# Fake provider for load testing. With LLM_PROVIDER_OVERRIDE=fake every
+# provider call is answered by the fake provider in LLM_FAKE_MODE:
+# "synthetic", "replay" (from LLM_FAKE_CASSETTE) or "record" (real calls,
+# captured into LLM_FAKE_CASSETTE). Except when recording, fake calls skip
+# the rate-limit scheduler.
+LLM_PROVIDER_OVERRIDE = os.getenv("LLM_PROVIDER_OVERRIDE", "")
+LLM_FAKE_MODE = os.getenv("LLM_FAKE_MODE", "synthetic")
+LLM_FAKE_CASSETTE = os.getenv("LLM_FAKE_CASSETTE", "")
+LLM_FAKE_LATENCY_MEDIAN_MS = float(os.getenv("LLM_FAKE_LATENCY_MEDIAN_MS", "300"))
+LLM_FAKE_LATENCY_SIGMA = float(os.getenv("LLM_FAKE_LATENCY_SIGMA", "0.5"))
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "0"))
+
+# Background precomputation of the next Socratic turn: phrasing of the next
+# question and guidance for predictable wrong answers, e.g. "I don't know"
+TUTOR_SPECULATION_ENABLED = os.getenv("TUTOR_SPECULATION_ENABLED", "true").lower() == "true"
+TUTOR_SPECULATION_MAX_SESSIONS = int(os.getenv("TUTOR_SPECULATION_MAX_SESSIONS", "1000"))
+TUTOR_SPECULATIVE_WRONG_ANSWERS = os.getenv(
+    "TUTOR_SPECULATIVE_WRONG_ANSWERS", "I don't know"
+).split("|")
+
+# Local grading of numeric, algebraic and exactly matching answers before
+# falling back to the LLM answer checker
+LOCAL_ANSWER_CHECK_ENABLED = os.getenv("LOCAL_ANSWER_CHECK_ENABLED", "true").lower() == "true"
+LOCAL_ANSWER_REL_TOLERANCE = float(os.getenv("LOCAL_ANSWER_REL_TOLERANCE", "1e-6"))
+
+# JSON mode (`response_format`) for completions parsed into schemas, such as
+# follow-up plans and answer checks
+LLM_STRUCTURED_OUTPUT_ENABLED = os.getenv("LLM_STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+
+# Scenario system instructions, reloaded when the file changes (checked at
+# most every PROMPT_RELOAD_INTERVAL seconds)
+PROMPT_INSTRUCTIONS_PATH = os.getenv("PROMPT_INSTRUCTIONS_PATH", "core/prompt/instruction.json")
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "2"))
+
+# Streaming follow-up plan generation: the first question is sent as soon as
+# it is generated and the rest of the plan is filled in the background
+TUTOR_PLAN_STREAMING_ENABLED = os.getenv("TUTOR_PLAN_STREAMING_ENABLED", "true").lower() == "true"
+TUTOR_PLAN_MAX_SESSIONS = int(os.getenv("TUTOR_PLAN_MAX_SESSIONS", "1000"))
+TUTOR_PLAN_WAIT_SECONDS = float(os.getenv("TUTOR_PLAN_WAIT_SECONDS", "60"))
+
+# Check answers the local checker cannot grade and generate guidance for
+# incorrect ones in a single LLM call
+TUTOR_COMBINED_EVALUATION_ENABLED = os.getenv("TUTOR_COMBINED_EVALUATION_ENABLED", "true").lower() == "true"
+
+# Tiered answer grading: verdicts of the fast grading models below the
+# confidence threshold for that verdict, e.g. "correct=0.8,incorrect=0.7", are
+# re-graded by the larger models. Set GRADING_LOG to a path to append one
+# JSON line per escalation.
+GRADING_ESCALATION_ENABLED = os.getenv("GRADING_ESCALATION_ENABLED", "true").lower() == "true"
+GRADING_CONFIDENCE_THRESHOLDS = {
+    verdict.strip(): float(threshold)
+    for verdict, threshold in (
+        item.split("=", 1)
+        for item in os.getenv("GRADING_CONFIDENCE_THRESHOLDS", "correct=0.8,incorrect=0.7").split(",")
+        if "=" in item
+    )
+}
+GRADING_LOG = os.getenv("GRADING_LOG", "")
@@ -1,9 +1,12 @@
+import asyncio
 import time
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
 from utils.pdf_utils import save_uploaded_file
 from services.document_service import process_pdf
-from services.gemini_service import ask_question_to_gemini
+from configs.config import CAG_CONTEXT_TOKEN_BUDGET
+from core.utils.token_budget import fit_chunks, get_token_usage, index_chunks, prompt_limit
+from services.gemini_service import CAG_MODEL, ask_question_to_gemini
 from models.document import DocumentStatus, QuestionRequest, QuestionResponse
 
 router = APIRouter()
@@ -16,6 +19,8 @@ session_state = {
     "end_time": None,
     "document_names": [],
     "total_chunk_count": 0,
+    # Chunks of each document with their token counts and search terms
+    "chunk_index": {},
 }
 
 
@@ -31,6 +36,9 @@ async def upload_pdfs(files: list[UploadFile] = File(...)):
         file_path = save_uploaded_file(file)
         context, chunk_count = process_pdf(file_path)
         session_state["contexts"][file.filename] = context
+        session_state["chunk_index"][file.filename] = await asyncio.to_thread(
+            index_chunks, context
+        )
         session_state["document_names"].append(file.filename)
         total_chunk_count += chunk_count
 
@@ -71,10 +79,16 @@ async def ask_question(request: QuestionRequest):
     if not session_state["processComplete"]:
         raise HTTPException(status_code=400, detail="No documents processed yet.")
 
-    combined_context = "\n".join(
-        chunk for context in session_state["contexts"].values() for chunk in context
-    )
-    response = ask_question_to_gemini(
+    chunks = [
+        chunk for index in session_state["chunk_index"].values() for chunk in index
+    ]
+    # Only send the chunks most relevant to the question that fit the budget
+    budget = min(CAG_CONTEXT_TOKEN_BUDGET, prompt_limit(CAG_MODEL) or CAG_CONTEXT_TOKEN_BUDGET)
+    selected, context_tokens, total_tokens = fit_chunks(chunks, request.question, budget)
+    get_token_usage().record("cag", CAG_MODEL, context_tokens, total_tokens)
+
+    combined_context = "\n".join(selected)
+    response = await ask_question_to_gemini(
         combined_context, request.question, request.language
     )
 
@@ -83,4 +97,4 @@ async def ask_question(request: QuestionRequest):
 
 @router.get("/session-state")
 async def get_session_state():
-    return session_state
+    return {key: value for key, value in session_state.items() if key != "chunk_index"}
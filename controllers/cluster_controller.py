@@ -0,0 +1,42 @@
+import logging
+
+from fastapi import APIRouter, HTTPException, Request, status
+from core.session.session_cluster import NODE_HEADER
+from core.session.store_factory import get_session_cluster
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/ping", status_code=status.HTTP_200_OK)
+async def ping(request: Request):
+    """
+    Liveness probe used by peer nodes to maintain the session ring. A
+    probing node that is not a member yet is admitted (after its sessions
+    are handed over) before the members are returned.
+    """
+    cluster = get_session_cluster()
+    if cluster is None:
+        return {"node": None, "members": []}
+    peer = request.headers.get(NODE_HEADER)
+    if peer:
+        try:
+            await cluster.admit(peer)
+        except Exception as e:
+            logger.error(f"Failed to admit {peer} to the session ring: {e}")
+    return {"node": cluster.node_url, "members": cluster.members()}
+
+
+@router.get("/owner/{session_id}")
+async def get_session_owner(session_id: str):
+    """
+    Report which node currently owns a session.
+    """
+    cluster = get_session_cluster()
+    if cluster is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session partitioning is not enabled on this node.",
+        )
+    return {"session_id": session_id, "owner": cluster.owner(session_id)}
@@ -9,4 +9,21 @@ async def check_database_health():
     Check if the MongoDB database connection is healthy.
     Returns 200 OK with different status messages depending on the connection state.
     """
-    return await HealthService.check_database_health() 
\ No newline at end of file
+    return await HealthService.check_database_health()
+
+
+@router.get("/sessions", status_code=status.HTTP_200_OK)
+async def get_session_metrics():
+    """
+    Report session cache statistics and expiry metrics such as reclaimed
+    sessions and bytes.
+    """
+    return await HealthService.get_session_metrics()
+
+
+@router.get("/llm", status_code=status.HTTP_200_OK)
+async def get_llm_metrics():
+    """
+    Report LLM call path metrics such as response cache hits and misses.
+    """
+    return await HealthService.get_llm_metrics()
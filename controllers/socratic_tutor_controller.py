@@ -1,17 +1,136 @@
 from typing import Optional
-from core.logic.conversation_flowv2 import main_chat_flowv2
-from fastapi import APIRouter, UploadFile, Form
+from core.logic.conversation_flowv2 import main_chat_flowv2, stream_chat_flowv2
+from core.session.session_cluster import FORWARDED_HEADER
+from core.session.store_factory import get_session_cluster, get_session_store
+from fastapi import APIRouter, Request, UploadFile, Form
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from schemas.socratic_tutor_schemas import QuestionResponse
 
 router = APIRouter()
 
-SESSION_FILE = "temp_db/conversation_db_v3.json"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Not relayed from a forwarded response: they describe the connection to the
+# owner, and httpx has already decoded the body
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+}
+
+
+def relayed_headers(response) -> dict:
+    return {
+        name: value
+        for name, value in response.headers.items()
+        if name.lower() not in HOP_BY_HOP_HEADERS
+    }
+
+
+async def route_to_owner(
+    request: Request,
+    session_id: Optional[str],
+    data: dict,
+    image: Optional[UploadFile],
+    stream: bool = False,
+):
+    """
+    When sessions are partitioned across nodes, send requests for sessions
+    owned by another node to that node. Returns None if the request should
+    be handled locally.
+    """
+    cluster = get_session_cluster()
+    if cluster is None:
+        return None
+    if not cluster.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "This node is joining the session cluster."},
+            headers={"Retry-After": "5"},
+        )
+    if not session_id or request.headers.get(FORWARDED_HEADER):
+        return None
+
+    owner = cluster.owner(session_id)
+    if owner == cluster.node_url:
+        return None
+
+    if cluster.routing == "redirect":
+        return RedirectResponse(url=f"{owner}{request.url.path}", status_code=307)
+
+    files = None
+    if image:
+        files = {"image": (image.filename, await image.read(), image.content_type)}
+    # Relay the owner's response as is, including error statuses and
+    # non-JSON error bodies
+    if stream:
+        response = await cluster.forward_stream(owner, request.url.path, data, files)
+
+        async def relay():
+            try:
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return StreamingResponse(
+            relay(),
+            status_code=response.status_code,
+            headers=relayed_headers(response),
+        )
+    response = await cluster.forward(owner, request.url.path, data, files)
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=relayed_headers(response),
+    )
 
 
 @router.post("/v2/chat", response_model=QuestionResponse)
 async def chat_flow(
+    request: Request,
     user_request: str = Form(...),
     session_id: Optional[str] = Form(None),
     image: Optional[UploadFile] = None,
 ):
-    return main_chat_flowv2(user_request, SESSION_FILE, session_id, image)
+    routed = await route_to_owner(
+        request,
+        session_id,
+        {"user_request": user_request, "session_id": session_id},
+        image,
+    )
+    if routed is not None:
+        return routed
+
+    return await main_chat_flowv2(user_request, get_session_store(), session_id, image)
+
+
+@router.post("/v2/chat/stream")
+async def chat_flow_stream(
+    request: Request,
+    user_request: str = Form(...),
+    session_id: Optional[str] = Form(None),
+    image: Optional[UploadFile] = None,
+):
+    """
+    Same as /v2/chat, but streams the tutor's reply as server-sent events:
+    `token` events while the model generates, then a `done` event with the
+    session_id and response metadata.
+    """
+    routed = await route_to_owner(
+        request,
+        session_id,
+        {"user_request": user_request, "session_id": session_id},
+        image,
+        stream=True,
+    )
+    if routed is not None:
+        return routed
+
+    return StreamingResponse(
+        stream_chat_flowv2(user_request, get_session_store(), session_id, image),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
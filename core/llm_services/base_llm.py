@@ -0,0 +1,36 @@
+from typing import AsyncIterator, Dict, List
+
+from .llm_response import LLMResponse
+
+
+class BaseLLM:
+    """
+    Interface implemented by every LLM provider.
+
+    Completions are awaitable so that a single worker can keep many provider
+    calls in flight without blocking the event loop.
+    """
+
+    provider: str = None
+
+    async def generate_completion(
+        self,
+        messages: List[Dict],
+        tool_choice: str = "auto",
+        response_format: Dict = None,
+    ) -> LLMResponse:
+        raise NotImplementedError
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion's text as it is generated. Providers without
+        streaming support yield the whole completion at once.
+        """
+        response = await self.generate_completion(
+            messages, response_format=response_format
+        )
+        yield response.text
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from configs.config import (
+    LLM_FAKE_CASSETTE,
+    LLM_FAKE_ERROR_RATE,
+    LLM_FAKE_LATENCY_MEDIAN_MS,
+    LLM_FAKE_LATENCY_SIGMA,
+    LLM_FAKE_MODE,
+    LLM_FAKE_SEED,
+)
+from core.utils.lru_cache import LRUCache
+from core.utils.response_cache import ResponseCache
+from core.utils.token_budget import count_message_tokens, count_tokens
+
+from .base_llm import BaseLLM
+from .llm_response import LLMMessage, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNTHETIC = "synthetic"
+MODE_REPLAY = "replay"
+MODE_RECORD = "record"
+
+# Share of the simulated latency spent before the first streamed chunk
+FIRST_CHUNK_SHARE = 0.2
+STREAM_CHUNK_CHARS = 16
+# Prompts whose call counts are kept for reproducible outcomes
+CALL_COUNTS_MAX_PROMPTS = 10000
+
+
+class FakeLLMError(Exception):
+    """
+    Simulated provider failure.
+    """
+
+
+class Cassette:
+    """
+    Recorded responses in a JSON lines file, keyed by the normalized
+    messages of the request.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    @staticmethod
+    def make_key(messages: List[Dict]) -> str:
+        # The model is left out so replays survive changes in model routing
+        return ResponseCache.make_key("cassette", None, messages)
+
+    def get(self, messages: List[Dict]) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(self.make_key(messages))
+        return entry["response"] if entry else None
+
+    def record(self, messages: List[Dict], response: LLMResponse):
+        entry = {
+            "key": self.make_key(messages),
+            "messages": messages,
+            "response": response.to_dict(),
+        }
+        self.entries[entry["key"]] = entry
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+_cassettes: Dict[str, Cassette] = {}
+
+
+def get_cassette(path: str) -> Cassette:
+    if path not in _cassettes:
+        _cassettes[path] = Cassette(path)
+    return _cassettes[path]
+
+
+GUIDANCE = "Good try! Look at the question again and think about each step."
+
+
+def _quoted(pattern: str, text: str) -> str:
+    match = re.search(pattern, text, re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _normalize(answer: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", answer.lower()).split())
+
+
+def synthesize(prompt: str, json_mode: bool = False) -> str:
+    """
+    Build a synthetic completion in the shape the tutor pipeline expects
+    for the prompt (follow-up plan, answer check with optional guidance, or
+    free text).
+    """
+    if "questions_and_answers" in prompt:
+        question = _quoted(r"student question: '(.*?)'\.", prompt) or "the problem"
+        max_questions = int(_quoted(r"maximum of (\d+)", prompt) or 3)
+        return json.dumps(
+            {
+                "questions_and_answers": [
+                    {
+                        "question": f"Step {i} towards '{question}': what comes next?",
+                        "answer": f"step {i}",
+                    }
+                    for i in range(1, min(max_questions, 3) + 1)
+                ]
+            }
+        )
+    if '"result"' in prompt:
+        expected = _quoted(r'expected answer is: "(.*?)"', prompt)
+        answer = _quoted(r'user\'s answer is: "(.*?)"', prompt)
+        correct = _normalize(expected) == _normalize(answer)
+        result = {"result": "correct" if correct else "incorrect"}
+        if '"confidence"' in prompt:
+            # Mismatches are unsure, so load tests exercise grading escalation
+            result["confidence"] = 0.95 if correct else 0.6
+        if '"guidance"' in prompt:
+            result["guidance"] = None if correct else GUIDANCE
+        return json.dumps(result)
+    if json_mode:
+        return "{}"
+
+    question = _quoted(r'The question is: "(.*?)"', prompt)
+    if question:
+        return question
+    if "correct answer is" in prompt:
+        return GUIDANCE
+    return f"Let's think about this together: {prompt.strip()[:80]}"
+
+
+class FakeContentResponse:
+    """
+    Stand-in for a Gemini content response; iterates word by word when
+    streamed.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def __aiter__(self):
+        for i, word in enumerate(self.text.split(" ")):
+            yield FakeContentResponse(word if i == 0 else f" {word}")
+
+
+class FakeChatSession:
+    def __init__(self, history: List[Dict]):
+        self.history = list(history)
+
+
+class FakeLLM(BaseLLM):
+    """
+    Provider for load testing without real provider calls.
+
+    - synthetic: answers with synthetic completions matching the JSON
+      shapes the pipeline parses
+    - replay: answers from a cassette of recorded responses, falling back
+      to synthetic ones for requests that were not recorded
+    - record: calls the real provider `delegate` and appends its responses
+      to the cassette
+
+    Latency follows a log-normal distribution around `latency_median_ms`,
+    and `error_rate` of the calls fail with `FakeLLMError`. With a fixed
+    seed the sequence of latencies and failures is reproducible.
+    """
+
+    provider = "fake"
+
+    # Calls made so far per prompt, so repeated prompts draw new outcomes.
+    # Bounded, as load tests send many distinct prompts; a prompt evicted
+    # from it starts its sequence over.
+    _call_counts = LRUCache(max_size=CALL_COUNTS_MAX_PROMPTS)
+
+    def __init__(
+        self,
+        model: str = "fake",
+        mode: str = MODE_SYNTHETIC,
+        delegate: Optional[BaseLLM] = None,
+        cassette_path: Optional[str] = None,
+        latency_median_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.model_name = model
+        self.mode = mode
+        self.delegate = delegate
+        self.cassette = get_cassette(cassette_path) if cassette_path else None
+        self.latency_median = latency_median_ms / 1000
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.seed = seed
+        if mode == MODE_RECORD and (delegate is None or self.cassette is None):
+            raise ValueError("Record mode needs a real provider and a cassette path.")
+
+    def _rng(self, key: str) -> random.Random:
+        # One stream per prompt, advanced on every call with that prompt
+        count = FakeLLM._call_counts.get(key, 0)
+        FakeLLM._call_counts.put(key, count + 1)
+        return random.Random(f"{self.seed}:{key}:{count}")
+
+    def _draw(self, key: str):
+        rng = self._rng(key)
+        delay = self.latency_median * math.exp(rng.gauss(0, self.latency_sigma))
+        return delay, rng.random() < self.error_rate
+
+    def _fail(self):
+        raise FakeLLMError(f"Simulated failure from fake model {self.model_name}")
+
+    async def _simulate(self, key: str):
+        delay, fails = self._draw(key)
+        await asyncio.sleep(delay)
+        if fails:
+            self._fail()
+        return delay
+
+    def _content(self, messages: List[Dict], response_format: Optional[Dict]) -> str:
+        """
+        The replayed or synthetic completion text for `messages`.
+        """
+        if self.mode == MODE_REPLAY and self.cassette is not None:
+            recorded = self.cassette.get(messages)
+            if recorded is not None:
+                return recorded.get("content") or ""
+        json_mode = bool(response_format and response_format.get("type") == "json_object")
+        return synthesize(str(messages[-1].get("content", "")), json_mode)
+
+    async def generate_completion(
+        self,
+        messages: List[Dict],
+        tool_choice: str = "auto",
+        response_format: Dict = None,
+    ) -> LLMResponse:
+        if self.mode == MODE_RECORD:
+            response = await self.delegate.generate_completion(
+                messages, tool_choice=tool_choice, response_format=response_format
+            )
+            if not response.message.tool_calls:
+                self.cassette.record(messages, response)
+            return response
+
+        key = Cassette.make_key(messages)
+        latency = await self._simulate(key)
+
+        recorded = None
+        if self.mode == MODE_REPLAY and self.cassette is not None:
+            recorded = self.cassette.get(messages)
+        if recorded is not None:
+            response = LLMResponse.from_dict(recorded)
+            response.latency = latency
+            return response
+
+        content = self._content(messages, response_format)
+        prompt_tokens = count_message_tokens(messages)
+        completion_tokens = count_tokens(content)
+        return LLMResponse(
+            message=LLMMessage(content),
+            model=self.model_name,
+            provider=self.provider,
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            finish_reason="stop",
+            latency=latency,
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the completion in small chunks, spreading the simulated
+        latency between the first chunk and the rest.
+        """
+        if self.mode == MODE_RECORD:
+            chunks = []
+            async for chunk in self.delegate.stream_completion(
+                messages, response_format=response_format
+            ):
+                chunks.append(chunk)
+                yield chunk
+            self.cassette.record(messages, LLMResponse(LLMMessage("".join(chunks))))
+            return
+
+        delay, fails = self._draw(Cassette.make_key(messages))
+        await asyncio.sleep(delay * FIRST_CHUNK_SHARE)
+        if fails:
+            self._fail()
+        content = self._content(messages, response_format)
+        chunks = [
+            content[i:i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(content), STREAM_CHUNK_CHARS)
+        ]
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(delay * (1 - FIRST_CHUNK_SHARE) / len(chunks))
+            yield chunk
+
+    # Gemini-style interface used by the v2 chat flow
+
+    def start_chat(self, history: List[Dict]):
+        return FakeChatSession(history)
+
+    async def generate_content(self, contents: Any, stream: bool = False, **kwargs):
+        response = await self.generate_completion(
+            [{"role": "user", "content": str(contents)}]
+        )
+        return FakeContentResponse(response.text)
+
+    async def send_message(self, chat, content: Any, stream: bool = False, **kwargs):
+        response = await self.generate_completion(
+            [{"role": "user", "content": str(content)}]
+        )
+        chat.history.append({"role": "user", "parts": content})
+        chat.history.append({"role": "model", "parts": response.text})
+        return FakeContentResponse(response.text)
+
+
+def get_fake_llm(model: str, delegate: Optional[BaseLLM] = None) -> FakeLLM:
+    """
+    Build a fake LLM from the LLM_FAKE_* settings.
+    """
+    return FakeLLM(
+        model=model,
+        mode=LLM_FAKE_MODE,
+        delegate=delegate,
+        cassette_path=LLM_FAKE_CASSETTE or None,
+        latency_median_ms=LLM_FAKE_LATENCY_MEDIAN_MS,
+        latency_sigma=LLM_FAKE_LATENCY_SIGMA,
+        error_rate=LLM_FAKE_ERROR_RATE,
+        seed=LLM_FAKE_SEED,
+    )
@@ -1,29 +1,170 @@
 import os
-from typing import Dict, List, Optional
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from dotenv import load_dotenv
 
+from core.utils.token_budget import count_message_tokens, count_tokens
+
+from .base_llm import BaseLLM
+from .llm_response import LLMMessage, LLMResponse
+from .llm_scheduler import PRIORITY_INTERACTIVE, estimate_tokens, get_llm_scheduler
+from .resilience import CircuitOpenError, get_resilience_manager
+
 load_dotenv()
+genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
 
-class GeminiAPI:
+class GeminiAPI(BaseLLM):
+    """
+    Implementation of the Gemini API on top of its async methods.
+    """
+
+    provider = "gemini"
 
     def __init__(
         self,
         model: str = "learnlm-1.5-pro-experimental",
-        tools: Optional[str] = None,
+        system_instruction: Optional[str] = None,
         safety_settings: Optional[Dict[HarmCategory, HarmBlockThreshold]] = None,
-        #  tool_metadata: List[Dict] = None,
+        tool_metadata: List[Dict] = None,
         use_tools: bool = False,
     ):
+        self.model_name = model
+        self.model = genai.GenerativeModel(
+            model,
+            system_instruction=system_instruction,
+            safety_settings=safety_settings,
+        )
+        # Live chat -> (history entries counted, their token count), so
+        # turns only count the history added since the previous one
+        self._chat_tokens: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _to_contents(messages: List[Dict]):
+        """
+        Convert chat-completion style messages to Gemini contents and a
+        system instruction.
+        """
+        system_parts = []
+        contents = []
+        for message in messages:
+            if message["role"] == "system":
+                system_parts.append(message["content"])
+                continue
+            role = "model" if message["role"] == "assistant" else "user"
+            contents.append({"role": role, "parts": [message["content"]]})
+        return "\n".join(system_parts) or None, contents
+
+    async def _schedule(self, call, estimated_tokens: int, priority: str):
+        """
+        Run a direct model call through the rate-limit scheduler and the
+        provider's circuit breaker. Live chat sessions are tied to Gemini,
+        so these calls are not hedged to other models.
+        """
+        resilience = get_resilience_manager()
+        if not resilience.breaker(self.provider).allow_request():
+            raise CircuitOpenError(f"Circuit open for provider {self.provider}")
+        return await get_llm_scheduler().run(
+            self.provider,
+            self.model_name,
+            lambda: resilience.observe(self.provider, self.model_name, call),
+            estimated_tokens=estimated_tokens,
+            priority=priority,
+        )
+
+    async def generate_content(
+        self, contents: Any, priority: str = PRIORITY_INTERACTIVE, **kwargs
+    ):
+        """
+        Await `generate_content` on the underlying model.
+        """
+        return await self._schedule(
+            lambda: self.model.generate_content_async(contents, **kwargs),
+            estimate_tokens(contents),
+            priority,
+        )
 
-        self.api_key = os.environ["GEMINI_API_KEY"]
-        self.genai = genai.configure(api_key=self.api_key)
+    def start_chat(self, history: List[Dict]):
+        chat = self.model.start_chat(history=history)
+        self._chat_tokens[chat] = (len(history), count_message_tokens(history))
+        return chat
 
-        self.model = self.genai.GenerativeModel(model)
+    def _history_tokens(self, chat) -> int:
+        counted, tokens = self._chat_tokens.get(chat, (0, 0))
+        history = chat.history
+        if counted > len(history):
+            # The history was rewound; count it again
+            counted, tokens = 0, 0
+        tokens += sum(count_tokens(entry) for entry in history[counted:])
+        self._chat_tokens[chat] = (len(history), tokens)
+        return tokens
 
-    def generate_completion():
-        response = model.generate_content("How does AI work?")
-        print(response.text)
+    async def send_message(
+        self, chat, content: Any, priority: str = PRIORITY_INTERACTIVE, **kwargs
+    ):
+        """
+        Await `send_message` on a live chat session.
+        """
+        return await self._schedule(
+            lambda: chat.send_message_async(content, **kwargs),
+            self._history_tokens(chat) + estimate_tokens(content),
+            priority,
+        )
+
+    def _prepare(self, messages: List[Dict], response_format: Optional[Dict]):
+        system_instruction, contents = self._to_contents(messages)
+        model = self.model
+        if system_instruction:
+            model = genai.GenerativeModel(
+                self.model_name, system_instruction=system_instruction
+            )
+
+        generation_config = None
+        if response_format and response_format.get("type") == "json_object":
+            generation_config = {"response_mime_type": "application/json"}
+        return model, contents, generation_config
+
+    async def generate_completion(
+        self,
+        messages: List[Dict],
+        tool_choice: str = "auto",
+        response_format: Dict = None,
+    ) -> LLMResponse:
+        model, contents, generation_config = self._prepare(messages, response_format)
+        response = await model.generate_content_async(
+            contents, generation_config=generation_config
+        )
+        usage = response.usage_metadata
+        return LLMResponse(
+            message=LLMMessage(response.text),
+            model=self.model_name,
+            provider=self.provider,
+            usage={
+                "prompt_tokens": usage.prompt_token_count,
+                "completion_tokens": usage.candidates_token_count,
+                "total_tokens": usage.total_token_count,
+            }
+            if usage
+            else None,
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        model, contents, generation_config = self._prepare(messages, response_format)
+        response = await model.generate_content_async(
+            contents, generation_config=generation_config, stream=True
+        )
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata)
+                continue
+            if text:
+                yield text
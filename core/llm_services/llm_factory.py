@@ -1,13 +1,109 @@
 # from mistral_api import MistralAPI
-from typing import List, Dict
-from .mistral_api import MistralAPI
+import hashlib
+import logging
+import os
+from typing import Any, List, Dict, Tuple
+import httpx
+from configs.config import (
+    LLM_FAKE_MODE,
+    LLM_HTTP_TIMEOUT,
+    LLM_POOL_KEEPALIVE_EXPIRY,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    OPENROUTER_APP_NAME,
+    OPENROUTER_BASE_URL,
+    LLM_PROVIDER_OVERRIDE,
+)
+from models.model_registry import ModelRegistry
+from .base_llm import BaseLLM
+from .llm_scheduler import PRIORITY_INTERACTIVE
+from .resilience import ResilientLLM
+
+logger = logging.getLogger(__name__)
 
 
 class LLMFactory:
     """
     Factory to create instances of different LLM APIs.
+
+    Provider SDK clients are expensive to build (HTTP pools, TLS handshakes),
+    so the factory keeps one long-lived client per provider and credential
+    set for the whole process. LLM instances themselves are cheap wrappers
+    around these shared clients.
     """
 
+    _clients: Dict[Tuple[str, str], Any] = {}
+    _http_clients: List[Any] = []
+
+    @classmethod
+    def _pool_limits(cls) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+        )
+
+    @classmethod
+    def get_http_client(cls, **kwargs) -> httpx.AsyncClient:
+        """
+        Build a pooled keep-alive async HTTP client that is closed on shutdown.
+        """
+        client = httpx.AsyncClient(
+            limits=cls._pool_limits(), timeout=LLM_HTTP_TIMEOUT, **kwargs
+        )
+        cls._http_clients.append(client)
+        return client
+
+    @classmethod
+    def get_client(cls, provider: str, api_key: str) -> Any:
+        """
+        Return the shared SDK client for a provider and API key, creating it
+        on first use.
+        """
+        key = (provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+        if key in cls._clients:
+            return cls._clients[key]
+
+        if provider == "mistral":
+            from mistralai import Mistral
+
+            sync_client = httpx.Client(limits=cls._pool_limits(), timeout=LLM_HTTP_TIMEOUT)
+            cls._http_clients.append(sync_client)
+            client = Mistral(
+                api_key=api_key,
+                client=sync_client,
+                async_client=cls.get_http_client(),
+            )
+        elif provider == "openrouter":
+            client = cls.get_http_client(
+                base_url=OPENROUTER_BASE_URL,
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "X-Title": OPENROUTER_APP_NAME,
+                },
+            )
+        else:
+            raise ValueError(f"No shared client for provider: {provider}")
+
+        cls._clients[key] = client
+        return client
+
+    @classmethod
+    async def close_clients(cls):
+        """
+        Close all pooled connections. Called on application shutdown.
+        """
+        for client in cls._http_clients:
+            try:
+                if isinstance(client, httpx.AsyncClient):
+                    await client.aclose()
+                else:
+                    client.close()
+            except Exception as e:
+                logger.warning(f"Error closing LLM HTTP client: {e}")
+        cls._http_clients = []
+        cls._clients = {}
+
     @staticmethod
     def get_llm(
         api_type: str,
@@ -15,15 +111,87 @@ class LLMFactory:
         model: str = "mistral-large-latest",
         tool_metadata: List[Dict] = None,
         use_tools: bool = False,
-    ):
+    ) -> BaseLLM:
         """
         Return the appropriate LLM instance based on `api_type`.
+        All instances expose an awaitable `generate_completion`.
+
+        `api_type="fake"`, or LLM_PROVIDER_OVERRIDE=fake for every provider,
+        returns the fake provider used for load testing.
         """
-        print(api_type)
+        if api_type == "fake" or LLM_PROVIDER_OVERRIDE == "fake":
+            from .fake_llm import MODE_RECORD, get_fake_llm
+
+            delegate = None
+            if LLM_FAKE_MODE == MODE_RECORD and api_type != "fake":
+                delegate = LLMFactory._get_provider_llm(
+                    api_type, config, model, tool_metadata, use_tools
+                )
+            return get_fake_llm(model, delegate=delegate)
+        return LLMFactory._get_provider_llm(
+            api_type, config, model, tool_metadata, use_tools
+        )
+
+    @staticmethod
+    def _get_provider_llm(
+        api_type: str,
+        config: dict,
+        model: str,
+        tool_metadata: List[Dict],
+        use_tools: bool,
+    ) -> BaseLLM:
         if api_type == "mistral":
-            print(api_type)
+            from .mistral_api import MistralAPI
+
             return MistralAPI(
+                model=model,
+                tool_metadata=tool_metadata,
+                use_tools=use_tools,
+                client=LLMFactory.get_client("mistral", os.environ["MISTRAL_API_KEY"]),
+            )
+        elif api_type == "openrouter":
+            from .openrouter_api import OpenRouterAPI
+
+            return OpenRouterAPI(
+                config=config,
+                client=LLMFactory.get_client(
+                    "openrouter", os.environ["OPENROUTER_API_KEY"]
+                ),
+                tool_metadata=tool_metadata,
+                use_tools=use_tools,
+            )
+        elif api_type == "gemini":
+            # The Gemini SDK keeps a process-wide client once configured
+            from .gemini_api import GeminiAPI
+
+            return GeminiAPI(
                 model=model, tool_metadata=tool_metadata, use_tools=use_tools
             )
         else:
             raise ValueError(f"Unsupported API type: {api_type}")
+
+    @staticmethod
+    def get_resilient_llm(
+        api_type: str,
+        model: str,
+        tool_metadata: List[Dict] = None,
+        use_tools: bool = False,
+        priority: str = PRIORITY_INTERACTIVE,
+    ) -> BaseLLM:
+        """
+        Return an LLM for `model` that is rate-scheduled, circuit-broken per
+        provider and hedged to the model's equivalents in `ModelRegistry`.
+        """
+
+        def build(provider: str, name: str) -> BaseLLM:
+            return LLMFactory.get_llm(
+                api_type=provider,
+                config=ModelRegistry.get_model_config(name) if provider == "openrouter" else None,
+                model=name,
+                tool_metadata=tool_metadata,
+                use_tools=use_tools,
+            )
+
+        return ResilientLLM(
+            api_type, model, build, use_tools=use_tools, priority=priority
+        )
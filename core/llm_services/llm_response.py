@@ -0,0 +1,64 @@
+from typing import Any, Dict, List, Optional
+
+
+class LLMMessage:
+    """
+    The assistant message of a completion, in the shape the tutor pipeline
+    reads (`content` and provider-specific `tool_calls`).
+    """
+
+    def __init__(self, content: Optional[str] = None, tool_calls: Optional[List[Any]] = None):
+        self.content = content or ""
+        self.tool_calls = tool_calls
+
+
+class LLMResponse:
+    """
+    Provider-independent result of a chat completion.
+    """
+
+    def __init__(
+        self,
+        message: LLMMessage,
+        model: str = None,
+        provider: str = None,
+        usage: Optional[Dict[str, int]] = None,
+        finish_reason: Optional[str] = None,
+        latency: Optional[float] = None,
+    ):
+        self.message = message
+        self.model = model
+        self.provider = provider
+        self.usage = usage or {}
+        self.finish_reason = finish_reason
+        # Seconds the provider took to answer, when the provider reports it
+        self.latency = latency
+        self.cached = False
+
+    @property
+    def text(self) -> str:
+        return self.message.content
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize a plain-text response (tool calls are not serialized).
+        """
+        return {
+            "content": self.message.content,
+            "model": self.model,
+            "provider": self.provider,
+            "usage": self.usage,
+            "finish_reason": self.finish_reason,
+            "latency": self.latency,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LLMResponse":
+        return cls(
+            message=LLMMessage(data.get("content")),
+            model=data.get("model"),
+            provider=data.get("provider"),
+            usage=data.get("usage"),
+            finish_reason=data.get("finish_reason"),
+            latency=data.get("latency"),
+        )
@@ -0,0 +1,253 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from configs.config import LLM_FAKE_MODE, LLM_PROVIDER_OVERRIDE, LLM_SCHEDULER_ENABLED
+from core.utils.token_budget import count_message_tokens, count_tokens
+from models.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+PRIORITY_LANES = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 1}
+LANE_NAMES = {rank: name for name, rank in PRIORITY_LANES.items()}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`, holding at most
+    one minute's worth of tokens.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` tokens are available (0 if they are now).
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """
+        Correct the bucket once the real cost of a call is known.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class _Limiter:
+    """
+    Queue of calls waiting on one set of buckets (one provider and model).
+    """
+
+    def __init__(self, buckets: List[Tuple[TokenBucket, str]]):
+        self.buckets = buckets
+        self.queue: List[Tuple[int, int, float, asyncio.Future, float]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "granted": 0,
+            "max_wait_seconds": 0.0,
+            "total_wait_seconds": 0.0,
+            "waits_by_lane": {lane: 0.0 for lane in PRIORITY_LANES},
+            "granted_by_lane": {lane: 0 for lane in PRIORITY_LANES},
+        }
+
+    def wait_time(self, tokens: float) -> float:
+        return max(
+            bucket.wait_time(1 if kind == "requests" else tokens)
+            for bucket, kind in self.buckets
+        ) if self.buckets else 0.0
+
+    def consume(self, tokens: float):
+        for bucket, kind in self.buckets:
+            bucket.consume(1 if kind == "requests" else tokens)
+
+    def adjust_tokens(self, delta: float):
+        for bucket, kind in self.buckets:
+            if kind == "tokens":
+                bucket.adjust(delta)
+
+
+class LLMScheduler:
+    """
+    Rate-aware scheduler for provider calls.
+
+    Every call is admitted through request-per-minute and token-per-minute
+    buckets for its model and for its provider, using the limits in
+    `ModelRegistry`. Waiting calls are queued per provider and model in two
+    lanes: interactive chat turns are always admitted before background or
+    batch work, and calls within a lane are admitted in arrival order.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._provider_buckets: Dict[str, List[Tuple[TokenBucket, str]]] = {}
+        self._limiters: Dict[Tuple[str, str], _Limiter] = {}
+        self._sequence = itertools.count()
+
+    def _get_provider_buckets(self, provider: str, limits: dict):
+        if provider not in self._provider_buckets:
+            buckets = []
+            if limits["provider_rpm"]:
+                buckets.append((TokenBucket(limits["provider_rpm"]), "requests"))
+            if limits["provider_tpm"]:
+                buckets.append((TokenBucket(limits["provider_tpm"]), "tokens"))
+            self._provider_buckets[provider] = buckets
+        return self._provider_buckets[provider]
+
+    def _get_limiter(self, provider: str, model: str) -> _Limiter:
+        key = (provider, model)
+        if key not in self._limiters:
+            limits = ModelRegistry.get_rate_limits(provider, model)
+            buckets = []
+            if limits["model_rpm"]:
+                buckets.append((TokenBucket(limits["model_rpm"]), "requests"))
+            if limits["model_tpm"]:
+                buckets.append((TokenBucket(limits["model_tpm"]), "tokens"))
+            buckets.extend(self._get_provider_buckets(provider, limits))
+            self._limiters[key] = _Limiter(buckets)
+        return self._limiters[key]
+
+    def _dispatch(self, limiter: _Limiter):
+        limiter.timer = None
+        while limiter.queue:
+            lane, _, tokens, future, enqueued_at = limiter.queue[0]
+            if future.done():
+                # The caller gave up while waiting
+                heapq.heappop(limiter.queue)
+                continue
+
+            wait = limiter.wait_time(tokens)
+            if wait > 0:
+                limiter.timer = asyncio.get_running_loop().call_later(
+                    wait, self._dispatch, limiter
+                )
+                return
+
+            heapq.heappop(limiter.queue)
+            limiter.consume(tokens)
+
+            waited = time.monotonic() - enqueued_at
+            lane_name = LANE_NAMES[lane]
+            limiter.stats["granted"] += 1
+            limiter.stats["granted_by_lane"][lane_name] += 1
+            limiter.stats["total_wait_seconds"] += waited
+            limiter.stats["waits_by_lane"][lane_name] += waited
+            limiter.stats["max_wait_seconds"] = max(limiter.stats["max_wait_seconds"], waited)
+            future.set_result(None)
+
+    async def acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: float,
+        priority: str = PRIORITY_INTERACTIVE,
+    ) -> _Limiter:
+        """
+        Wait until a call of `tokens` estimated tokens may be sent.
+        """
+        limiter = self._get_limiter(provider, model)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            limiter.queue,
+            (
+                PRIORITY_LANES.get(priority, PRIORITY_LANES[PRIORITY_BACKGROUND]),
+                next(self._sequence),
+                tokens,
+                future,
+                time.monotonic(),
+            ),
+        )
+        if limiter.timer is None:
+            self._dispatch(limiter)
+        await future
+        return limiter
+
+    async def run(
+        self,
+        provider: str,
+        model: str,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: float = 0,
+        priority: str = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        """
+        Run `call` once the rate limits allow it. If the result reports its
+        token usage, the token buckets are corrected by the difference.
+        """
+        if not self.enabled:
+            return await call()
+
+        limiter = await self.acquire(provider, model, estimated_tokens, priority)
+        result = await call()
+
+        usage = getattr(result, "usage", None)
+        if isinstance(usage, dict) and usage.get("total_tokens"):
+            limiter.adjust_tokens(usage["total_tokens"] - estimated_tokens)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for (provider, model), limiter in self._limiters.items():
+            depth = {lane: 0 for lane in PRIORITY_LANES}
+            for lane, _, _, future, _ in limiter.queue:
+                if not future.done():
+                    depth[LANE_NAMES[lane]] += 1
+            granted = limiter.stats["granted"]
+            stats[f"{provider}/{model}"] = dict(
+                limiter.stats,
+                queue_depth=depth,
+                avg_wait_seconds=round(limiter.stats["total_wait_seconds"] / granted, 4)
+                if granted
+                else 0.0,
+            )
+        return stats
+
+
+def estimate_tokens(content: Any, max_output_tokens: int = 512) -> int:
+    """
+    Token estimate for rate limiting, including an allowance for the
+    completion. `content` is a list of chat messages or any other prompt
+    payload.
+    """
+    if isinstance(content, list) and all(isinstance(m, dict) for m in content):
+        return count_message_tokens(content) + max_output_tokens
+    return count_tokens(content) + max_output_tokens
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Return the process-wide LLM scheduler.
+    """
+    global _scheduler
+    if _scheduler is None:
+        # The fake provider does not send real calls (except when recording),
+        # so the providers' rate limits would only throttle load tests
+        fake_only = LLM_PROVIDER_OVERRIDE == "fake" and LLM_FAKE_MODE != "record"
+        _scheduler = LLMScheduler(enabled=LLM_SCHEDULER_ENABLED and not fake_only)
+    return _scheduler
@@ -1,25 +1,32 @@
 import os
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
 from mistralai import Mistral
 from dotenv import load_dotenv
 
+from .base_llm import BaseLLM
+from .llm_response import LLMMessage, LLMResponse
+
 load_dotenv()
 
 
-class MistralAPI:
+class MistralAPI(BaseLLM):
     """
     Implementation of the Mistral API.
     """
 
+    provider = "mistral"
+
     def __init__(
         self,
         model: str = "mistral-large-latest",
         tool_metadata: List[Dict] = None,
         use_tools: bool = False,
+        client: Optional[Mistral] = None,
     ):
 
         self.api_key = os.environ["MISTRAL_API_KEY"]
-        self.client = Mistral(api_key=self.api_key)
+        # Prefer a shared, pooled client from LLMFactory
+        self.client = client or Mistral(api_key=self.api_key)
 
         self.model = model
 
@@ -29,15 +36,15 @@ class MistralAPI:
         # Flag to control tool usage
         self.use_tools = use_tools
 
-    def generate_completion(
+    async def generate_completion(
         self,
         messages: List[Dict],
         tool_choice: str = "auto",
         response_format: Dict = None,
-    ) -> str:
+    ) -> LLMResponse:
 
         # Prepare the chat completion request
-        chat_response = self.client.chat.complete(
+        chat_response = await self.client.chat.complete_async(
             model=self.model,
             messages=messages,
             tools=self.tool_metadata if self.use_tools else None,
@@ -46,4 +53,33 @@ class MistralAPI:
         )
 
         # Return the generated content
-        return chat_response.choices[0]
+        choice = chat_response.choices[0]
+        usage = chat_response.usage
+        return LLMResponse(
+            message=LLMMessage(choice.message.content, choice.message.tool_calls),
+            model=self.model,
+            provider=self.provider,
+            usage={
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+            }
+            if usage
+            else None,
+            finish_reason=choice.finish_reason,
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        stream = await self.client.chat.stream_async(
+            model=self.model,
+            messages=messages,
+            response_format=response_format,
+        )
+        async for event in stream:
+            content = event.data.choices[0].delta.content
+            if content:
+                yield content
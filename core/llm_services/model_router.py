@@ -0,0 +1,181 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from configs.config import (
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_ROUTER_ENABLED,
+    LLM_ROUTER_LATENCY_TARGET,
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_OBJECTIVE,
+    LLM_ROUTER_OBJECTIVES,
+    LLM_ROUTER_PROBE_INTERVAL,
+)
+from models.model_registry import ModelRegistry
+
+from .resilience import get_resilience_manager
+
+
+OBJECTIVE_QUALITY = "quality"
+OBJECTIVE_LATENCY = "latency"
+OBJECTIVE_COST = "cost"
+
+# Completion length assumed when comparing prices
+EXPECTED_COMPLETION_TOKENS = 500
+
+
+class ModelRouter:
+    """
+    Pick a model for each pipeline task from `ModelRegistry.TASK_MODELS`.
+
+    Candidates whose provider circuit is open, whose recent error rate is
+    above `max_error_rate` or whose context window is too small are skipped.
+    As with the circuit breaker's half-open state, a model skipped for its
+    error rate is selected for one trial call every `probe_interval`
+    seconds; it is routed to again while its latest call succeeded, until
+    its error rate has recovered.
+    The remaining ones are chosen by the task's objective:
+
+    - quality: the first candidate expected to answer within the latency
+      target
+    - latency: the candidate with the lowest expected latency
+    - cost: the cheapest candidate expected to answer within the target
+
+    The expected latency of a model is its live p95 once enough calls have
+    been observed, and its latency budget before that.
+    """
+
+    def __init__(
+        self,
+        default_objective: str = OBJECTIVE_QUALITY,
+        objectives: Optional[Dict[str, str]] = None,
+        latency_target: float = 8.0,
+        max_error_rate: float = 0.5,
+        min_samples: int = 20,
+        probe_interval: float = 30.0,
+    ):
+        self.default_objective = default_objective
+        self.objectives = objectives or {}
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.selections: Dict[str, Dict[str, int]] = {}
+        # Models skipped for their error rate, with the time of their last trial
+        self._excluded: Dict[str, float] = {}
+        self._probed = set()
+        self.probes = 0
+
+    def expected_latency(self, model_name: str) -> float:
+        if ModelRegistry.latency_samples(model_name) >= self.min_samples:
+            return ModelRegistry.latency_percentile(model_name, 95)
+        return ModelRegistry.MODELS[model_name].get("latency_budget") or float("inf")
+
+    def _is_eligible(self, model_name: str, prompt_tokens: int) -> bool:
+        config = ModelRegistry.MODELS[model_name]
+        if not get_resilience_manager().is_available(config["provider"]):
+            return False
+        if not self._is_healthy(model_name):
+            return False
+        context_window = config.get("context_window")
+        return not context_window or prompt_tokens + EXPECTED_COMPLETION_TOKENS <= context_window
+
+    def _is_healthy(self, model_name: str) -> bool:
+        error_rate = ModelRegistry.error_rate(model_name)
+        if error_rate is None or error_rate <= self.max_error_rate:
+            self._excluded.pop(model_name, None)
+            self._probed.discard(model_name)
+            return True
+        if model_name not in self._excluded:
+            self._excluded[model_name] = time.monotonic()
+            return False
+        return self._is_recovering(model_name) or self._probe_due(model_name)
+
+    def _is_recovering(self, model_name: str) -> bool:
+        return model_name in self._probed and ModelRegistry.last_call_succeeded(model_name)
+
+    def _probe_due(self, model_name: str) -> bool:
+        return time.monotonic() - self._excluded[model_name] >= self.probe_interval
+
+    def _reserve_probe(self, model_name: str):
+        """
+        Start the trial period of an excluded model once it has actually
+        been selected, so a model passed over by the objective keeps its
+        probe.
+        """
+        if (
+            model_name in self._excluded
+            and not self._is_recovering(model_name)
+            and self._probe_due(model_name)
+        ):
+            self._excluded[model_name] = time.monotonic()
+            self._probed.add(model_name)
+            self.probes += 1
+
+    def _choose(self, objective: str, candidates: List[str], prompt_tokens: int) -> str:
+        fastest = min(candidates, key=self.expected_latency)
+        within_target = [
+            m for m in candidates if self.expected_latency(m) <= self.latency_target
+        ]
+        if objective == OBJECTIVE_LATENCY or not within_target:
+            return fastest
+        if objective == OBJECTIVE_COST:
+            return min(
+                within_target,
+                key=lambda m: ModelRegistry.estimate_cost(
+                    m, prompt_tokens or 1000, EXPECTED_COMPLETION_TOKENS
+                ),
+            )
+        return within_target[0]
+
+    def select(self, task: str, prompt_tokens: int = 0) -> Tuple[str, str]:
+        """
+        Return the `(api_type, model_name)` to use for a task.
+        """
+        candidates = ModelRegistry.TASK_MODELS.get(task)
+        if not candidates:
+            raise ValueError(f"No models registered for task '{task}'.")
+
+        objective = self.objectives.get(task, self.default_objective)
+        eligible = [m for m in candidates if self._is_eligible(m, prompt_tokens)]
+        if eligible:
+            model_name = self._choose(objective, eligible, prompt_tokens)
+            self._reserve_probe(model_name)
+        else:
+            # Nothing looks healthy; let failover handle the preferred model
+            model_name = candidates[0]
+
+        counts = self.selections.setdefault(task, {})
+        counts[model_name] = counts.get(model_name, 0) + 1
+        return ModelRegistry.MODELS[model_name]["provider"], model_name
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "default_objective": self.default_objective,
+            "objectives": self.objectives,
+            "latency_target_seconds": self.latency_target,
+            "selections": self.selections,
+            "excluded": sorted(self._excluded),
+            "probes": self.probes,
+        }
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> Optional[ModelRouter]:
+    """
+    Return the process-wide model router, or None when routing is disabled.
+    """
+    global _model_router
+    if not LLM_ROUTER_ENABLED:
+        return None
+    if _model_router is None:
+        _model_router = ModelRouter(
+            default_objective=LLM_ROUTER_OBJECTIVE,
+            objectives=LLM_ROUTER_OBJECTIVES,
+            latency_target=LLM_ROUTER_LATENCY_TARGET,
+            max_error_rate=LLM_ROUTER_MAX_ERROR_RATE,
+            min_samples=LLM_HEDGE_MIN_SAMPLES,
+            probe_interval=LLM_ROUTER_PROBE_INTERVAL,
+        )
+    return _model_router
@@ -0,0 +1,117 @@
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List
+
+import httpx
+from dotenv import load_dotenv
+
+from .base_llm import BaseLLM
+from .llm_response import LLMMessage, LLMResponse
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OpenRouterError(Exception):
+    """
+    Raised when OpenRouter returns an error instead of a completion.
+    """
+
+
+class OpenRouterAPI(BaseLLM):
+    """
+    Implementation of the OpenRouter chat completions API on a pooled
+    async HTTP client.
+    """
+
+    provider = "openrouter"
+
+    def __init__(
+        self,
+        config: Dict,
+        client: httpx.AsyncClient,
+        tool_metadata: List[Dict] = None,
+        use_tools: bool = False,
+    ):
+        # `config` is the ModelRegistry entry; `name` is the OpenRouter model id
+        self.model = config["name"]
+        self.client = client
+        self.tool_metadata = tool_metadata or []
+        self.use_tools = use_tools
+
+    async def generate_completion(
+        self,
+        messages: List[Dict],
+        tool_choice: str = "auto",
+        response_format: Dict = None,
+    ) -> LLMResponse:
+        payload = {"model": self.model, "messages": messages}
+        if self.use_tools and self.tool_metadata:
+            payload["tools"] = self.tool_metadata
+            payload["tool_choice"] = tool_choice
+        if response_format:
+            payload["response_format"] = response_format
+
+        started = time.monotonic()
+        response = await self.client.post("/chat/completions", json=payload)
+        latency = time.monotonic() - started
+        response.raise_for_status()
+
+        data = response.json()
+        if "error" in data:
+            raise OpenRouterError(f"OpenRouter error for {self.model}: {data['error']}")
+
+        choice = data["choices"][0]
+        message = choice.get("message") or {}
+        usage = data.get("usage")
+        logger.info(
+            f"OpenRouter {self.model} completed in {latency:.2f}s"
+            f" (usage: {usage or 'unreported'})"
+        )
+        return LLMResponse(
+            message=LLMMessage(message.get("content"), message.get("tool_calls")),
+            model=data.get("model", self.model),
+            provider=self.provider,
+            usage={
+                "prompt_tokens": usage.get("prompt_tokens"),
+                "completion_tokens": usage.get("completion_tokens"),
+                "total_tokens": usage.get("total_tokens"),
+            }
+            if usage
+            else None,
+            finish_reason=choice.get("finish_reason"),
+            latency=latency,
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the completion as server-sent events.
+        """
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        if response_format:
+            payload["response_format"] = response_format
+
+        async with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Other lines are keep-alive comments or blank separators
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise OpenRouterError(
+                        f"OpenRouter error for {self.model}: {event['error']}"
+                    )
+                choices = event.get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
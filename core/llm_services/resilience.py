@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from configs.config import (
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RECOVERY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGING_ENABLED,
+)
+from models.model_registry import ModelRegistry
+
+from .base_llm import BaseLLM
+from .llm_response import LLMResponse
+from .llm_scheduler import PRIORITY_INTERACTIVE, estimate_tokens, get_llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when every candidate provider for a call has an open circuit.
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected. Once `recovery_timeout` seconds have passed, a
+    single trial call is let through (half-open); its success closes the
+    circuit and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.metrics = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.metrics["rejected"] += 1
+                return False
+            self.state = self.HALF_OPEN
+        if self.trial_in_flight:
+            self.metrics["rejected"] += 1
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.metrics["successes"] += 1
+        self.failures = 0
+        self.trial_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.metrics["failures"] += 1
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.metrics["opened"] += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Give back a half-open trial whose call was cancelled before it
+        produced an outcome.
+        """
+        self.trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.metrics, state=self.state, consecutive_failures=self.failures)
+
+
+class ResilienceManager:
+    """
+    Circuit breakers, latency tracking and hedging for provider calls.
+
+    A call is sent to its primary model first. If it has not finished by
+    the model's hedge delay (its live p95 from `ModelRegistry`, capped by
+    its latency budget), the same call is also sent to the next equivalent
+    model and the first successful answer wins. A failed attempt fails over
+    to the next equivalent immediately. Providers with an open circuit are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        min_samples: int = 20,
+        hedging_enabled: bool = True,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.min_samples = min_samples
+        self.hedging_enabled = hedging_enabled
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = {"hedges": 0, "fallback_wins": 0, "failovers": 0}
+
+    def is_available(self, provider: str) -> bool:
+        """
+        Whether calls to the provider would currently be admitted, without
+        reserving a half-open trial.
+        """
+        breaker = self._breakers.get(provider)
+        if breaker is None or breaker.state == CircuitBreaker.CLOSED:
+            return True
+        if breaker.state == CircuitBreaker.OPEN:
+            return time.monotonic() - breaker.opened_at >= breaker.recovery_timeout
+        return not breaker.trial_in_flight
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(
+                self.failure_threshold, self.recovery_timeout
+            )
+        return self._breakers[provider]
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        budget = ModelRegistry.MODELS.get(model, {}).get("latency_budget")
+        p95 = None
+        if ModelRegistry.latency_samples(model) >= self.min_samples:
+            p95 = ModelRegistry.latency_percentile(model, 95)
+        if budget is None:
+            return p95
+        return min(budget, p95) if p95 is not None else budget
+
+    async def observe(self, provider: str, model: str, call: Callable[[], Awaitable[Any]]):
+        """
+        Run a provider call, recording its outcome on the provider's breaker
+        and its latency and usage in `ModelRegistry`.
+        """
+        breaker = self.breaker(provider)
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            ModelRegistry.record_call(model, None, success=False)
+            raise
+        breaker.record_success()
+        ModelRegistry.record_call(
+            model,
+            time.monotonic() - started,
+            success=True,
+            usage=getattr(result, "usage", None),
+        )
+        return result
+
+    async def call(
+        self, attempts: List[Tuple[str, str, Callable[[], Awaitable[Any]]]]
+    ) -> Any:
+        """
+        Run `(provider, model, call)` attempts in order of preference,
+        hedging and failing over as described above.
+        """
+        remaining = iter(attempts if self.hedging_enabled else attempts[:1])
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}
+        started: List[str] = []
+        last_error: Optional[BaseException] = None
+
+        def start_next() -> bool:
+            for provider, model, fn in remaining:
+                if not self.breaker(provider).allow_request():
+                    continue
+                pending[asyncio.ensure_future(fn())] = (provider, model)
+                started.append(model)
+                return True
+            return False
+
+        if not start_next():
+            raise CircuitOpenError("No LLM provider is currently available")
+
+        exhausted = False
+        try:
+            while pending:
+                delay = None if exhausted else self.hedge_delay(started[-1])
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if start_next():
+                        self.metrics["hedges"] += 1
+                    else:
+                        exhausted = True
+                    continue
+
+                for task in done:
+                    provider, model = pending.pop(task)
+                    if task.exception() is None:
+                        if model != started[0]:
+                            self.metrics["fallback_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM call to {provider}/{model} failed: {last_error}")
+
+                if not pending:
+                    if start_next():
+                        self.metrics["failovers"] += 1
+                    else:
+                        raise last_error
+        finally:
+            for task, (provider, _) in pending.items():
+                task.cancel()
+                # A losing attempt may still hold the provider's half-open trial
+                self.breaker(provider).release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.metrics,
+            breakers={p: b.snapshot() for p, b in self._breakers.items()},
+        )
+
+
+class ResilientLLM(BaseLLM):
+    """
+    LLM that sends each completion to its primary model with hedging and
+    failover to the equivalent models listed in `ModelRegistry`. Every
+    attempt is admitted by the rate-limit scheduler.
+
+    Streamed completions are not hedged: a candidate that fails before its
+    first chunk is failed over to the next one, and a failure after that
+    is raised to the caller.
+    """
+
+    def __init__(
+        self,
+        api_type: str,
+        model: str,
+        build: Callable[[str, str], BaseLLM],
+        use_tools: bool = False,
+        priority: str = PRIORITY_INTERACTIVE,
+    ):
+        self.api_type = api_type
+        self.model = model
+        self.build = build
+        self.use_tools = use_tools
+        self.priority = priority
+
+    def _candidates(self) -> List[Tuple[str, str]]:
+        candidates = [(self.api_type, self.model)]
+        for name in ModelRegistry.get_equivalents(self.model):
+            config = ModelRegistry.MODELS[name]
+            if self.use_tools and not config.get("supports_tools"):
+                continue
+            candidates.append((config["provider"], name))
+        return candidates
+
+    async def generate_completion(
+        self,
+        messages: List[Dict],
+        tool_choice: str = "auto",
+        response_format: Dict = None,
+    ) -> LLMResponse:
+        resilience = get_resilience_manager()
+        scheduler = get_llm_scheduler()
+        estimated_tokens = estimate_tokens(messages)
+
+        def attempt(provider: str, model: str):
+            async def complete():
+                llm = self.build(provider, model)
+                return await llm.generate_completion(
+                    messages, tool_choice=tool_choice, response_format=response_format
+                )
+
+            return lambda: scheduler.run(
+                provider,
+                model,
+                lambda: resilience.observe(provider, model, complete),
+                estimated_tokens=estimated_tokens,
+                priority=self.priority,
+            )
+
+        return await resilience.call(
+            [(provider, model, attempt(provider, model)) for provider, model in self._candidates()]
+        )
+
+    async def stream_completion(
+        self,
+        messages: List[Dict],
+        response_format: Dict = None,
+    ) -> AsyncIterator[str]:
+        resilience = get_resilience_manager()
+        scheduler = get_llm_scheduler()
+        estimated_tokens = estimate_tokens(messages)
+        attempts = 0
+        last_error: Optional[BaseException] = None
+
+        for provider, model in self._candidates():
+            breaker = resilience.breaker(provider)
+            if not breaker.allow_request():
+                continue
+            if attempts:
+                resilience.metrics["failovers"] += 1
+            attempts += 1
+            started = time.monotonic()
+            received = False
+            try:
+                if scheduler.enabled:
+                    await scheduler.acquire(provider, model, estimated_tokens, self.priority)
+                llm = self.build(provider, model)
+                async for chunk in llm.stream_completion(
+                    messages, response_format=response_format
+                ):
+                    received = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                ModelRegistry.record_call(model, None, success=False)
+                if received:
+                    raise
+                last_error = e
+                logger.warning(f"LLM stream from {provider}/{model} failed: {e}")
+                continue
+
+            breaker.record_success()
+            ModelRegistry.record_call(model, time.monotonic() - started, success=True)
+            if attempts > 1:
+                resilience.metrics["fallback_wins"] += 1
+            return
+
+        raise last_error or CircuitOpenError("No LLM provider is currently available")
+
+
+_resilience_manager: Optional[ResilienceManager] = None
+
+
+def get_resilience_manager() -> ResilienceManager:
+    """
+    Return the process-wide resilience manager.
+    """
+    global _resilience_manager
+    if _resilience_manager is None:
+        _resilience_manager = ResilienceManager(
+            failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=LLM_BREAKER_RECOVERY_SECONDS,
+            min_samples=LLM_HEDGE_MIN_SAMPLES,
+            hedging_enabled=LLM_HEDGING_ENABLED,
+        )
+    return _resilience_manager
@@ -1,10 +1,10 @@
 from http.client import HTTPException
-import uuid
 import json
 from mistralai import Optional
 
 from core.utils.api_utils import APIUtils
 from core.logic.socratic_tutor_logic import start_tutoring_session, submit_tutor_answer
+from core.session.session_store import SessionStore
 from schemas.socratic_tutor_schemas import QuestionResponse
 
 socratic_tutor_description = "Act as a Socratic tutor"
@@ -39,32 +39,25 @@ system_prompt = (
 )
 
 
-def save_session_data(session_file, sessions):
-    with open(session_file, "w") as f:
-        json.dump(sessions, f)
-
-
-def main_chat_flow(
-    user_request: str, session_file: str, session_id: Optional[str] = None
+async def main_chat_flow(
+    user_request: str, session_store: SessionStore, session_id: Optional[str] = None
 ):
-    with open(session_file, "r") as f:
-        sessions = json.load(f)
+    session_data = await session_store.load(session_id) if session_id else None
 
-    if session_id and session_id in sessions:
-        session_data = sessions[session_id]
+    if session_data is not None:
         flow_status = session_data["flow_status"]
     else:
-        session_id = str(uuid.uuid4())
-        sessions[session_id] = {"flow_status": "general"}
-        session_data = sessions[session_id]
+        session_data = session_store.create()
+        session_data["flow_status"] = "general"
         flow_status = "general"
+    session_id = session_data.session_id
 
     if "conversation_flow" not in session_data:
         session_data["conversation_flow"] = []
 
     session_data["conversation_flow"].append({"role": "user", "content": user_request})
 
-    save_session_data(session_file, sessions)
+    await session_store.save(session_data)
 
     if flow_status == "general":
         messages = [{"role": "system", "content": system_prompt}]
@@ -79,7 +72,7 @@ def main_chat_flow(
             use_tools=True,
         )
 
-        response = api_utils.generate_response(messages=messages)
+        response = await api_utils.generate_response(messages=messages)
 
         if response.message.tool_calls:
 
@@ -88,17 +81,17 @@ def main_chat_flow(
             arguments = json.loads(tool_call.function.arguments)
 
             if tool_name == "socratic_tutor":
-                session_response = start_tutoring_session(
-                    arguments["student_question"], sessions, session_id
+                session_response = await start_tutoring_session(
+                    arguments["student_question"], session_data, session_id
                 )
                 first_question = session_response.question
                 flow_status = "socratic"
 
-                sessions[session_id]["flow_status"] = flow_status
+                session_data["flow_status"] = flow_status
                 session_data["conversation_flow"].append(
                     {"role": "assistant", "content": first_question}
                 )
-                save_session_data(session_file, sessions)
+                await session_store.save(session_data)
 
                 return QuestionResponse(
                     session_id=session_id,
@@ -112,24 +105,24 @@ def main_chat_flow(
             session_data["conversation_flow"].append(
                 {"role": "assistant", "content": response.message.content}
             )
-            save_session_data(session_file, sessions)
+            await session_store.save(session_data)
 
             return QuestionResponse(
                 session_id=session_id, question=response.message.content
             )
     elif flow_status == "socratic":
-        response = submit_tutor_answer(user_request, sessions, session_id)
+        response = await submit_tutor_answer(user_request, session_data, session_id)
 
         if response.correct and response.question == "Session complete!":
             flow_status = "general"
-            sessions[session_id]["flow_status"] = flow_status
+            session_data["flow_status"] = flow_status
             session_data["conversation_flow"].append(
                 {
                     "role": "assistant",
                     "content": "Nice! you successfully understand the problem, Do you have anything to ask?",
                 }
             )
-            save_session_data(session_file, sessions)
+            await session_store.save(session_data)
 
             return QuestionResponse(
                 session_id=session_id,
@@ -141,7 +134,7 @@ def main_chat_flow(
             session_data["conversation_flow"].append(
                 {"role": "assistant", "content": response.question}
             )
-            save_session_data(session_file, sessions)
+            await session_store.save(session_data)
 
             return QuestionResponse(
                 session_id=session_id,
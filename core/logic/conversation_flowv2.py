@@ -1,25 +1,103 @@
+import hashlib
 import json
 import os
-from typing import Optional
-import uuid
-import google.generativeai as genai
+from typing import AsyncIterator, Dict, List, Optional
 import PIL.Image
 from fastapi import UploadFile
-from core.logic.conversation_flow import save_session_data
+from configs.config import (
+    CHAT_HISTORY_TOKEN_BUDGET,
+    GEMINI_CHAT_CACHE_SIZE,
+    GEMINI_MODEL_CACHE_SIZE,
+    LLM_FAKE_MODE,
+    LLM_PROVIDER_OVERRIDE,
+    QUESTION_BANK_DIR,
+)
+from core.llm_services.fake_llm import get_fake_llm
+from core.llm_services.gemini_api import GeminiAPI
+from core.session.session_store import SessionStore
+from core.utils.lru_cache import LRUCache
+from core.utils.token_budget import (
+    count_message_tokens,
+    fit_history,
+    get_token_usage,
+    prompt_limit,
+)
 from schemas.socratic_tutor_schemas import QuestionResponse
 from ..prompt.system_instruction import System_Instruction
 
-from dotenv import load_dotenv
 import shutil
 from PIL import Image
 
-load_dotenv()
-api_key = os.environ["GEMINI_API_KEY"]
-genai.configure(api_key=api_key)
+TUTOR_MODEL = "learnlm-1.5-pro-experimental"
+
+# Model objects keyed by (model, system instruction hash)
+_model_cache = LRUCache(max_size=GEMINI_MODEL_CACHE_SIZE)
+# Live chat sessions keyed by session_id, as (model, chat, offset) where
+# offset is the number of oldest stored history entries left out of the chat
+_chat_cache = LRUCache(max_size=GEMINI_CHAT_CACHE_SIZE)
+
+
+def get_model(
+    model_name: str, system_instruction: str, instruction_hash: Optional[str] = None
+) -> GeminiAPI:
+    """
+    Return a cached model for this model name and system instruction,
+    keyed by the instruction's content hash from the prompt registry.
+    """
+    key = (
+        model_name,
+        instruction_hash or hashlib.sha256(system_instruction.encode("utf-8")).hexdigest(),
+    )
+    model = _model_cache.get(key)
+    if model is None:
+        if LLM_PROVIDER_OVERRIDE == "fake" and LLM_FAKE_MODE != "record":
+            model = get_fake_llm(model_name)
+        else:
+            model = GeminiAPI(model_name, system_instruction=system_instruction)
+        _model_cache.put(key, model)
+    return model
+
+
+def history_budget() -> int:
+    limit = prompt_limit(TUTOR_MODEL)
+    return min(CHAT_HISTORY_TOKEN_BUDGET, limit) if limit else CHAT_HISTORY_TOKEN_BUDGET
+
+
+def get_chat(model: GeminiAPI, session_id: str, history: List[Dict]):
+    """
+    Return the live chat session for `session_id`, rebuilding it from the
+    stored history only if it is missing, out of sync with the store or
+    over the history token budget. Rebuilt chats only get the most recent
+    turns that fit the budget.
+    """
+    budget = history_budget()
+    cached = _chat_cache.get(session_id)
+    if cached is not None:
+        cached_model, chat, offset = cached
+        if (
+            cached_model is model
+            and offset + len(chat.history) == len(history)
+            and count_message_tokens(history[offset:]) <= budget
+        ):
+            get_token_usage().record(
+                "chat", TUTOR_MODEL, count_message_tokens(history[offset:])
+            )
+            return chat
+
+    trimmed = fit_history(history, budget)
+    get_token_usage().record(
+        "chat",
+        TUTOR_MODEL,
+        count_message_tokens(trimmed),
+        count_message_tokens(history),
+    )
+    chat = model.start_chat(history=trimmed)
+    _chat_cache.put(session_id, (model, chat, len(history) - len(trimmed)))
+    return chat
 
 
 def store_image(image: UploadFile, session_id: str, image_index: int) -> str:
-    directory = f"./question_bank/{session_id}"
+    directory = os.path.join(QUESTION_BANK_DIR, session_id)
 
     os.makedirs(directory, exist_ok=True)
 
@@ -34,35 +112,38 @@ def store_image(image: UploadFile, session_id: str, image_index: int) -> str:
     return image_path
 
 
-def main_chat_flowv2(
-    user_request: str,
-    session_file: str,
-    session_id: Optional[str],
-    image: Optional[UploadFile],
-):
-
-    with open(session_file, "r") as f:
-        sessions = json.load(f)
+async def load_or_create_session(session_store: SessionStore, session_id: Optional[str]):
+    session_data = await session_store.load(session_id) if session_id else None
 
-    if session_id and session_id in sessions:
-        session_data = sessions[session_id]
-    else:
-        session_id = str(uuid.uuid4())
-        sessions[session_id] = {"conversation_flow": []}
-        session_data = sessions[session_id]
+    if session_data is None:
+        session_data = session_store.create()
+        session_data["conversation_flow"] = []
 
     if "conversation_flow" not in session_data:
         session_data["conversation_flow"] = []
 
+    return session_data
+
+
+async def send_turn(
+    user_request: str,
+    session_data: dict,
+    image: Optional[UploadFile],
+    stream: bool = False,
+):
+    """
+    Send the student's turn to the tutor model and return the Gemini
+    response, which is an async iterator of chunks when `stream` is set.
+    """
+    session_id = session_data.session_id
+
     scenario = "laai_tutor"
-    sys_prompt = System_Instruction.system_instruction(scenario)
+    instruction = System_Instruction.instruction_template(scenario)
 
-    model = genai.GenerativeModel(
-        "learnlm-1.5-pro-experimental", system_instruction=sys_prompt
-    )
+    model = get_model(TUTOR_MODEL, instruction.text, instruction.hash)
 
     if image:
-        directory = f"./question_bank/{session_id}"
+        directory = os.path.join(QUESTION_BANK_DIR, session_id)
 
         os.makedirs(directory, exist_ok=True)
 
@@ -73,10 +154,10 @@ def main_chat_flowv2(
         image_path = store_image(image, session_id, existing_images + 1)
         image = Image.open(image_path)
 
-        response = model.generate_content([user_request, image])
+        response = await model.generate_content([user_request, image], stream=stream)
     else:
 
-        directory = f"./question_bank/{session_id}"
+        directory = os.path.join(QUESTION_BANK_DIR, session_id)
         os.makedirs(directory, exist_ok=True)
         existing_images = [
             f for f in os.listdir(directory) if f.startswith(f"{session_id}_image_")
@@ -90,23 +171,96 @@ def main_chat_flowv2(
                 {"role": "user", "parts": user_request}
             )
 
-            response = model.generate_content(
-                [str(session_data["conversation_flow"]), image]
+            history = session_data["conversation_flow"]
+            trimmed = fit_history(history, history_budget())
+            get_token_usage().record(
+                "chat",
+                TUTOR_MODEL,
+                count_message_tokens(trimmed),
+                count_message_tokens(history),
             )
+            response = await model.generate_content([str(trimmed), image], stream=stream)
         else:
 
-            chat = model.start_chat(history=session_data["conversation_flow"])
-            response = chat.send_message(user_request)
+            chat = get_chat(model, session_id, session_data["conversation_flow"])
+            response = await model.send_message(chat, user_request, stream=stream)
             session_data["conversation_flow"].append(
                 {"role": "user", "parts": user_request}
             )
 
-    session_data["conversation_flow"].append({"role": "model", "parts": response.text})
+    return response
 
-    save_session_data(session_file, sessions)
+
+async def finish_turn(session_store: SessionStore, session_data: dict, text: str):
+    session_data["conversation_flow"].append({"role": "model", "parts": text})
+
+    await session_store.save(session_data)
 
     return QuestionResponse(
-        session_id=session_id,
-        question=response.text,
+        session_id=session_data.session_id,
+        question=text,
         correct=True,
     )
+
+
+async def main_chat_flowv2(
+    user_request: str,
+    session_store: SessionStore,
+    session_id: Optional[str],
+    image: Optional[UploadFile],
+):
+
+    session_data = await load_or_create_session(session_store, session_id)
+    response = await send_turn(user_request, session_data, image)
+    return await finish_turn(session_store, session_data, response.text)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_chat_flowv2(
+    user_request: str,
+    session_store: SessionStore,
+    session_id: Optional[str],
+    image: Optional[UploadFile],
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of `main_chat_flowv2` that yields server-sent events.
+
+    A `token` event is sent for every chunk generated by the model. Once the
+    stream completes the turn is persisted and a final `done` event carries
+    the `session_id` and response metadata. If generation fails or the
+    client disconnects, the turn is not persisted; failures are reported
+    with an `error` event.
+    """
+    session_data = await load_or_create_session(session_store, session_id)
+    history_length = len(session_data["conversation_flow"])
+    chunks = []
+    completed = False
+
+    try:
+        response = await send_turn(user_request, session_data, image, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata)
+                continue
+            if text:
+                chunks.append(text)
+                yield format_sse("token", {"text": text})
+        completed = True
+    except Exception as e:
+        yield format_sse(
+            "error", {"session_id": session_data.session_id, "detail": str(e)}
+        )
+        return
+    finally:
+        # Also roll back when the client disconnects mid-stream
+        if not completed:
+            del session_data["conversation_flow"][history_length:]
+            _chat_cache.pop(session_data.session_id)
+
+    result = await finish_turn(session_store, session_data, "".join(chunks))
+    yield format_sse("done", result.model_dump())
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from configs.config import (
+    TUTOR_PLAN_MAX_SESSIONS,
+    TUTOR_PLAN_STREAMING_ENABLED,
+    TUTOR_PLAN_WAIT_SECONDS,
+)
+from core.services.followup_question import FollowUpQuestionGenerator
+from core.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class PlanFill:
+    """
+    The follow-up plan of one session, filled in as it is generated.
+    """
+
+    def __init__(self):
+        self.items: List[Dict] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def add(self, item: Dict):
+        self.items.append(item)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self):
+        # Wake current waiters; later waiters wait for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for(self, count: int):
+        """
+        Wait until the plan has `count` items or is complete.
+        """
+        while len(self.items) < count and not self.done:
+            await self._changed.wait()
+
+
+class PlanStreamer:
+    """
+    Streaming generation of Socratic follow-up plans.
+
+    `start` returns as soon as the first question/answer pair has been
+    generated; the rest of the plan keeps streaming in a background task.
+    Sessions whose plan is still being generated are marked with
+    `plan_complete: False`, and `sync` copies the questions generated since
+    into the session, waiting up to `wait_timeout` seconds when the student
+    has caught up with the plan. `on_item` is called with the plan's items
+    each time a question arrives, e.g. to prefetch work for it. Plans in
+    progress are kept in process memory. When a session's next request is
+    served by another worker or node, or after a restart, the plan is
+    generated again without streaming (usually from the response cache) and
+    its remaining questions are added to the session.
+    """
+
+    def __init__(
+        self, max_sessions: int = 1000, wait_timeout: float = 60.0, enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.wait_timeout = wait_timeout
+        self._plans = LRUCache(max_size=max_sessions)
+        self.metrics = {
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+            "regenerated": 0,
+        }
+        self._first_item_seconds: List[float] = []
+
+    async def start(
+        self,
+        session_id: str,
+        student_question: str,
+        on_item: Optional[Callable[[List[Dict]], None]] = None,
+    ) -> PlanFill:
+        """
+        Start generating the plan for a session and return it once its
+        first question is available. Raises ValueError if no question could
+        be generated.
+        """
+        self.discard(session_id)
+        plan = PlanFill()
+        started = time.monotonic()
+
+        async def fill():
+            try:
+                async for item in FollowUpQuestionGenerator().generate_stream(student_question):
+                    if not plan.items:
+                        self._first_item_seconds.append(time.monotonic() - started)
+                        del self._first_item_seconds[:-100]
+                    plan.add(item)
+                    if on_item is not None:
+                        on_item(plan.items)
+            except asyncio.CancelledError:
+                self.metrics["cancelled"] += 1
+                plan.finish()
+                raise
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.warning(f"Follow-up plan generation for {session_id} failed: {e}")
+                plan.finish(e)
+                return
+            self.metrics["completed"] += 1
+            plan.finish()
+
+        self.metrics["started"] += 1
+        plan.task = asyncio.ensure_future(fill())
+        self._plans.put(session_id, plan)
+        try:
+            await plan.wait_for(1)
+        except asyncio.CancelledError:
+            self.discard(session_id)
+            raise
+        if not plan.items:
+            self._plans.pop(session_id)
+            raise ValueError("Error generating follow-up questions.") from plan.error
+        return plan
+
+    async def sync(self, session_id: str, session_data: dict, count: int = 0):
+        """
+        Copy questions generated in the background into the session,
+        first waiting until the plan has `count` questions if it is still
+        being generated. Raises asyncio.TimeoutError if they are not
+        generated within `wait_timeout` seconds; the plan keeps streaming,
+        so the call can be retried. If the plan is not streaming in this
+        process, the rest of it is generated once the session needs it.
+        """
+        if session_data.get("plan_complete", True):
+            return
+        plan = self._plans.get(session_id)
+        if plan is None:
+            # Streaming in another process, or lost with it
+            if count > len(session_data["questions_and_answers"]):
+                await self._generate_rest(session_id, session_data)
+            return
+        if len(plan.items) < count and not plan.done:
+            self.metrics["waits"] += 1
+            try:
+                await asyncio.wait_for(plan.wait_for(count), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.metrics["wait_timeouts"] += 1
+                logger.warning(f"Timed out waiting for question {count} of {session_id}")
+                raise
+
+        self._extend(session_data, plan.items)
+        if plan.done:
+            self._complete(session_data)
+            self._plans.pop(session_id)
+
+    async def _generate_rest(self, session_id: str, session_data: dict):
+        self.metrics["regenerated"] += 1
+        student_question = session_data.get("plan_question")
+        try:
+            if student_question:
+                plan = await FollowUpQuestionGenerator().generate(student_question)
+                self._extend(session_data, plan["questions_and_answers"])
+        except Exception as e:
+            logger.warning(f"Follow-up plan regeneration for {session_id} failed: {e}")
+        self._complete(session_data)
+
+    @staticmethod
+    def _extend(session_data: dict, items: List[Dict]):
+        questions_and_answers = session_data["questions_and_answers"]
+        if len(items) > len(questions_and_answers):
+            session_data["questions_and_answers"] = (
+                questions_and_answers + items[len(questions_and_answers):]
+            )
+
+    @staticmethod
+    def _complete(session_data: dict):
+        session_data["plan_complete"] = True
+        session_data.pop("plan_question", None)
+
+    def discard(self, session_id: str):
+        plan = self._plans.pop(session_id)
+        if plan is not None and plan.task is not None and not plan.task.done():
+            plan.task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = self._first_item_seconds
+        return dict(
+            self.metrics,
+            enabled=self.enabled,
+            in_progress=len(self._plans),
+            avg_first_question_seconds=sum(samples) / len(samples) if samples else None,
+        )
+
+
+_plan_streamer: Optional[PlanStreamer] = None
+
+
+def get_plan_streamer() -> PlanStreamer:
+    """
+    Return the process-wide follow-up plan streamer.
+    """
+    global _plan_streamer
+    if _plan_streamer is None:
+        _plan_streamer = PlanStreamer(
+            max_sessions=TUTOR_PLAN_MAX_SESSIONS,
+            wait_timeout=TUTOR_PLAN_WAIT_SECONDS,
+            enabled=TUTOR_PLAN_STREAMING_ENABLED,
+        )
+    return _plan_streamer
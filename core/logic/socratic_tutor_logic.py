@@ -1,11 +1,46 @@
+import asyncio
+import logging
 import uuid
+from fastapi import HTTPException
+from configs.config import TUTOR_COMBINED_EVALUATION_ENABLED, TUTOR_PHRASING_CONCURRENCY
 from core.services.followup_question import FollowUpQuestionGenerator
 from core.services.tutor_question_generator import TutorQuestionGenerator
 from core.services.tutor_guidance_generator import TutorGuidanceGenerator
-from core.services.answer_checker import AnswerChecker
+from core.services.tiered_grader import get_tiered_grader
+from core.services.local_answer_checker import get_local_answer_checker
+from core.logic.plan_stream import get_plan_streamer
+from core.logic.speculation import get_turn_speculator
 from schemas.socratic_tutor_schemas import QuestionResponse
 
-def generate_socratic_response(student_question: str) -> list[dict]:
+logger = logging.getLogger(__name__)
+
+# Incorrect answers allowed per question before the session ends
+MAX_ATTEMPTS = 3
+
+
+async def phrase_questions(
+    questions: list[str], max_concurrency: int = TUTOR_PHRASING_CONCURRENCY
+) -> list[str]:
+    """
+    Rephrase questions in a tutor-like tone concurrently, with at most
+    `max_concurrency` calls in flight. A question whose call fails keeps its
+    original wording.
+    """
+    tutor_generator = TutorQuestionGenerator()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def phrase(question: str) -> str:
+        async with semaphore:
+            try:
+                return await tutor_generator.ask_question(question)
+            except Exception as e:
+                logger.warning(f"Failed to rephrase question, using original: {e}")
+                return question
+
+    return await asyncio.gather(*(phrase(question) for question in questions))
+
+
+async def generate_socratic_response(student_question: str) -> list[dict]:
     """
     Generate Socratic Tutor follow-up questions and expected answers.
 
@@ -13,7 +48,7 @@ def generate_socratic_response(student_question: str) -> list[dict]:
     :return: A list of dictionaries with follow-up questions and expected answers.
     """
     # Step 1: Generate follow-up questions and answers
-    followup_qa = FollowUpQuestionGenerator().generate(student_question)
+    followup_qa = await FollowUpQuestionGenerator().generate(student_question)
     if isinstance(followup_qa, str):
         raise ValueError("Error in generating follow-up questions")
 
@@ -21,71 +56,171 @@ def generate_socratic_response(student_question: str) -> list[dict]:
     if not questions_and_answers:
         raise ValueError("No follow-up questions generated")
 
-    # Step 2: Initialize helpers
-    tutor_generator = TutorQuestionGenerator()
-    guidance_generator = TutorGuidanceGenerator()
-
-    # Step 3: Construct tutor-style questions
-    tutor_data = []
-    for item in questions_and_answers:
-        question = item.get("question")
-        expected_answer = item.get("answer")
+    # Step 2: Keep only complete question/answer pairs
+    items = [
+        (item.get("question"), item.get("answer"))
+        for item in questions_and_answers
+        if item.get("question") and item.get("answer")
+    ]
 
-        if not question or not expected_answer:
-            continue
+    # Step 3: Construct tutor-style questions concurrently
+    tutor_questions = await phrase_questions([question for question, _ in items])
 
-        # Generate a tutor-like question
-        tutor_question = tutor_generator.ask_question(question)
-        tutor_data.append({"question": tutor_question, "expected_answer": expected_answer})
+    return [
+        {"question": tutor_question, "expected_answer": expected_answer}
+        for tutor_question, (_, expected_answer) in zip(tutor_questions, items)
+    ]
 
-    return tutor_data
-
-def start_tutoring_session(student_question: str, sessions: dict, session_id: str):
-    """Generate follow-up questions and start a new session."""
-    followup_qa = FollowUpQuestionGenerator().generate(student_question)
-    if not followup_qa or "questions_and_answers" not in followup_qa:
-        raise ValueError("Error generating follow-up questions.")
+def ask_question(questions_and_answers: list[dict], index: int, phrasing: str = None) -> str:
+    """
+    Return the wording of the question at `index` as shown to the student.
+    The first wording shown (`phrasing` if given, the plan's otherwise) is
+    stored on the question, so re-asking it never changes its wording.
+    """
+    item = questions_and_answers[index]
+    if "tutor_question" not in item:
+        # Replace rather than update the item so the session sees the change
+        item = questions_and_answers[index] = dict(
+            item, tutor_question=phrasing or item["question"]
+        )
+    return item["tutor_question"]
+
+async def start_tutoring_session(student_question: str, session_data: dict, session_id: str):
+    """
+    Generate follow-up questions and start a new session. With plan
+    streaming, the session starts as soon as the first question is
+    generated and the rest of the plan is filled in the background.
+    """
+    plans = get_plan_streamer()
+    speculator = get_turn_speculator()
+    if plans.enabled:
+        # Questions streamed after the first one can still be prefetched
+        plan = await plans.start(
+            session_id,
+            student_question,
+            on_item=lambda items: speculator.extend(session_id, items),
+        )
+        questions_and_answers = list(plan.items)
+        plan_complete = plan.done
+    else:
+        followup_qa = await FollowUpQuestionGenerator().generate(student_question)
+        if not followup_qa or "questions_and_answers" not in followup_qa:
+            raise ValueError("Error generating follow-up questions.")
+        questions_and_answers = followup_qa["questions_and_answers"]
+        plan_complete = True
 
     # session_id = str(uuid.uuid4())
-    questions_and_answers = followup_qa["questions_and_answers"]
-
-    sessions[session_id].update({
+    session_data.update({
         "questions_and_answers": questions_and_answers,
+        "plan_complete": plan_complete,
         "current_question_index": 0,  # Initialize the current question index
         "attempts": 0  # Initialize the attempts count
     })
 
-    first_question = questions_and_answers[0]["question"]
+    if not plan_complete:
+        # Lets another worker generate the rest of the plan if it has to
+        session_data["plan_question"] = student_question
+
+    first_question = ask_question(questions_and_answers, 0)
+    speculator.schedule(session_id, 0, questions_and_answers)
     return QuestionResponse(session_id=session_id, question=first_question)
 
-def submit_tutor_answer(user_answer: str, sessions: dict, session_id: str):
-    """Evaluate the student's answer and provide feedback."""
-    session_data = sessions[session_id]
+async def grade_answer(
+    question: str, expected_answer: str, user_answer: str, with_guidance: bool
+) -> dict:
+    """
+    Grade an answer locally when the outcome is certain, and with the LLM
+    otherwise, escalating low-confidence verdicts to larger models. With
+    `with_guidance`, the LLM also writes guidance for an incorrect answer
+    in the same call.
+    """
+    local_checker = get_local_answer_checker()
+    result = local_checker.check(expected_answer, user_answer) if local_checker else None
+    if result is not None:
+        return result
+    return await get_tiered_grader().grade(
+        question,
+        expected_answer,
+        user_answer,
+        with_guidance=with_guidance and TUTOR_COMBINED_EVALUATION_ENABLED,
+    )
+
+async def submit_tutor_answer(user_answer: str, session_data: dict, session_id: str):
+    """
+    Evaluate the student's answer and provide feedback. Phrasing and
+    guidance precomputed in the background are used when available, and
+    the next question is waited for if the plan is still being generated.
+    """
+    speculator = get_turn_speculator()
+    plans = get_plan_streamer()
+    await plans.sync(session_id, session_data)
     current_index = session_data["current_question_index"]
     questions_and_answers = session_data["questions_and_answers"]
 
     current_question = questions_and_answers[current_index]["question"]
     expected_answer = questions_and_answers[current_index]["answer"]
 
-    result = AnswerChecker().check_answer(current_question, expected_answer, user_answer)
+    # Guidance is only needed if another attempt follows and none is precomputed
+    with_guidance = (
+        session_data["attempts"] + 1 < MAX_ATTEMPTS
+        and not speculator.has_guidance(session_id, current_index, user_answer)
+    )
+    result = await grade_answer(current_question, expected_answer, user_answer, with_guidance)
     is_correct = result.get("result") == "correct"
 
     if is_correct:
-        session_data["current_question_index"] += 1
+        next_index = current_index + 1
+        try:
+            await plans.sync(session_id, session_data, next_index + 1)
+        except asyncio.TimeoutError:
+            # The session is left on the current question so the answer can
+            # be resubmitted once the next question has been generated
+            raise HTTPException(
+                status_code=503,
+                detail="The next question is still being generated. Please try again.",
+            )
+        session_data["current_question_index"] = next_index
         session_data["attempts"] = 0
-        if session_data["current_question_index"] < len(questions_and_answers):
-            next_question = questions_and_answers[session_data["current_question_index"]]["question"]
+        questions_and_answers = session_data["questions_and_answers"]
+        if next_index < len(questions_and_answers):
+            next_question = ask_question(
+                questions_and_answers,
+                next_index,
+                speculator.take_phrasing(session_id, next_index),
+            )
+            speculator.schedule(session_id, next_index, questions_and_answers)
             return QuestionResponse(session_id=session_id, question=next_question, correct=True)
         else:
             # del conversations[session_id]
+            speculator.discard(session_id)
+            plans.discard(session_id)
             return QuestionResponse(session_id=session_id, question="Session complete!", correct=True)
     else:
         session_data["attempts"] += 1
-        if session_data["attempts"] < 3:
-            guidance = TutorGuidanceGenerator().generate_guidance(expected_answer, user_answer)
-            return QuestionResponse(session_id=session_id, question=current_question, guidance=guidance, correct=False)
+        if session_data["attempts"] < MAX_ATTEMPTS:
+            guidance = (
+                result.get("guidance")
+                or await speculator.take_guidance(session_id, current_index, user_answer)
+                or await TutorGuidanceGenerator().generate_guidance(expected_answer, user_answer)
+            )
+            return QuestionResponse(
+                session_id=session_id,
+                question=ask_question(questions_and_answers, current_index),
+                guidance=guidance,
+                correct=False,
+            )
         else:
-            del session_data[session_id]
+            speculator.discard(session_id)
+            plans.discard(session_id)
+            for key in (
+                "questions_and_answers",
+                "plan_complete",
+                "plan_question",
+                "current_question_index",
+                "attempts",
+            ):
+                session_data.pop(key, None)
+            session_data["flow_status"] = "general"
             return QuestionResponse(session_id=session_id, question=f"The correct answer was: {expected_answer}. Session ended.", correct=False)
         
 
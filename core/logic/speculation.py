@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from configs.config import (
+    TUTOR_SPECULATION_ENABLED,
+    TUTOR_SPECULATION_MAX_SESSIONS,
+    TUTOR_SPECULATIVE_WRONG_ANSWERS,
+)
+from core.llm_services.llm_scheduler import PRIORITY_BACKGROUND
+from core.services.tutor_guidance_generator import TutorGuidanceGenerator
+from core.services.tutor_question_generator import TutorQuestionGenerator
+from core.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Answers treated as the same predictable wrong answer
+ANSWER_ALIASES = {
+    "idk": "i don't know",
+    "i dont know": "i don't know",
+    "dont know": "i don't know",
+    "don't know": "i don't know",
+    "no idea": "i don't know",
+    "not sure": "i don't know",
+    "dunno": "i don't know",
+}
+
+
+def normalize_answer(answer: str) -> str:
+    normalized = " ".join(re.sub(r"[^\w\s']", " ", answer.lower()).split())
+    return ANSWER_ALIASES.get(normalized, normalized)
+
+
+class TurnSpeculator:
+    """
+    Background precomputation of the next Socratic turn.
+
+    While the student thinks about the question they were just sent, the
+    phrasing of the following question and the guidance for predictable
+    wrong answers to the current one are computed in the background lane
+    of the LLM scheduler. Results are kept per session in process memory
+    and only for the current question: moving on, ending the session or
+    eviction discards them.
+    """
+
+    def __init__(
+        self,
+        wrong_answers: List[str],
+        max_sessions: int = 1000,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.wrong_answers = [a for a in wrong_answers if a.strip()]
+        # session_id -> {"index", "phrasing": (index, task), "guidance": {answer: task}}
+        self._sessions = LRUCache(max_size=max_sessions)
+        self.metrics = {"started": 0, "hits": 0, "misses": 0, "discarded": 0}
+
+    def _start(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        # Failures only mean a cache miss; keep them out of the loop's log
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self.metrics["started"] += 1
+        return task
+
+    def _cancel(self, entry: Dict[str, Any]):
+        tasks = list(entry["guidance"].values())
+        if entry["phrasing"] is not None:
+            tasks.append(entry["phrasing"][1])
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                self.metrics["discarded"] += 1
+
+    def schedule(self, session_id: str, index: int, questions_and_answers: List[Dict]):
+        """
+        Start speculation for the question at `index`, which has just been
+        sent to the student.
+        """
+        if not self.enabled:
+            return
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            if entry["index"] == index:
+                return
+            self._cancel(entry)
+
+        entry = {"index": index, "phrasing": None, "guidance": {}}
+        self._prefetch_phrasing(entry, questions_and_answers)
+
+        expected_answer = questions_and_answers[index].get("answer")
+        if expected_answer:
+            for answer in self.wrong_answers:
+                key = normalize_answer(answer)
+                if key == normalize_answer(expected_answer) or key in entry["guidance"]:
+                    continue
+                entry["guidance"][key] = self._start(
+                    TutorGuidanceGenerator().generate_guidance(
+                        expected_answer, answer, priority=PRIORITY_BACKGROUND
+                    )
+                )
+        self._sessions.put(session_id, entry)
+
+    def extend(self, session_id: str, questions_and_answers: List[Dict]):
+        """
+        Prefetch the phrasing of the question after the current one if it
+        had not been generated yet when the current question was scheduled.
+        Called as a streamed plan grows.
+        """
+        if not self.enabled:
+            return
+        entry = self._sessions.get(session_id)
+        if entry is not None and entry["phrasing"] is None:
+            self._prefetch_phrasing(entry, questions_and_answers)
+
+    def _prefetch_phrasing(self, entry: Dict[str, Any], questions_and_answers: List[Dict]):
+        next_index = entry["index"] + 1
+        if next_index < len(questions_and_answers):
+            question = questions_and_answers[next_index]["question"]
+            entry["phrasing"] = (
+                next_index,
+                self._start(
+                    TutorQuestionGenerator().ask_question(
+                        question, priority=PRIORITY_BACKGROUND
+                    )
+                ),
+            )
+
+    def take_phrasing(self, session_id: str, index: int) -> Optional[str]:
+        """
+        Return the prefetched phrasing of the question at `index` if it is
+        ready. Never waits, since the plan's own wording can be sent as is.
+        """
+        entry = self._sessions.get(session_id)
+        phrasing = entry and entry["phrasing"]
+        if phrasing and phrasing[0] == index:
+            task = phrasing[1]
+            if task.done() and not task.cancelled() and task.exception() is None:
+                self.metrics["hits"] += 1
+                return task.result()
+        self.metrics["misses"] += 1
+        return None
+
+    def has_guidance(self, session_id: str, index: int, user_answer: str) -> bool:
+        """
+        Whether guidance for this answer to the question at `index` is
+        being precomputed.
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None or entry["index"] != index:
+            return False
+        task = entry["guidance"].get(normalize_answer(user_answer))
+        return task is not None and not task.cancelled()
+
+    async def take_guidance(
+        self, session_id: str, index: int, user_answer: str
+    ) -> Optional[str]:
+        """
+        Return precomputed guidance for a wrong answer to the question at
+        `index`, waiting for it if it is still being generated.
+        """
+        entry = self._sessions.get(session_id)
+        task = None
+        if entry is not None and entry["index"] == index:
+            task = entry["guidance"].get(normalize_answer(user_answer))
+        if task is None or task.cancelled():
+            self.metrics["misses"] += 1
+            return None
+        try:
+            guidance = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"Speculative guidance failed: {e}")
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["hits"] += 1
+        return guidance
+
+    def discard(self, session_id: str):
+        entry = self._sessions.pop(session_id)
+        if entry is not None:
+            self._cancel(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.metrics, enabled=self.enabled, sessions=len(self._sessions))
+
+
+_speculator: Optional[TurnSpeculator] = None
+
+
+def get_turn_speculator() -> TurnSpeculator:
+    """
+    Return the process-wide Socratic turn speculator.
+    """
+    global _speculator
+    if _speculator is None:
+        _speculator = TurnSpeculator(
+            wrong_answers=TUTOR_SPECULATIVE_WRONG_ANSWERS,
+            max_sessions=TUTOR_SPECULATION_MAX_SESSIONS,
+            enabled=TUTOR_SPECULATION_ENABLED,
+        )
+    return _speculator
@@ -1,14 +1,8 @@
-class CheckAnswerPrompt:
-    """
-    Class for constructing the answer check prompt.
-    """
+from core.prompt.prompt_registry import get_prompt_registry
 
-    @staticmethod
-    def construct(question: str, expected_answer: str, user_answer: str) -> str:
-        """
-        Construct the prompt for the LLM.
-        """
-        return f"""
+CHECK_ANSWER_TEMPLATE = get_prompt_registry().register(
+    "check_answer",
+    """
             You are an AI that checks answers for correctness.
 
             - The question is: "{question}"
@@ -17,9 +11,28 @@ class CheckAnswerPrompt:
 
             Based on the user's answer compared to the expected answer, determine if the user's answer is **correct** or **incorrect**.
 
+            Also rate your confidence in this verdict from 0 (guessing) to 1 (certain).
+
             Output only in valid JSON format like this:
 
             {{
-                "result": "correct"  # or "incorrect"
+                "result": "correct",  # or "incorrect"
+                "confidence": 0.9
             }}
-            """
+            """,
+)
+
+
+class CheckAnswerPrompt:
+    """
+    Class for constructing the answer check prompt.
+    """
+
+    @staticmethod
+    def construct(question: str, expected_answer: str, user_answer: str) -> str:
+        """
+        Construct the prompt for the LLM.
+        """
+        return CHECK_ANSWER_TEMPLATE.render(
+            question=question, expected_answer=expected_answer, user_answer=user_answer
+        )
@@ -0,0 +1,39 @@
+from core.prompt.prompt_registry import get_prompt_registry
+
+EVALUATE_ANSWER_TEMPLATE = get_prompt_registry().register(
+    "evaluate_answer",
+    """
+            You are a friendly tutor who checks a student's answer and, if it is wrong, helps them get to the correct answer.
+
+            - The question is: "{question}"
+            - The expected answer is: "{expected_answer}"
+            - The user's answer is: "{user_answer}"
+
+            Based on the user's answer compared to the expected answer, determine if the user's answer is **correct** or **incorrect**, and rate your confidence in this verdict from 0 (guessing) to 1 (certain).
+
+            If it is incorrect, also write guidance: steps that lead the student to the correct answer, in a friendly, encouraging tone. Keep the guidance short and clear. If it is correct, leave the guidance empty.
+
+            Output only in valid JSON format like this:
+
+            {{
+                "result": "incorrect",
+                "confidence": 0.9,
+                "guidance": "Good try! ..."
+            }}
+            """,
+)
+
+
+class EvaluateAnswerPrompt:
+    """
+    Class for constructing the combined answer check and guidance prompt.
+    """
+
+    @staticmethod
+    def construct(question: str, expected_answer: str, user_answer: str) -> str:
+        """
+        Construct the prompt for the LLM.
+        """
+        return EVALUATE_ANSWER_TEMPLATE.render(
+            question=question, expected_answer=expected_answer, user_answer=user_answer
+        )
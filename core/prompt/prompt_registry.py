@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import string
+import time
+from typing import Any, Dict, Optional
+
+from configs.config import PROMPT_INSTRUCTIONS_PATH, PROMPT_RELOAD_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class PromptTemplate:
+    """
+    A prompt template in `str.format` syntax, parsed once. `literal`
+    templates are used as is, without placeholders.
+
+    `hash` identifies the template text, so caches (and provider-side
+    prefix caching) can key on it instead of hashing rendered prompts.
+    """
+
+    def __init__(self, name: str, text: str, literal: bool = False):
+        self.name = name
+        self.text = text
+        self.hash = content_hash(text)
+        self.fields = set() if literal else {
+            field for _, field, _, _ in string.Formatter().parse(text) if field
+        }
+
+    def render(self, **values: Any) -> str:
+        missing = self.fields - values.keys()
+        if missing:
+            raise ValueError(f"Prompt '{self.name}' is missing values for {sorted(missing)}.")
+        return self.text.format(**values) if self.fields else self.text
+
+
+def format_instruction(scenario: str, data: Dict[str, Any]) -> str:
+    """
+    Validate a scenario from the instructions file and format it as a
+    system instruction.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Scenario '{scenario}' must be an object.")
+    description = data.get("description", "No description available.")
+    steps = data.get("steps", [])
+    if not isinstance(description, str) or not isinstance(steps, list):
+        raise ValueError(f"Scenario '{scenario}' needs a string description and a list of steps.")
+    if not all(isinstance(step, str) for step in steps):
+        raise ValueError(f"Scenario '{scenario}' has steps that are not strings.")
+    return f"{description}\n" + "\n".join(f"* {step}" for step in steps)
+
+
+class PromptRegistry:
+    """
+    Prompt templates and scenario system instructions, kept in memory.
+
+    Templates are registered by the prompt classes when imported. Scenario
+    instructions are loaded from `instructions_path`, validated and
+    formatted once; the file's modification time is checked at most every
+    `reload_interval` seconds and the instructions are reloaded when it
+    changes. A file that fails to load or validate is logged and the
+    previously loaded instructions stay in use.
+    """
+
+    def __init__(self, instructions_path: str, reload_interval: float = 2.0):
+        self.instructions_path = instructions_path
+        self.reload_interval = reload_interval
+        self.templates: Dict[str, PromptTemplate] = {}
+        self.instructions: Dict[str, PromptTemplate] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.metrics = {"loads": 0, "failed_loads": 0}
+
+    def register(self, name: str, text: str) -> PromptTemplate:
+        template = PromptTemplate(name, text)
+        self.templates[name] = template
+        return template
+
+    def template(self, name: str) -> PromptTemplate:
+        return self.templates[name]
+
+    def load(self):
+        """
+        (Re)load the scenario instructions file.
+        """
+        mtime = None
+        try:
+            mtime = os.path.getmtime(self.instructions_path)
+            with open(self.instructions_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if not isinstance(data, dict):
+                raise ValueError("The instructions file must contain an object.")
+            instructions = {
+                scenario: PromptTemplate(
+                    scenario, format_instruction(scenario, entry), literal=True
+                )
+                for scenario, entry in data.items()
+            }
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError is a ValueError
+            self.metrics["failed_loads"] += 1
+            # Retry once the file changes again
+            self._mtime = mtime
+            logger.error(f"Failed to load prompt instructions from {self.instructions_path}: {e}")
+            return
+        self.instructions = instructions
+        self._mtime = mtime
+        self.metrics["loads"] += 1
+        logger.info(f"Loaded {len(instructions)} prompt instructions")
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if self._checked_at and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.instructions_path)
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._mtime:
+            self.load()
+
+    def instruction(self, scenario: str) -> Optional[PromptTemplate]:
+        """
+        Return the system instruction of a scenario, or None if there is
+        no such scenario.
+        """
+        self._reload_if_changed()
+        return self.instructions.get(scenario)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.metrics,
+            instructions={name: t.hash for name, t in self.instructions.items()},
+            templates={name: t.hash for name, t in self.templates.items()},
+        )
+
+
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    Return the process-wide prompt registry.
+    """
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry(
+            PROMPT_INSTRUCTIONS_PATH, reload_interval=PROMPT_RELOAD_INTERVAL
+        )
+    return _prompt_registry
@@ -1,36 +1,20 @@
-import json
+from core.prompt.prompt_registry import PromptTemplate, get_prompt_registry
 
 
 class System_Instruction:
 
     @staticmethod
-    def load_instructions():
-        """Load instructions from a JSON file."""
-        try:
-            with open("core/prompt/instruction.json", "r") as file:
-                instructions = json.load(file)
-            return instructions
-        except FileNotFoundError:
-            print("Error: The instructions JSON file is missing.")
-            return {}
-        except json.JSONDecodeError:
-            print("Error: Failed to decode the JSON file.")
-            return {}
-
-    def system_instruction(scenario):
-        instructions = System_Instruction.load_instructions()
-        # print(instructions)
-        if scenario in instructions:
-            instruction_data = instructions[scenario]
-            description = instruction_data.get(
-                "description", "No description available."
+    def instruction_template(scenario) -> PromptTemplate:
+        """
+        Return the system instruction of a scenario from the prompt registry
+        (loaded once and reloaded when the instructions file changes).
+        """
+        instruction = get_prompt_registry().instruction(scenario)
+        if instruction is None:
+            return PromptTemplate(
+                scenario, f"No instructions found for scenario '{scenario}'.", literal=True
             )
-            steps = instruction_data.get("steps", [])
+        return instruction
 
-            # Format the output based on the instructions
-            formatted_instructions = f"{description}\n"
-            formatted_instructions += "\n".join([f"* {step}" for step in steps])
-
-            return formatted_instructions
-        else:
-            return f"No instructions found for scenario '{scenario}'."
+    def system_instruction(scenario):
+        return System_Instruction.instruction_template(scenario).text
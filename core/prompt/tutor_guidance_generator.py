@@ -1,3 +1,17 @@
+from core.prompt.prompt_registry import get_prompt_registry
+
+TUTOR_GUIDANCE_TEMPLATE = get_prompt_registry().register(
+    "tutor_guidance",
+    """
+            The correct answer is: '{correct_answer}'. The student's answer is: '{student_answer}', which is incorrect.
+
+            Based on the student's answer and its correctness, provide steps to guide them to the correct answer.
+
+            Use a friendly, encouraging tone in your responses. Make sure to keep your response short and clear.
+            """,
+)
+
+
 class TutorGuidanceGeneratorPrompt:
     """
     Class for constructing the tutor question generator prompt.
@@ -8,10 +22,6 @@ class TutorGuidanceGeneratorPrompt:
         """
         Construct the prompt for generating step-by-step guidance.
         """
-        return f"""
-            The correct answer is: '{correct_answer}'. The student's answer is: '{student_answer}', which is incorrect.
-
-            Based on the student's answer and its correctness, provide steps to guide them to the correct answer.
-
-            Use a friendly, encouraging tone in your responses. Make sure to keep your response short and clear.
-            """
+        return TUTOR_GUIDANCE_TEMPLATE.render(
+            correct_answer=correct_answer, student_answer=student_answer
+        )
@@ -1,3 +1,17 @@
+from core.prompt.prompt_registry import get_prompt_registry
+
+TUTOR_QUESTION_TEMPLATE = get_prompt_registry().register(
+    "tutor_question",
+    """
+            You are a helpful tutor. Ask the following question in a concise, teacher-like tone, encouraging them to think critically but keeping the question short:
+
+            The question is: "{question}"
+
+            Make sure the phrasing is supportive, but the question is brief and to the point.
+        """,
+)
+
+
 class TutorQuestionGeneratorPrompt:
     """
     Class for constructing the tutor question generator prompt.
@@ -8,10 +22,4 @@ class TutorQuestionGeneratorPrompt:
         """
         Construct the prompt for the LLM.
         """
-        return f"""
-            You are a helpful tutor. Ask the following question in a concise, teacher-like tone, encouraging them to think critically but keeping the question short:
-
-            The question is: "{question}"
-
-            Make sure the phrasing is supportive, but the question is brief and to the point.
-        """
+        return TUTOR_QUESTION_TEMPLATE.render(question=question)
@@ -1,5 +1,7 @@
 from core.prompt.check_answer import CheckAnswerPrompt
 from core.utils.api_utils import APIUtils
+from core.utils.structured_output import structured_response_format
+from schemas.llm_output_schemas import CheckResult
 
 
 class AnswerChecker:
@@ -7,18 +9,31 @@ class AnswerChecker:
     Class to check if a user's answer is correct compared to the expected answer.
     """
 
-    def __init__(self, model_name: str = "mistral-7b", api_type: str = "openrouter"):
+    def __init__(
+        self,
+        model_name: str = None,
+        api_type: str = None,
+        prompt_type: str = "check_answer",
+    ):
         """
-        Initialize the AnswerChecker with the specified model.
+        Initialize the AnswerChecker with the specified model. Without a
+        model, it is routed per call for `prompt_type`, e.g.
+        "check_answer_escalated" for the larger grading models.
         """
         self.api_utils = APIUtils(model_name=model_name, api_type=api_type)
+        self.prompt_type = prompt_type
 
-    def check_answer(self, question: str, expected_answer: str, user_answer: str):
+    async def check_answer(self, question: str, expected_answer: str, user_answer: str):
         """
         Check if the user's answer is correct compared to the expected answer.
         """
         prompt = CheckAnswerPrompt.construct(question, expected_answer, user_answer)
-        response = self.api_utils.generate_response(
-            [{"role": "user", "content": prompt}]
+        response = await self.api_utils.generate_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type=self.prompt_type,
+            response_format=structured_response_format(),
+            schema=CheckResult,
         )
-        return self.api_utils.parse_json_response(response)
+        result = self.api_utils.parse_json_response(response, CheckResult)
+        result["model"] = response.model
+        return result
@@ -0,0 +1,49 @@
+from typing import Any, Dict
+
+from core.prompt.evaluate_answer import EvaluateAnswerPrompt
+from core.utils.api_utils import APIUtils
+from core.utils.structured_output import structured_response_format
+from schemas.llm_output_schemas import AnswerEvaluation
+
+
+class AnswerEvaluator:
+    """
+    Class to check a user's answer and generate guidance for it in a single
+    LLM call.
+    """
+
+    def __init__(
+        self,
+        model_name: str = None,
+        api_type: str = None,
+        prompt_type: str = "evaluate_answer",
+    ):
+        """
+        Initialize the AnswerEvaluator with the specified model. Without a
+        model, it is routed per call for `prompt_type`, e.g.
+        "evaluate_answer_escalated" for the larger grading models.
+        """
+        self.api_utils = APIUtils(model_name=model_name, api_type=api_type)
+        self.prompt_type = prompt_type
+
+    async def evaluate(
+        self, question: str, expected_answer: str, user_answer: str
+    ) -> Dict[str, Any]:
+        """
+        Return the verdict as `result` with its `confidence` and, for
+        incorrect answers, the guidance for the student as `guidance`.
+        """
+        prompt = EvaluateAnswerPrompt.construct(question, expected_answer, user_answer)
+        response = await self.api_utils.generate_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type=self.prompt_type,
+            response_format=structured_response_format(),
+            schema=AnswerEvaluation,
+        )
+        evaluation = self.api_utils.parse_json_response(response, AnswerEvaluation)
+        if evaluation["result"] == "correct" or not (evaluation["guidance"] or "").strip():
+            evaluation["guidance"] = None
+        else:
+            evaluation["guidance"] = evaluation["guidance"].strip()
+        evaluation["model"] = response.model
+        return evaluation
@@ -1,5 +1,9 @@
+from typing import AsyncIterator, Dict
+
 from core.utils.api_utils import APIUtils
 from core.prompt.followup_prompt import FollowUpPrompt
+from core.utils.structured_output import stream_items, structured_response_format
+from schemas.llm_output_schemas import FollowUpPlan
 
 
 class FollowUpQuestionGenerator:
@@ -7,14 +11,14 @@ class FollowUpQuestionGenerator:
     Main class for generating follow-up questions.
     """
 
-    def __init__(self, model_name: str = "gemini", api_type: str = "openrouter"):
+    def __init__(self, model_name: str = None, api_type: str = None):
         """
         Initialize the FollowUpQuestionGenerator with a model.
-        :param model_name: The name of the model to use (default: gemini).
+        :param model_name: The name of the model to use (default: routed per call).
         """
         self.api_utils = APIUtils(model_name=model_name, api_type=api_type)
 
-    def generate(self, student_question: str, max_questions: int = 10):
+    async def generate(self, student_question: str, max_questions: int = 10):
         """
         Generate follow-up questions for a given student question.
         """
@@ -22,10 +26,30 @@ class FollowUpQuestionGenerator:
         prompt = FollowUpPrompt.construct(student_question, max_questions)
 
         # Step 2: Get the response from the selected model
-        response = self.api_utils.generate_response(
-            [{"role": "user", "content": prompt}]
+        response = await self.api_utils.generate_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type="followup",
+            response_format=structured_response_format(),
+            schema=FollowUpPlan,
         )
 
         print(response)
-        # Step 3: Parse the response into JSON
-        return self.api_utils.parse_json_response(response)
+        # Step 3: Parse the response into a validated follow-up plan
+        return self.api_utils.parse_json_response(response, FollowUpPlan)
+
+    async def generate_stream(
+        self, student_question: str, max_questions: int = 10
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the follow-up plan, yielding each question/answer pair as
+        soon as it has been generated.
+        """
+        prompt = FollowUpPrompt.construct(student_question, max_questions)
+        chunks = self.api_utils.stream_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type="followup",
+            response_format=structured_response_format(),
+            schema=FollowUpPlan,
+        )
+        async for item in stream_items(chunks, FollowUpPlan, "questions_and_answers"):
+            yield item
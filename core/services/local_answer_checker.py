@@ -0,0 +1,349 @@
+import ast
+import math
+import operator
+import random
+import re
+from typing import Any, Dict, Optional
+
+from configs.config import LOCAL_ANSWER_CHECK_ENABLED, LOCAL_ANSWER_REL_TOLERANCE
+
+try:
+    import sympy
+except ImportError:  # pragma: no cover - optional dependency
+    sympy = None
+
+CORRECT = "correct"
+INCORRECT = "incorrect"
+
+ARTICLES = {"a", "an", "the"}
+
+WORD_NUMBERS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "hundred": 100, "thousand": 1000,
+}
+
+NUMBER_PATTERN = re.compile(
+    r"^[-+]?(\d+(\.\d*)?|\.\d+)(e[-+]?\d+)?(/[-+]?(\d+(\.\d*)?|\.\d+))?%?$"
+)
+# Commas are only accepted as thousands separators ("1,000,000"); other
+# commas separate several values ("2, 3")
+THOUSANDS_PATTERN = re.compile(r"^[-+]?\d{1,3}(,\d{3})+(\.\d*)?%?$")
+
+FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "log": math.log,
+    "ln": math.log,
+    "exp": math.exp,
+    "abs": abs,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+MAX_EXPONENT = 100
+SAMPLE_POINTS = 5
+
+
+class UnsupportedExpression(ValueError):
+    """
+    Raised for input the safe evaluator does not accept.
+    """
+
+
+def normalize_text(text: str) -> str:
+    words = re.sub(r"[^\w\s.\-/%]", " ", text.lower()).split()
+    # Articles are kept when they are the whole answer ("a" is not "the")
+    kept = [word for word in words if word not in ARTICLES] or words
+    return " ".join(word.strip(".") for word in kept).strip()
+
+
+def parse_number(text: str) -> Optional[float]:
+    """
+    Parse a plain number, fraction, percentage or number word.
+    """
+    text = text.strip().lower()
+    if "," in text:
+        if not THOUSANDS_PATTERN.match(text):
+            return None
+        text = text.replace(",", "")
+    if text in WORD_NUMBERS:
+        return float(WORD_NUMBERS[text])
+    if not NUMBER_PATTERN.match(text):
+        return None
+    percent = text.endswith("%")
+    text = text.rstrip("%")
+    try:
+        if "/" in text:
+            numerator, denominator = text.split("/")
+            value = float(numerator) / float(denominator)
+        else:
+            value = float(text)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return value / 100 if percent else value
+
+
+def _is_percent(text: str) -> bool:
+    return text.strip().endswith("%")
+
+
+def _decimals(text: str) -> int:
+    """
+    Decimals of a number's value as written; a percentage has two more.
+    """
+    match = re.search(r"\.(\d+)", text)
+    return (len(match.group(1)) if match else 0) + (2 if _is_percent(text) else 0)
+
+
+def _rounds_to(value: float, decimals: int, rounded: float) -> bool:
+    # Tolerates binary representation errors such as 33.3 / 100
+    return math.isclose(round(value, decimals), rounded, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def to_python_syntax(expression: str) -> str:
+    """
+    Rewrite common math notation (^, ×, ÷, implicit multiplication) into
+    Python expression syntax.
+    """
+    expression = expression.strip().lower()
+    expression = expression.replace("^", "**").replace("×", "*").replace("·", "*")
+    expression = expression.replace("÷", "/").replace("−", "-")
+    # 2x -> 2*x, 2( -> 2*(, )( -> )*(, )x -> )*x
+    expression = re.sub(r"(\d)\s*([a-z(])", r"\1*\2", expression)
+    expression = re.sub(r"\)\s*([\w(])", r")*\1", expression)
+    # x( -> x*( for single-letter variables, but keep function calls
+    expression = re.sub(
+        r"\b([a-z])\s*\(", lambda m: f"{m.group(1)}*(", expression
+    )
+    return expression
+
+
+def parse_expression(expression: str) -> ast.Expression:
+    """
+    Parse an arithmetic expression, accepting only numbers, single-letter
+    variables, known constants and functions, and arithmetic operators.
+    """
+    try:
+        tree = ast.parse(to_python_syntax(expression), mode="eval")
+    except SyntaxError as e:
+        raise UnsupportedExpression(str(e))
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load)) or type(node) in BINARY_OPERATORS:
+            continue
+        if isinstance(node, (ast.BinOp, ast.UnaryOp)) or type(node) in UNARY_OPERATORS:
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            continue
+        if isinstance(node, ast.Name) and (
+            len(node.id) == 1 or node.id in CONSTANTS or node.id in FUNCTIONS
+        ):
+            continue
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in FUNCTIONS
+            and len(node.args) == 1
+            and not node.keywords
+        ):
+            continue
+        raise UnsupportedExpression(f"Unsupported element: {type(node).__name__}")
+    return tree
+
+
+def variables(tree: ast.Expression) -> set:
+    called = {
+        node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call)
+    }
+    return {
+        node.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name)
+        and node.id not in called
+        and node.id not in CONSTANTS
+    }
+
+
+def evaluate(node: ast.AST, values: Dict[str, float]) -> float:
+    """
+    Evaluate a tree accepted by `parse_expression`.
+    """
+    if isinstance(node, ast.Expression):
+        return evaluate(node.body, values)
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in values:
+            return values[node.id]
+        return CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPERATORS[type(node.op)](evaluate(node.operand, values))
+    if isinstance(node, ast.BinOp):
+        left = evaluate(node.left, values)
+        right = evaluate(node.right, values)
+        if isinstance(node.op, ast.Pow) and abs(right) > MAX_EXPONENT:
+            raise UnsupportedExpression("Exponent too large")
+        return BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.Call):
+        return FUNCTIONS[node.func.id](evaluate(node.args[0], values))
+    raise UnsupportedExpression(f"Unsupported element: {type(node).__name__}")
+
+
+class LocalAnswerChecker:
+    """
+    Grade answers locally when the outcome is certain.
+
+    Answers are compared by normalized text, then as numbers (integers
+    exactly, other numbers with a relative tolerance) and then as algebraic
+    expressions, using sympy when it is installed and a safe evaluator at
+    random points otherwise. `check` returns None for answers that need
+    the LLM answer checker: free text that does not match exactly, lists
+    of values, percentages for bare numbers, numbers that only match after
+    rounding either side, and numeric expressions or fractions that do
+    not match.
+    """
+
+    def __init__(self, rel_tolerance: float = 1e-6):
+        self.rel_tolerance = rel_tolerance
+        self.metrics = {"correct": 0, "incorrect": 0, "ambiguous": 0}
+
+    def check(self, expected_answer: str, user_answer: str) -> Optional[Dict[str, Any]]:
+        result = self._check(str(expected_answer), str(user_answer))
+        self.metrics["ambiguous" if result is None else result] += 1
+        if result is None:
+            return None
+        return {"result": result, "method": "local"}
+
+    def _check(self, expected: str, answer: str) -> Optional[str]:
+        if not answer.strip():
+            return None
+        if normalize_text(expected) == normalize_text(answer):
+            return CORRECT
+
+        expected_side = self._solution_side(expected)
+        answer_side = self._solution_side(answer, variable=expected_side[0])
+
+        result = self._compare_numbers(expected_side[1], answer_side[1])
+        if result is None:
+            result = self._compare_expressions(expected_side[1], answer_side[1])
+        return result
+
+    @staticmethod
+    def _solution_side(text: str, variable: Optional[str] = None):
+        """
+        Split "x = 4" into ("x", "4"). An answer only has its left side
+        dropped when it names the same variable as the expected answer.
+        """
+        parts = text.split("=")
+        if len(parts) == 2 and re.fullmatch(r"\s*[a-zA-Z]\s*", parts[0]):
+            name = parts[0].strip().lower()
+            if variable is None or variable == name:
+                return name, parts[1].strip()
+        return None, text.strip()
+
+    def _compare_numbers(self, expected: str, answer: str) -> Optional[str]:
+        expected_value = parse_number(expected)
+        if expected_value is None:
+            return None
+        answer_value = parse_number(answer)
+        computed = answer_value is None or "/" in answer
+        if answer_value is None:
+            try:
+                tree = parse_expression(answer)
+                if variables(tree):
+                    return None
+                answer_value = evaluate(tree, {})
+            except (UnsupportedExpression, ArithmeticError, ValueError):
+                return None
+
+        if _is_percent(expected) != _is_percent(answer):
+            # "2%" for "2" (or "50%" for "0.5") may or may not be meant alike
+            return None
+        if expected_value.is_integer() and answer_value.is_integer():
+            return CORRECT if expected_value == answer_value else INCORRECT
+        if math.isclose(expected_value, answer_value, rel_tol=self.rel_tolerance, abs_tol=1e-9):
+            return CORRECT
+        # An answer rounded to fewer decimals ("3.1" for "3.14159", "0.3"
+        # for "1/3") may be acceptable depending on the question
+        decimals = _decimals(answer)
+        if decimals < _decimals(expected) or "/" in expected:
+            if _rounds_to(expected_value, decimals, answer_value):
+                return None
+        # So may a more precise answer to a rounded expected answer
+        # ("3.14159" or "pi" for "3.14")
+        if _rounds_to(answer_value, _decimals(expected), expected_value):
+            return None
+        if computed:
+            # A fraction or expression may be in a form the expected
+            # answer does not anticipate
+            return None
+        return INCORRECT
+
+    def _compare_expressions(self, expected: str, answer: str) -> Optional[str]:
+        try:
+            expected_tree = parse_expression(expected)
+            answer_tree = parse_expression(answer)
+        except UnsupportedExpression:
+            return None
+
+        names = variables(expected_tree) | variables(answer_tree)
+        if not names:
+            return None
+
+        if sympy is not None:
+            try:
+                # Both strings already passed the whitelist in parse_expression
+                difference = sympy.simplify(
+                    sympy.sympify(to_python_syntax(expected))
+                    - sympy.sympify(to_python_syntax(answer))
+                )
+                return CORRECT if difference == 0 else INCORRECT
+            except (sympy.SympifyError, TypeError, ValueError):
+                return None
+
+        rng = random.Random(0)
+        checked = 0
+        for _ in range(SAMPLE_POINTS * 2):
+            values = {name: rng.uniform(0.5, 3.0) for name in names}
+            try:
+                left = evaluate(expected_tree, values)
+                right = evaluate(answer_tree, values)
+            except (ArithmeticError, ValueError, UnsupportedExpression):
+                continue
+            if isinstance(left, complex) or isinstance(right, complex):
+                return None
+            if not math.isclose(left, right, rel_tol=1e-9, abs_tol=1e-9):
+                return INCORRECT
+            checked += 1
+            if checked == SAMPLE_POINTS:
+                return CORRECT
+        return None
+
+
+_local_answer_checker: Optional[LocalAnswerChecker] = None
+
+
+def get_local_answer_checker() -> Optional[LocalAnswerChecker]:
+    """
+    Return the process-wide local answer checker, or None when local
+    checking is disabled.
+    """
+    global _local_answer_checker
+    if not LOCAL_ANSWER_CHECK_ENABLED:
+        return None
+    if _local_answer_checker is None:
+        _local_answer_checker = LocalAnswerChecker(rel_tolerance=LOCAL_ANSWER_REL_TOLERANCE)
+    return _local_answer_checker
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from configs.config import (
+    GRADING_CONFIDENCE_THRESHOLDS,
+    GRADING_ESCALATION_ENABLED,
+    GRADING_LOG,
+)
+from core.services.answer_checker import AnswerChecker
+from core.services.answer_evaluator import AnswerEvaluator
+
+logger = logging.getLogger(__name__)
+
+ESCALATED_SUFFIX = "_escalated"
+
+
+class TieredGrader:
+    """
+    Grade answers with the fast grading models first and escalate
+    low-confidence verdicts to the larger ones.
+
+    The first verdict is kept when its confidence reaches the threshold
+    for that verdict in `thresholds`; a verdict without a confidence is
+    escalated. The escalated verdict replaces the first one, and whether
+    the two agreed is counted (and logged to `log_path`) to tune the
+    thresholds. If the escalated call fails, the first verdict is used.
+    """
+
+    def __init__(
+        self,
+        thresholds: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+        log_path: Optional[str] = None,
+    ):
+        self.thresholds = thresholds or {}
+        self.enabled = enabled
+        self.log_path = log_path
+        self.metrics = {
+            "graded": 0,
+            "escalated": 0,
+            "escalation_failed": 0,
+            "agreed": 0,
+            "disagreed": 0,
+        }
+
+    def needs_escalation(self, result: Dict[str, Any]) -> bool:
+        confidence = result.get("confidence")
+        if confidence is None:
+            return True
+        return confidence < self.thresholds.get(result.get("result"), 0.0)
+
+    async def grade(
+        self, question: str, expected_answer: str, user_answer: str, with_guidance: bool
+    ) -> Dict[str, Any]:
+        """
+        Return the verdict as `result`, with `guidance` for an incorrect
+        answer when `with_guidance` is set.
+        """
+        prompt_type = "evaluate_answer" if with_guidance else "check_answer"
+
+        async def run(prompt_type: str) -> Dict[str, Any]:
+            if with_guidance:
+                return await AnswerEvaluator(prompt_type=prompt_type).evaluate(
+                    question, expected_answer, user_answer
+                )
+            return await AnswerChecker(prompt_type=prompt_type).check_answer(
+                question, expected_answer, user_answer
+            )
+
+        self.metrics["graded"] += 1
+        first = await run(prompt_type)
+        if not self.enabled or not self.needs_escalation(first):
+            return first
+
+        self.metrics["escalated"] += 1
+        started = time.monotonic()
+        try:
+            second = await run(prompt_type + ESCALATED_SUFFIX)
+        except Exception as e:
+            self.metrics["escalation_failed"] += 1
+            logger.warning(f"Escalated grading failed, keeping the first verdict: {e}")
+            return first
+
+        agreed = first["result"] == second["result"]
+        self.metrics["agreed" if agreed else "disagreed"] += 1
+        self._log(prompt_type, first, second, agreed, time.monotonic() - started)
+
+        if agreed and not second.get("guidance"):
+            second["guidance"] = first.get("guidance")
+        return second
+
+    def _log(
+        self,
+        prompt_type: str,
+        first: Dict[str, Any],
+        second: Dict[str, Any],
+        agreed: bool,
+        seconds: float,
+    ):
+        record = {
+            "timestamp": time.time(),
+            "prompt_type": prompt_type,
+            "first_model": first.get("model"),
+            "first_result": first["result"],
+            "first_confidence": first.get("confidence"),
+            "escalated_model": second.get("model"),
+            "escalated_result": second["result"],
+            "escalated_confidence": second.get("confidence"),
+            "agreed": agreed,
+            "escalation_seconds": round(seconds, 3),
+        }
+        logger.info(f"Grading escalation: {record}")
+        if self.log_path:
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write grading record: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        graded = self.metrics["graded"]
+        compared = self.metrics["agreed"] + self.metrics["disagreed"]
+        return dict(
+            self.metrics,
+            enabled=self.enabled,
+            thresholds=self.thresholds,
+            escalation_rate=self.metrics["escalated"] / graded if graded else None,
+            agreement_rate=self.metrics["agreed"] / compared if compared else None,
+        )
+
+
+_tiered_grader: Optional[TieredGrader] = None
+
+
+def get_tiered_grader() -> TieredGrader:
+    """
+    Return the process-wide tiered answer grader.
+    """
+    global _tiered_grader
+    if _tiered_grader is None:
+        _tiered_grader = TieredGrader(
+            thresholds=GRADING_CONFIDENCE_THRESHOLDS,
+            enabled=GRADING_ESCALATION_ENABLED,
+            log_path=GRADING_LOG or None,
+        )
+    return _tiered_grader
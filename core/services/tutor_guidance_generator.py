@@ -1,4 +1,5 @@
 from core.prompt.tutor_guidance_generator import TutorGuidanceGeneratorPrompt
+from core.llm_services.llm_scheduler import PRIORITY_INTERACTIVE
 from core.utils.api_utils import APIUtils
 
 
@@ -7,20 +8,25 @@ class TutorGuidanceGenerator:
     Class to generate questions in a tutor-like tone.
     """
 
-    def __init__(self, model_name: str = "phi3-mini", api_type: str = "openrouter"):
+    def __init__(self, model_name: str = None, api_type: str = None):
         """
         Initialize the TutorQuestionGenerator with a specific model.
-        :param model_name: The name of the model to use for generating questions.
+        :param model_name: The name of the model to use for generating questions
+            (default: routed per call).
         """
         self.api_utils = APIUtils(model_name=model_name, api_type=api_type)
 
-    def generate_guidance(self, correct_answer: str, student_answer: str) -> str:
+    async def generate_guidance(
+        self, correct_answer: str, student_answer: str, priority: str = PRIORITY_INTERACTIVE
+    ) -> str:
         """
         Generate a question in a concise, tutor-like tone.
 
         """
         prompt = TutorGuidanceGeneratorPrompt.construct(correct_answer, student_answer)
-        response = self.api_utils.generate_response(
-            [{"role": "user", "content": prompt}]
+        response = await self.api_utils.generate_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type="tutor_guidance",
+            priority=priority,
         )
         return response.message.content.strip()
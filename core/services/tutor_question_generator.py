@@ -1,4 +1,5 @@
 from core.prompt.tutor_question_generator import TutorQuestionGeneratorPrompt
+from core.llm_services.llm_scheduler import PRIORITY_INTERACTIVE
 from core.utils.api_utils import APIUtils
 
 
@@ -7,20 +8,25 @@ class TutorQuestionGenerator:
     Class to generate questions in a tutor-like tone.
     """
 
-    def __init__(self, model_name: str = "phi3-mini", api_type: str = "openrouter"):
+    def __init__(self, model_name: str = None, api_type: str = None):
         """
         Initialize the TutorQuestionGenerator with a specific model.
-        :param model_name: The name of the model to use for generating questions.
+        :param model_name: The name of the model to use for generating questions
+            (default: routed per call).
         """
         self.api_utils = APIUtils(model_name=model_name, api_type=api_type)
 
-    def ask_question(self, question: str) -> str:
+    async def ask_question(
+        self, question: str, priority: str = PRIORITY_INTERACTIVE
+    ) -> str:
         """
         Generate a question in a concise, tutor-like tone.
 
         """
         prompt = TutorQuestionGeneratorPrompt.construct(question)
-        response = self.api_utils.generate_response(
-            [{"role": "user", "content": prompt}]
+        response = await self.api_utils.generate_response(
+            [{"role": "user", "content": prompt}],
+            prompt_type="tutor_question",
+            priority=priority,
         )
         return response.message.content.strip()
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from core.session.session_state import SessionState
+from core.session.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSessionStore(SessionStore):
+    """
+    Bounded in-memory LRU of hot sessions in front of another SessionStore.
+
+    Loads of cached sessions never touch the backend. Saves only mark the
+    session dirty; dirty sessions are written to the backend in batches by a
+    background task every `flush_interval` seconds, and before they are
+    evicted; a dirty session whose flush fails stays cached, even over
+    capacity, until a later flush succeeds. Because the backend only
+    persists changes since the last flush, several turns on the same session
+    collapse into a single write.
+
+    The cache is authoritative for the sessions it holds, so it must only be
+    used where one process serves a given session (a single worker, or
+    session partitioning across nodes).
+    """
+
+    def __init__(
+        self,
+        backend: SessionStore,
+        max_sessions: int = 1000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        flush_interval: float = 2.0,
+        flush_batch_size: int = 100,
+    ):
+        self.backend = backend
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        self._entries: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._dirty = set()
+        self._memory_bytes = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "evictions_deferred": 0,
+            "flushed": 0,
+        }
+
+    @staticmethod
+    def _estimate_size(session: SessionState) -> int:
+        return len(json.dumps(session, default=str))
+
+    def _put(self, session: SessionState):
+        session_id = session.session_id
+        size = self._estimate_size(session)
+        self._memory_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+        self._entries[session_id] = session
+        self._entries.move_to_end(session_id)
+
+    def _drop(self, session_id: str):
+        self._entries.pop(session_id, None)
+        self._memory_bytes -= self._sizes.pop(session_id, 0)
+        self._dirty.discard(session_id)
+
+    def _over_capacity(self) -> bool:
+        return (
+            len(self._entries) > self.max_sessions
+            or self._memory_bytes > self.max_memory_bytes
+        )
+
+    async def _evict(self):
+        for session_id in list(self._entries):
+            if not self._over_capacity():
+                break
+            session = self._entries.get(session_id)
+            if session is None:
+                continue
+            if session_id in self._dirty and not await self._flush_one(session):
+                # Keep sessions whose turns are not persisted yet; the
+                # flusher retries them and they are evicted later
+                self.stats["evictions_deferred"] += 1
+                continue
+            self._drop(session_id)
+            self.stats["evictions"] += 1
+
+    async def load(self, session_id: str) -> Optional[SessionState]:
+        session = self._entries.get(session_id)
+        if session is not None:
+            self._entries.move_to_end(session_id)
+            self.stats["hits"] += 1
+            return session
+
+        self.stats["misses"] += 1
+        session = await self.backend.load(session_id)
+        if session is not None:
+            self._put(session)
+            await self._evict()
+        return session
+
+    def create(self, session_id: Optional[str] = None) -> SessionState:
+        return self.backend.create(session_id or self.new_session_id())
+
+    async def save(self, session: SessionState):
+        session["last_active"] = time.time()
+        self._put(session)
+        self._dirty.add(session.session_id)
+        self._ensure_flusher()
+        await self._evict()
+
+    async def delete(self, session_id: str):
+        self._drop(session_id)
+        await self.backend.delete(session_id)
+
+    async def exists(self, session_id: str) -> bool:
+        return session_id in self._entries or await self.backend.exists(session_id)
+
+    def peek(self, session_id: str) -> Optional[SessionState]:
+        """
+        Return the cached copy of a session without loading it or changing
+        its place in the LRU.
+        """
+        return self._entries.get(session_id)
+
+    async def stored_size(self, session_id: str) -> Optional[int]:
+        return await self.backend.stored_size(session_id)
+
+    async def list_idle(self, idle_before: float) -> List[str]:
+        # Cached copies may be newer than what the backend has seen
+        active = {
+            session_id
+            for session_id, session in self._entries.items()
+            if session.get("last_active", 0) >= idle_before
+        }
+        return [
+            session_id
+            for session_id in await self.backend.list_idle(idle_before)
+            if session_id not in active
+        ]
+
+    async def release(self, should_release: Callable[[str], bool]) -> int:
+        """
+        Flush and drop cached sessions matching `should_release`, e.g. when
+        their ownership moves to another node. Returns the number released.
+        """
+        released = 0
+        for session_id in [sid for sid in self._entries if should_release(sid)]:
+            session = self._entries[session_id]
+            if session_id in self._dirty and not await self._flush_one(session):
+                continue
+            self._drop(session_id)
+            released += 1
+        return released
+
+    def _ensure_flusher(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush(self.flush_batch_size)
+            except Exception as e:
+                logger.error(f"Session cache flush failed: {e}")
+
+    async def _flush_one(self, session: SessionState) -> bool:
+        """
+        Write a dirty session to the backend. Returns whether the session
+        is clean afterwards.
+        """
+        try:
+            await self.backend.save(session)
+        except Exception as e:
+            logger.error(f"Failed to flush session {session.session_id}: {e}")
+            return False
+        # A turn saved while the flush was in flight still needs writing
+        if session.changes().is_empty():
+            self._dirty.discard(session.session_id)
+        self.stats["flushed"] += 1
+        return session.session_id not in self._dirty
+
+    async def flush(self, limit: Optional[int] = None) -> int:
+        """
+        Write dirty sessions to the backend, oldest first.
+        Returns the number of sessions written.
+        """
+        batch = [
+            self._entries[session_id]
+            for session_id in list(self._entries)
+            if session_id in self._dirty
+        ][:limit]
+
+        flushed = 0
+        for session in batch:
+            if await self._flush_one(session):
+                flushed += 1
+        return flushed
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(
+            self.stats,
+            sessions=len(self._entries),
+            dirty=len(self._dirty),
+            memory_bytes=self._memory_bytes,
+        )
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await self.backend.close()
@@ -0,0 +1,304 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.session.session_state import SessionChanges, SessionState, apply_record
+from core.session.session_store import SessionStore
+from core.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class ShardedFileSessionStore(SessionStore):
+    """
+    Session store that keeps one append-only log file per session.
+
+    Files live under `root_dir/<aa>/<bb>/<session_id>.jsonl`, where the shard
+    directories come from a hash of the session id. Every save appends one
+    record holding only the changed fields; once a log grows past
+    `compact_after` records it is rewritten as a single snapshot by a
+    background thread. File I/O and locking run in worker threads so that
+    a slow disk or a running compaction never blocks the event loop.
+
+    Sessions share a fixed set of `lock_stripes` in-process locks, and log
+    lengths are only tracked for the `max_tracked_sessions` most recently
+    used sessions (an untracked session is counted again when it is next
+    loaded), so memory use does not grow with the number of sessions.
+    """
+
+    def __init__(
+        self,
+        root_dir: str = "temp_db/sessions",
+        shard_depth: int = 2,
+        compact_after: int = 50,
+        lock_stripes: int = 256,
+        max_tracked_sessions: int = 10000,
+    ):
+        self.root_dir = root_dir
+        self.shard_depth = shard_depth
+        self.compact_after = compact_after
+
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._guard = threading.Lock()
+        self._record_counts = LRUCache(max_size=max_tracked_sessions)
+
+        self._compaction_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._compaction_pending = set()
+        self._compactor: Optional[threading.Thread] = None
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        shards = [digest[i * 2 : i * 2 + 2] for i in range(self.shard_depth)]
+        return os.path.join(self.root_dir, *shards, f"{session_id}.jsonl")
+
+    def _lock(self, session_id: str) -> threading.Lock:
+        digest = hashlib.sha1(session_id.encode("utf-8")).digest()
+        return self._locks[int.from_bytes(digest[:4], "big") % len(self._locks)]
+
+    def _set_record_count(self, session_id: str, count: int):
+        with self._guard:
+            self._record_counts.put(session_id, count)
+
+    def _add_record(self, session_id: str) -> int:
+        with self._guard:
+            count = self._record_counts.get(session_id, 0) + 1
+            self._record_counts.put(session_id, count)
+            return count
+
+    @staticmethod
+    def _open_locked(path: str, mode: str, lock_type: int):
+        """
+        Open `path` and take a file lock on it, retrying if the file was
+        replaced by a compaction while we were waiting for the lock.
+        """
+        while True:
+            handle = open(path, mode, encoding="utf-8")
+            fcntl.flock(handle.fileno(), lock_type)
+            try:
+                if os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino:
+                    return handle
+            except FileNotFoundError:
+                pass
+            handle.close()
+
+    @staticmethod
+    def _read_records(handle) -> List[Dict]:
+        records = []
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn trailing write from a crashed process; skip it.
+                logger.warning(f"Skipping corrupt session record in {handle.name}")
+        return records
+
+    @staticmethod
+    def _replay(records: List[Dict]) -> Tuple[Dict, int]:
+        data = {}
+        version = 0
+        for record in records:
+            apply_record(data, record)
+            version = record.get("v", version + 1)
+        return data, version
+
+    async def load(self, session_id: str) -> Optional[SessionState]:
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            return None
+
+        records = await asyncio.to_thread(self._load_records, session_id)
+        if not records:
+            return None
+
+        data, version = self._replay(records)
+        self._set_record_count(session_id, len(records))
+        self._maybe_schedule_compaction(session_id, len(records))
+
+        session = SessionState(session_id, data, version)
+        session.mark_clean()
+        return session
+
+    def _load_records(self, session_id: str) -> List[Dict]:
+        path = self._path(session_id)
+        with self._lock(session_id):
+            try:
+                handle = self._open_locked(path, "r", fcntl.LOCK_SH)
+            except FileNotFoundError:
+                return []
+            with handle:
+                return self._read_records(handle)
+
+    async def _write(self, session: SessionState, changes: SessionChanges) -> int:
+        session_id = session.session_id
+        version = session.version + 1
+        record = changes.to_record()
+        record["session_id"] = session_id
+        record["v"] = version
+        line = json.dumps(record) + "\n"
+
+        await asyncio.to_thread(self._append, session_id, line)
+        self._maybe_schedule_compaction(session_id, self._add_record(session_id))
+        return version
+
+    def _append(self, session_id: str, line: str):
+        path = self._path(session_id)
+        with self._lock(session_id):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._open_locked(path, "a", fcntl.LOCK_EX) as handle:
+                handle.write(line)
+                handle.flush()
+
+    async def delete(self, session_id: str):
+        if not SESSION_ID_PATTERN.match(session_id or ""):
+            return
+
+        await asyncio.to_thread(self._remove, session_id)
+        with self._guard:
+            self._record_counts.pop(session_id)
+
+    def _remove(self, session_id: str):
+        with self._lock(session_id):
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                pass
+
+    async def exists(self, session_id: str) -> bool:
+        if not SESSION_ID_PATTERN.match(session_id or ""):
+            return False
+        return await asyncio.to_thread(os.path.exists, self._path(session_id))
+
+    async def stored_size(self, session_id: str) -> Optional[int]:
+        if not SESSION_ID_PATTERN.match(session_id or ""):
+            return None
+        try:
+            return await asyncio.to_thread(os.path.getsize, self._path(session_id))
+        except FileNotFoundError:
+            return None
+
+    async def list_idle(self, idle_before: float) -> List[str]:
+        return await asyncio.to_thread(self._list_idle, idle_before)
+
+    def _list_idle(self, idle_before: float) -> List[str]:
+        idle = []
+        for session_id, path in self.iter_session_files():
+            try:
+                if os.path.getmtime(path) < idle_before:
+                    idle.append(session_id)
+            except FileNotFoundError:
+                continue
+        return idle
+
+    def iter_session_files(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield `(session_id, path)` for every session log in the store.
+        """
+        for directory, _, filenames in os.walk(self.root_dir):
+            for filename in filenames:
+                if filename.endswith(".jsonl"):
+                    yield filename[: -len(".jsonl")], os.path.join(directory, filename)
+
+    def import_legacy_file(self, legacy_file: str) -> int:
+        """
+        Import sessions from the old single-file JSON database.
+
+        Sessions that already have a log in the store are left untouched.
+        Returns the number of imported sessions.
+        """
+        with open(legacy_file, "r") as f:
+            sessions = json.load(f)
+
+        imported = 0
+        for session_id, data in sessions.items():
+            if not SESSION_ID_PATTERN.match(session_id):
+                continue
+            path = self._path(session_id)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(
+                    json.dumps({"session_id": session_id, "v": 1, "snapshot": data})
+                    + "\n"
+                )
+            imported += 1
+        return imported
+
+    def _maybe_schedule_compaction(self, session_id: str, record_count: int):
+        if record_count <= self.compact_after:
+            return
+
+        with self._guard:
+            if session_id in self._compaction_pending:
+                return
+            self._compaction_pending.add(session_id)
+            if self._compactor is None:
+                self._compactor = threading.Thread(
+                    target=self._run_compactor, name="session-compactor", daemon=True
+                )
+                self._compactor.start()
+        self._compaction_queue.put(session_id)
+
+    def _run_compactor(self):
+        while True:
+            session_id = self._compaction_queue.get()
+            if session_id is None:
+                return
+            try:
+                self.compact(session_id)
+            except Exception as e:
+                logger.error(f"Failed to compact session {session_id}: {e}")
+            finally:
+                with self._guard:
+                    self._compaction_pending.discard(session_id)
+
+    def compact(self, session_id: str):
+        """
+        Rewrite a session log as a single snapshot record.
+        """
+        path = self._path(session_id)
+        tmp_path = f"{path}.compact"
+        with self._lock(session_id):
+            try:
+                handle = self._open_locked(path, "r", fcntl.LOCK_EX)
+            except FileNotFoundError:
+                return
+            with handle:
+                records = self._read_records(handle)
+                if len(records) <= 1:
+                    return
+                data, version = self._replay(records)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(
+                        json.dumps(
+                            {"session_id": session_id, "v": version, "snapshot": data}
+                        )
+                        + "\n"
+                    )
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Replace while still holding the lock on the old file so that
+                # writers in other processes re-open the new one.
+                os.replace(tmp_path, path)
+
+        self._set_record_count(session_id, 1)
+        logger.info(f"Compacted session {session_id} from {len(records)} records")
+
+    async def close(self):
+        if self._compactor is not None:
+            self._compaction_queue.put(None)
+            await asyncio.to_thread(self._compactor.join, 5)
+            self._compactor = None
@@ -0,0 +1,114 @@
+import logging
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+
+from core.session.session_state import SessionChanges, SessionState, apply_record
+from core.session.session_store import SessionStore
+from dal.tutor_session_dal import TutorSessionDAL
+
+logger = logging.getLogger(__name__)
+
+RESERVED_FIELDS = ("_id", "session_id", "version")
+
+
+class MongoSessionStore(SessionStore):
+    """
+    Session store backed by the `tutor_sessions` MongoDB collection.
+
+    Every document carries a `version` field. Saves are compare-and-swap
+    updates that only `$set`, `$push` and `$unset` the fields the turn
+    changed, so several workers and nodes can serve the same session. When
+    another writer got there first, the update is rebased onto the newer
+    version unless both writers replaced the same field.
+    """
+
+    def __init__(self, dal: TutorSessionDAL, max_retries: int = 3):
+        self.dal = dal
+        self.max_retries = max_retries
+
+    async def load(self, session_id: str) -> Optional[SessionState]:
+        document = await self.dal.get_session(session_id)
+        if document is None:
+            return None
+
+        version = document.pop("version", 1)
+        for field in RESERVED_FIELDS:
+            document.pop(field, None)
+
+        session = SessionState(session_id, document, version)
+        session.mark_clean()
+        return session
+
+    async def _write(self, session: SessionState, changes: SessionChanges) -> int:
+        for field in RESERVED_FIELDS:
+            changes.set_fields.pop(field, None)
+
+        if session.is_new:
+            if await self.dal.create_session(session.session_id, dict(session)):
+                return 1
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Tutor session {session.session_id} already exists.",
+            )
+
+        expected_version = session.version
+        current = None
+        for _ in range(self.max_retries):
+            if await self.dal.compare_and_swap(
+                session.session_id,
+                expected_version,
+                changes.set_fields,
+                changes.appended,
+                changes.unset,
+            ):
+                if expected_version != session.version:
+                    self._rebase(session, current, changes)
+                return expected_version + 1
+
+            current = await self.dal.get_session(session.session_id)
+            if current is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Tutor session {session.session_id} no longer exists.",
+                )
+
+            conflicts = session.conflicting_fields(current, changes)
+            if conflicts:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Tutor session was modified concurrently: {', '.join(conflicts)}",
+                )
+
+            logger.info(
+                f"Rebasing session {session.session_id} from version "
+                f"{expected_version} onto {current['version']}"
+            )
+            expected_version = current["version"]
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tutor session is under heavy concurrent modification, please retry.",
+        )
+
+    @staticmethod
+    def _rebase(session: SessionState, current: dict, changes: SessionChanges):
+        """
+        Bring the in-memory session up to date with the other writers'
+        changes plus our own, matching what is now stored.
+        """
+        for field in RESERVED_FIELDS:
+            current.pop(field, None)
+        apply_record(current, changes.to_record())
+        session.clear()
+        session.update(current)
+        session.mark_writing()
+
+    async def delete(self, session_id: str):
+        await self.dal.delete_session(session_id)
+
+    async def exists(self, session_id: str) -> bool:
+        return await self.dal.get_session_version(session_id) is not None
+
+    async def list_idle(self, idle_before: float) -> List[str]:
+        return await self.dal.get_idle_session_ids(idle_before)
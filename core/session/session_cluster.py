@@ -0,0 +1,248 @@
+"""
+Session partitioning across several tutor nodes.
+
+Every node is configured with the same list of peers and its own URL, e.g.
+to try it with two local processes sharing the same session directory:
+
+    SESSION_CLUSTER_NODES=http://127.0.0.1:8001,http://127.0.0.1:8002 \\
+    SESSION_NODE_URL=http://127.0.0.1:8001 uvicorn main:app --port 8001
+
+    SESSION_CLUSTER_NODES=http://127.0.0.1:8001,http://127.0.0.1:8002 \\
+    SESSION_NODE_URL=http://127.0.0.1:8002 uvicorn main:app --port 8002
+
+Each node owns the consistent-hash range of session ids assigned to it and
+keeps those sessions authoritative in its session cache. Requests for a
+session owned by another node are forwarded (or redirected) to the owner.
+Peers are probed periodically; when one joins or leaves, the ring is
+rebuilt and sessions whose ownership moved away are flushed to the shared
+backing store and dropped from the local cache, so the new owner picks
+them up on its next access.
+
+A node only takes ownership once its membership is confirmed. A joining
+node starts outside its own ring and announces itself in its probes; each
+peer hands over the sessions moving to it (flushing them) before adding it
+and answering the probe. Once every live peer lists the node as a member,
+it adds itself to its ring; until then it refuses session requests.
+"""
+import asyncio
+import logging
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from core.session.session_ring import ConsistentHashRing
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_HEADER = "X-LAAI-Forwarded-By"
+NODE_HEADER = "X-LAAI-Node"
+
+
+class SessionCluster:
+    """
+    Membership, ownership lookup and request forwarding for partitioned
+    tutor sessions.
+    """
+
+    def __init__(
+        self,
+        node_url: str,
+        peers: List[str],
+        virtual_nodes: int = 100,
+        probe_interval: float = 5.0,
+        routing: str = "forward",
+        request_timeout: float = 120.0,
+    ):
+        self.node_url = node_url.rstrip("/")
+        self.peers = sorted({peer.rstrip("/") for peer in peers} | {self.node_url})
+        self.probe_interval = probe_interval
+        self.routing = routing
+        self.request_timeout = request_timeout
+
+        # Other peers are assumed alive until probed; this node joins its
+        # own ring once they have confirmed it (immediately if it is alone)
+        others = [peer for peer in self.peers if peer != self.node_url]
+        self.ring = ConsistentHashRing(others or [self.node_url], virtual_nodes=virtual_nodes)
+        # Called with a predicate selecting the session ids that move away
+        # from this node, before and after the ring changes
+        self.on_rebalance: Optional[
+            Callable[[Callable[[str], bool]], Awaitable[None]]
+        ] = None
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._membership_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.request_timeout)
+        return self._client
+
+    def owner(self, session_id: str) -> str:
+        return self.ring.get_node(session_id)
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether this node's membership is confirmed, so it owns sessions.
+        """
+        return self.node_url in self.ring.nodes
+
+    def is_local(self, session_id: str) -> bool:
+        return self.owner(session_id) == self.node_url
+
+    def new_session_id(self) -> str:
+        """
+        Generate a session id that hashes to this node, so new sessions
+        start out local (once this node has joined the ring).
+        """
+        ring = self.ring
+        if not self.ready:
+            ring = ConsistentHashRing(
+                self.ring.nodes | {self.node_url}, virtual_nodes=self.ring.virtual_nodes
+            )
+        while True:
+            session_id = str(uuid.uuid4())
+            if ring.get_node(session_id) == self.node_url:
+                return session_id
+
+    def members(self) -> List[str]:
+        return sorted(self.ring.nodes)
+
+    async def _probe(self, peer: str) -> Optional[List[str]]:
+        """
+        Ping a peer, announcing this node. Returns the peer's members, or
+        None if it is down.
+        """
+        try:
+            response = await self.client.get(
+                f"{peer}/api/v1/cluster/ping",
+                headers={NODE_HEADER: self.node_url},
+                timeout=min(self.probe_interval, 2.0),
+            )
+            if response.status_code != 200:
+                return None
+            return response.json().get("members") or []
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    async def _change_ring(self, change: Callable[[ConsistentHashRing], None]):
+        """
+        Apply a membership change, handing over the sessions that move away
+        from this node: they are flushed and dropped before the change, and
+        once more after it for any loaded in between.
+        """
+        ring = ConsistentHashRing(self.ring.nodes, virtual_nodes=self.ring.virtual_nodes)
+        change(ring)
+        if self.on_rebalance is not None:
+            await self.on_rebalance(lambda session_id: ring.get_node(session_id) != self.node_url)
+        change(self.ring)
+        if self.on_rebalance is not None:
+            await self.on_rebalance(lambda session_id: not self.is_local(session_id))
+
+    async def admit(self, peer: str):
+        """
+        Add a peer that announced itself in a probe, after handing over the
+        sessions it takes over.
+        """
+        peer = peer.rstrip("/")
+        if peer not in self.peers or peer == self.node_url:
+            return
+        async with self._membership_lock:
+            if peer not in self.ring.nodes:
+                logger.info(f"Node {peer} joined the session ring")
+                await self._change_ring(lambda ring: ring.add_node(peer))
+
+    async def refresh_membership(self) -> bool:
+        """
+        Probe all peers and rebuild the ring. Returns True if it changed.
+        """
+        others = [peer for peer in self.peers if peer != self.node_url]
+        responses = await asyncio.gather(*(self._probe(peer) for peer in others))
+
+        changed = False
+        async with self._membership_lock:
+            for peer, members in zip(others, responses):
+                if members is not None and peer not in self.ring.nodes:
+                    logger.info(f"Node {peer} joined the session ring")
+                    await self._change_ring(lambda ring: ring.add_node(peer))
+                    changed = True
+                elif members is None and peer in self.ring.nodes:
+                    logger.warning(f"Node {peer} left the session ring")
+                    await self._change_ring(lambda ring: ring.remove_node(peer))
+                    changed = True
+
+            confirmed = all(
+                self.node_url in members for members in responses if members is not None
+            )
+            if confirmed and not self.ready:
+                logger.info(f"Node {self.node_url} joined the session ring")
+                self.ring.add_node(self.node_url)
+                changed = True
+            elif not confirmed and self.ready and len(self.ring.nodes) > 1:
+                # A peer has not taken this node in yet; stop owning sessions
+                # until it has
+                logger.warning(f"Membership of {self.node_url} is not confirmed by all peers")
+                await self._change_ring(lambda ring: ring.remove_node(self.node_url))
+                changed = True
+        return changed
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.refresh_membership()
+            except Exception as e:
+                logger.error(f"Session ring membership refresh failed: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def forward(
+        self,
+        owner: str,
+        path: str,
+        data: Dict[str, str],
+        files: Optional[Dict] = None,
+    ) -> httpx.Response:
+        """
+        Forward a form POST to the owning node.
+        """
+        return await self.client.post(
+            f"{owner}{path}",
+            data=data,
+            files=files,
+            headers={FORWARDED_HEADER: self.node_url},
+        )
+
+    async def forward_stream(
+        self,
+        owner: str,
+        path: str,
+        data: Dict[str, str],
+        files: Optional[Dict] = None,
+    ) -> httpx.Response:
+        """
+        Forward a form POST to the owning node and return its response as
+        soon as the status and headers arrive. The caller reads the body
+        and must close the response.
+        """
+        request = self.client.build_request(
+            "POST",
+            f"{owner}{path}",
+            data=data,
+            files=files,
+            headers={FORWARDED_HEADER: self.node_url},
+        )
+        return await self.client.send(request, stream=True)
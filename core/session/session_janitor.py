@@ -0,0 +1,198 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.session.cached_session_store import CachedSessionStore
+from core.session.session_state import SessionState
+from core.session.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for directory, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(directory, filename))
+            except OSError:
+                continue
+    return total
+
+
+class SessionJanitor:
+    """
+    Scheduled cleanup of abandoned tutor sessions.
+
+    Each run archives sessions idle for longer than `ttl_seconds` as gzipped
+    JSON under `archive_dir`, removes them from the store together with their
+    `question_bank` image directory, and deletes image directories whose
+    session no longer exists. Reclaimed bytes are the space freed in the
+    store and image directories, less the size of the archives written.
+
+    Idle sessions are read past a `CachedSessionStore`, so that expiring
+    them does not evict live sessions from its LRU.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        archive_dir: str = "temp_db/archive",
+        question_bank_dir: str = "./question_bank",
+        ttl_seconds: float = 72 * 3600,
+        interval_seconds: float = 3600,
+    ):
+        self.store = store
+        self.archive_dir = archive_dir
+        self.question_bank_dir = question_bank_dir
+        self.ttl_seconds = ttl_seconds
+        self.interval_seconds = interval_seconds
+
+        # Optional ownership check, so each node only expires its own sessions
+        self.owns: Optional[Callable[[str], bool]] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {
+            "runs": 0,
+            "sessions_expired": 0,
+            "image_dirs_removed": 0,
+            "bytes_reclaimed": 0,
+            "bytes_archived": 0,
+            "last_run_at": None,
+            "last_run_seconds": None,
+            "last_error": None,
+        }
+
+    def _archive_path(self, session_id: str) -> str:
+        return os.path.join(self.archive_dir, session_id[:2], f"{session_id}.json.gz")
+
+    def _archive(self, session_id: str, session: dict) -> Tuple[int, int]:
+        """
+        Write a compressed copy of the session and return its uncompressed
+        and compressed sizes.
+        """
+        payload = json.dumps(
+            {"session_id": session_id, "archived_at": time.time(), "session": session},
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+
+        path = self._archive_path(session_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wb", compresslevel=9) as f:
+            f.write(payload)
+
+        archived = os.path.getsize(path)
+        self.metrics["bytes_archived"] += archived
+        return len(payload), archived
+
+    def _remove_images(self, session_id: str) -> int:
+        directory = os.path.join(self.question_bank_dir, session_id)
+        if not os.path.isdir(directory):
+            return 0
+        size = _directory_size(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+        self.metrics["image_dirs_removed"] += 1
+        return size
+
+    async def _load_idle(self, session_id: str) -> Optional[SessionState]:
+        if isinstance(self.store, CachedSessionStore):
+            session = self.store.peek(session_id)
+            if session is not None:
+                return session
+            return await self.store.backend.load(session_id)
+        return await self.store.load(session_id)
+
+    async def expire_idle_sessions(self, idle_before: float) -> Dict[str, int]:
+        expired = 0
+        reclaimed = 0
+        for session_id in await self.store.list_idle(idle_before):
+            if self.owns is not None and not self.owns(session_id):
+                continue
+            session = await self._load_idle(session_id)
+            if session is None:
+                continue
+            if session.get("last_active", 0) >= idle_before:
+                # Became active again since the idle scan
+                continue
+
+            stored = await self.store.stored_size(session_id)
+            payload_size, archived = self._archive(session_id, dict(session))
+            await self.store.delete(session_id)
+            # Backends that cannot tell take about the serialized size
+            reclaimed += (stored if stored is not None else payload_size) - archived
+            reclaimed += self._remove_images(session_id)
+            expired += 1
+
+        return {"sessions": expired, "bytes": reclaimed}
+
+    async def remove_orphaned_images(self, idle_before: float) -> Dict[str, int]:
+        removed = 0
+        reclaimed = 0
+        if not os.path.isdir(self.question_bank_dir):
+            return {"dirs": 0, "bytes": 0}
+
+        for session_id in os.listdir(self.question_bank_dir):
+            directory = os.path.join(self.question_bank_dir, session_id)
+            # Skip recent directories: images are stored before the session
+            # itself is first saved.
+            if not os.path.isdir(directory) or os.path.getmtime(directory) >= idle_before:
+                continue
+            if self.owns is not None and not self.owns(session_id):
+                continue
+            if await self.store.exists(session_id):
+                continue
+            reclaimed += self._remove_images(session_id)
+            removed += 1
+
+        return {"dirs": removed, "bytes": reclaimed}
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Run a single expiry and cleanup pass.
+        """
+        started = time.time()
+        idle_before = started - self.ttl_seconds
+
+        expired = await self.expire_idle_sessions(idle_before)
+        orphans = await self.remove_orphaned_images(idle_before)
+
+        self.metrics["runs"] += 1
+        self.metrics["sessions_expired"] += expired["sessions"]
+        self.metrics["bytes_reclaimed"] += expired["bytes"] + orphans["bytes"]
+        self.metrics["last_run_at"] = started
+        self.metrics["last_run_seconds"] = round(time.time() - started, 3)
+
+        logger.info(
+            f"Session janitor expired {expired['sessions']} sessions, removed "
+            f"{orphans['dirs']} orphaned image directories, reclaimed "
+            f"{expired['bytes'] + orphans['bytes']} bytes"
+        )
+        return self.metrics
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+                self.metrics["last_error"] = None
+            except Exception as e:
+                self.metrics["last_error"] = str(e)
+                logger.error(f"Session janitor run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """
+        Schedule periodic runs on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,54 @@
+import bisect
+import hashlib
+from typing import Iterable, List, Tuple
+
+
+class ConsistentHashRing:
+    """
+    Consistent-hash ring mapping session ids to node URLs.
+
+    Each node is placed on the ring `virtual_nodes` times so that ranges are
+    spread evenly and adding or removing a node only moves about 1/N of the
+    sessions.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 100):
+        self.virtual_nodes = virtual_nodes
+        self._points: List[Tuple[int, str]] = []
+        self._hashes: List[int] = []
+        self.nodes = set()
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+    def _rebuild_index(self):
+        self._points.sort()
+        self._hashes = [point for point, _ in self._points]
+
+    def add_node(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        self._points.extend(
+            (self._hash(f"{node}#{replica}"), node) for replica in range(self.virtual_nodes)
+        )
+        self._rebuild_index()
+
+    def remove_node(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        self._points = [(point, owner) for point, owner in self._points if owner != node]
+        self._rebuild_index()
+
+    def get_node(self, key: str) -> str:
+        """
+        Return the node that owns `key`.
+        """
+        if not self._points:
+            raise ValueError("The hash ring has no nodes.")
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._points)
+        return self._points[index][1]
@@ -0,0 +1,130 @@
+import copy
+from typing import Any, Dict, List
+
+
+class SessionChanges:
+    """
+    Top-level fields that changed on a session since it was last persisted.
+    """
+
+    def __init__(
+        self,
+        set_fields: Dict[str, Any] = None,
+        appended: Dict[str, List[Any]] = None,
+        unset: List[str] = None,
+    ):
+        self.set_fields = set_fields or {}
+        self.appended = appended or {}
+        self.unset = unset or []
+
+    def is_empty(self) -> bool:
+        return not (self.set_fields or self.appended or self.unset)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize the changes into a store record."""
+        record = {}
+        if self.set_fields:
+            record["set"] = self.set_fields
+        if self.appended:
+            record["append"] = self.appended
+        if self.unset:
+            record["unset"] = self.unset
+        return record
+
+
+class SessionState(dict):
+    """
+    A tutor session document that remembers what it looked like when it was
+    loaded, so a store can persist only the fields a turn actually changed.
+
+    Lists are treated as append-only logs: if the entries seen at load time
+    are still the leading entries, only the new tail is reported as appended.
+    Any other change to a field is reported as a full replacement.
+    """
+
+    def __init__(self, session_id: str, data: Dict[str, Any] = None, version: int = 0):
+        super().__init__(data or {})
+        self.session_id = session_id
+        self.version = version
+        self._baseline: Dict[str, Any] = {}
+        self._writing: Dict[str, Any] = {}
+
+    @property
+    def is_new(self) -> bool:
+        return self.version == 0
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            key: list(value) if isinstance(value, list) else copy.deepcopy(value)
+            for key, value in self.items()
+        }
+
+    def mark_clean(self):
+        """Record the current contents as the persisted baseline."""
+        self._baseline = self._snapshot()
+
+    def mark_writing(self):
+        """
+        Record the current contents as what is being written, before the
+        store awaits the write. Changes made while the write is in flight
+        are reported by the next `changes` call.
+        """
+        self._writing = self._snapshot()
+
+    def mark_written(self):
+        """Make the contents recorded by `mark_writing` the persisted baseline."""
+        self._baseline = self._writing
+        self._writing = {}
+
+    def changes(self) -> SessionChanges:
+        """Compute the changes made since the last call to `mark_clean`."""
+        set_fields = {}
+        appended = {}
+        for key, value in self.items():
+            if key not in self._baseline:
+                set_fields[key] = value
+                continue
+
+            before = self._baseline[key]
+            if isinstance(value, list) and isinstance(before, list):
+                if len(value) >= len(before) and all(
+                    current is previous for current, previous in zip(value, before)
+                ):
+                    if len(value) > len(before):
+                        appended[key] = value[len(before):]
+                    continue
+                set_fields[key] = value
+            elif value != before:
+                set_fields[key] = value
+
+        unset = [key for key in self._baseline if key not in self]
+        return SessionChanges(set_fields, appended, unset)
+
+    def conflicting_fields(
+        self, current: Dict[str, Any], changes: SessionChanges, ignore=("last_active",)
+    ) -> List[str]:
+        """
+        Return the fields replaced or removed by `changes` that another writer
+        has also modified in `current` since this session was loaded.
+
+        Appends never conflict, they are simply applied after the other
+        writer's entries.
+        """
+        return [
+            key
+            for key in list(changes.set_fields) + changes.unset
+            if key not in ignore and current.get(key) != self._baseline.get(key)
+        ]
+
+
+def apply_record(data: Dict[str, Any], record: Dict[str, Any]):
+    """Replay a single store record onto a session document."""
+    if "snapshot" in record:
+        data.clear()
+        data.update(record["snapshot"])
+    for key, value in record.get("set", {}).items():
+        data[key] = value
+    for key, items in record.get("append", {}).items():
+        data.setdefault(key, []).extend(items)
+    for key in record.get("unset", []):
+        data.pop(key, None)
@@ -0,0 +1,87 @@
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from core.session.session_state import SessionChanges, SessionState
+
+
+class SessionStore:
+    """
+    Base class for tutor session persistence.
+
+    Backends implement `load`, `_write` and `delete`. `save` only hands the
+    backend the fields changed by the current turn, so the cost of a turn
+    does not depend on the size of the rest of the store.
+    """
+
+    # Optional override for generating ids of new sessions
+    session_id_factory: Optional[Callable[[], str]] = None
+
+    async def load(self, session_id: str) -> Optional[SessionState]:
+        """
+        Load a session by id. Returns None if the session does not exist.
+        """
+        raise NotImplementedError
+
+    def create(self, session_id: Optional[str] = None) -> SessionState:
+        """
+        Create a new, not yet persisted, session.
+        """
+        return SessionState(session_id or self.new_session_id())
+
+    def new_session_id(self) -> str:
+        if self.session_id_factory is not None:
+            return self.session_id_factory()
+        return str(uuid.uuid4())
+
+    async def save(self, session: SessionState):
+        """
+        Persist the changes made to `session` since it was loaded or last saved.
+        """
+        changes = session.changes()
+        if changes.is_empty():
+            return
+
+        session["last_active"] = time.time()
+        changes.set_fields["last_active"] = session["last_active"]
+
+        # The session may change again while the write is awaited
+        session.mark_writing()
+        session.version = await self._write(session, changes)
+        session.mark_written()
+
+    async def _write(self, session: SessionState, changes: SessionChanges) -> int:
+        """
+        Persist `changes` and return the new version of the session.
+        """
+        raise NotImplementedError
+
+    async def delete(self, session_id: str):
+        """
+        Remove a session from the store.
+        """
+        raise NotImplementedError
+
+    async def exists(self, session_id: str) -> bool:
+        """
+        Check whether a session exists without caching it.
+        """
+        return await self.load(session_id) is not None
+
+    async def stored_size(self, session_id: str) -> Optional[int]:
+        """
+        Return the bytes a session takes up in the store, or None if the
+        backend cannot tell.
+        """
+        return None
+
+    async def list_idle(self, idle_before: float) -> List[str]:
+        """
+        Return the ids of sessions not active since the `idle_before` timestamp.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """
+        Release any resources held by the store.
+        """
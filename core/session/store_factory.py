@@ -0,0 +1,169 @@
+import logging
+import os
+from typing import Callable, Optional
+
+from configs.config import (
+    QUESTION_BANK_DIR,
+    SESSION_ARCHIVE_DIR,
+    SESSION_CACHE_ENABLED,
+    SESSION_CACHE_FLUSH_BATCH_SIZE,
+    SESSION_CACHE_FLUSH_INTERVAL,
+    SESSION_CACHE_MAX_MEMORY_MB,
+    SESSION_CACHE_MAX_SESSIONS,
+    SESSION_CAS_MAX_RETRIES,
+    SESSION_CLUSTER_NODES,
+    SESSION_CLUSTER_PROBE_INTERVAL,
+    SESSION_CLUSTER_ROUTING,
+    SESSION_CLUSTER_VIRTUAL_NODES,
+    SESSION_COMPACT_AFTER,
+    SESSION_JANITOR_ENABLED,
+    SESSION_JANITOR_INTERVAL_MINUTES,
+    SESSION_LEGACY_FILE,
+    SESSION_NODE_URL,
+    SESSION_SHARD_DEPTH,
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_DIR,
+    SESSION_TTL_HOURS,
+)
+from core.session.cached_session_store import CachedSessionStore
+from core.session.file_session_store import ShardedFileSessionStore
+from core.session.session_cluster import SessionCluster
+from core.session.session_janitor import SessionJanitor
+from core.session.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+_session_store: Optional[SessionStore] = None
+_session_janitor: Optional[SessionJanitor] = None
+_session_cluster: Optional[SessionCluster] = None
+
+
+def _build_file_store() -> ShardedFileSessionStore:
+    store = ShardedFileSessionStore(
+        root_dir=SESSION_STORE_DIR,
+        shard_depth=SESSION_SHARD_DEPTH,
+        compact_after=SESSION_COMPACT_AFTER,
+    )
+
+    # One-time import of sessions from the old single-file database
+    marker = os.path.join(SESSION_STORE_DIR, ".legacy_imported")
+    if SESSION_LEGACY_FILE and os.path.exists(SESSION_LEGACY_FILE) and not os.path.exists(marker):
+        imported = store.import_legacy_file(SESSION_LEGACY_FILE)
+        with open(marker, "w") as f:
+            f.write(SESSION_LEGACY_FILE)
+        logger.info(f"Imported {imported} sessions from {SESSION_LEGACY_FILE}")
+
+    return store
+
+
+def get_session_store() -> SessionStore:
+    """
+    Return the process-wide tutor session store for the configured backend.
+    """
+    global _session_store
+    if _session_store is None:
+        if SESSION_STORE_BACKEND == "file":
+            _session_store = _build_file_store()
+        elif SESSION_STORE_BACKEND == "mongo":
+            from dal import tutor_session_dal
+            from core.session.mongo_session_store import MongoSessionStore
+
+            _session_store = MongoSessionStore(
+                tutor_session_dal, max_retries=SESSION_CAS_MAX_RETRIES
+            )
+        else:
+            raise ValueError(f"Unsupported session store backend: {SESSION_STORE_BACKEND}")
+
+        if SESSION_CACHE_ENABLED and SESSION_STORE_BACKEND == "mongo" and not SESSION_CLUSTER_NODES:
+            # Mongo is shared by all workers, so without partitioning the
+            # cache would serve stale sessions and lose writes on conflicts
+            logger.warning(
+                "SESSION_CACHE_ENABLED is ignored for the mongo backend without "
+                "SESSION_CLUSTER_NODES"
+            )
+        elif SESSION_CACHE_ENABLED:
+            _session_store = CachedSessionStore(
+                _session_store,
+                max_sessions=SESSION_CACHE_MAX_SESSIONS,
+                max_memory_bytes=SESSION_CACHE_MAX_MEMORY_MB * 1024 * 1024,
+                flush_interval=SESSION_CACHE_FLUSH_INTERVAL,
+                flush_batch_size=SESSION_CACHE_FLUSH_BATCH_SIZE,
+            )
+
+        cluster = get_session_cluster()
+        if cluster is not None:
+            _session_store.session_id_factory = cluster.new_session_id
+    return _session_store
+
+
+def get_session_cluster() -> Optional[SessionCluster]:
+    """
+    Return the session partitioning cluster, or None when running standalone.
+    """
+    global _session_cluster
+    if _session_cluster is None and SESSION_CLUSTER_NODES and SESSION_NODE_URL:
+        _session_cluster = SessionCluster(
+            SESSION_NODE_URL,
+            SESSION_CLUSTER_NODES,
+            virtual_nodes=SESSION_CLUSTER_VIRTUAL_NODES,
+            probe_interval=SESSION_CLUSTER_PROBE_INTERVAL,
+            routing=SESSION_CLUSTER_ROUTING,
+        )
+        _session_cluster.on_rebalance = _release_moved_sessions
+    return _session_cluster
+
+
+async def _release_moved_sessions(moves_away: Callable[[str], bool]):
+    store = get_session_store()
+    if isinstance(store, CachedSessionStore):
+        released = await store.release(moves_away)
+        logger.info(f"Handed off {released} sessions for ring rebalance")
+
+
+def get_session_janitor() -> SessionJanitor:
+    """
+    Return the process-wide janitor for the session store.
+    """
+    global _session_janitor
+    if _session_janitor is None:
+        _session_janitor = SessionJanitor(
+            get_session_store(),
+            archive_dir=SESSION_ARCHIVE_DIR,
+            question_bank_dir=QUESTION_BANK_DIR,
+            ttl_seconds=SESSION_TTL_HOURS * 3600,
+            interval_seconds=SESSION_JANITOR_INTERVAL_MINUTES * 60,
+        )
+        cluster = get_session_cluster()
+        if cluster is not None:
+            _session_janitor.owns = cluster.is_local
+    return _session_janitor
+
+
+def start_session_background_tasks():
+    """
+    Build the session store, running any one-time legacy import, and
+    schedule the session janitor and cluster membership probing on
+    application startup.
+    """
+    get_session_store()
+    if SESSION_JANITOR_ENABLED:
+        get_session_janitor().start()
+    cluster = get_session_cluster()
+    if cluster is not None:
+        cluster.start()
+
+
+async def close_session_store():
+    """
+    Stop background tasks and close the session store on application shutdown.
+    """
+    global _session_store, _session_janitor, _session_cluster
+    if _session_janitor is not None:
+        await _session_janitor.stop()
+        _session_janitor = None
+    if _session_cluster is not None:
+        await _session_cluster.stop()
+        _session_cluster = None
+    if _session_store is not None:
+        await _session_store.close()
+        _session_store = None
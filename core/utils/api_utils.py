@@ -1,7 +1,42 @@
-from typing import Dict, List
+import asyncio
+import os
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from pydantic import BaseModel
 from models.model_registry import ModelRegistry
-import json
+from configs.config import (
+    LLM_COALESCE_ACROSS_WORKERS,
+    LLM_COALESCE_ENABLED,
+    LLM_COALESCE_LEASE_SECONDS,
+    LLM_COALESCE_POLL_INTERVAL,
+)
 from core.llm_services.llm_factory import LLMFactory
+from core.llm_services.llm_response import LLMMessage, LLMResponse
+from core.llm_services.llm_scheduler import PRIORITY_INTERACTIVE
+from core.llm_services.model_router import get_model_router
+from core.utils.response_cache import ResponseCache, get_response_cache
+from core.utils.single_flight import FileLease, get_single_flight
+from core.utils.structured_output import (
+    conforms,
+    get_structured_output_parser,
+    parse_json,
+)
+from core.utils.token_budget import (
+    count_message_tokens,
+    fit_messages,
+    get_token_usage,
+    prompt_limit,
+)
 
 
 class APIUtils:
@@ -17,7 +52,9 @@ class APIUtils:
         use_tools: bool = False,
     ):
         """
-        Initialize APIUtils for a specific model.
+        Initialize APIUtils for a specific model. Without `model_name`, the
+        model is picked per call by the model router for the call's
+        `prompt_type`.
         """
 
         self.api_type = api_type
@@ -26,40 +63,287 @@ class APIUtils:
         self.model_name = model_name
         self.model_config = (
             ModelRegistry.get_model_config(model_name)
-            if self.api_type == "openrouter"
+            if self.api_type == "openrouter" and model_name
             else None
         )
 
-    def generate_response(
+    async def generate_response(
         self,
         messages: List[Dict],
-    ) -> str:
+        prompt_type: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = PRIORITY_INTERACTIVE,
+        response_format: Optional[Dict] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> LLMResponse:
         """
         Call the LLM API to get a response for the given prompt.
+
+        Plain-text responses are served from the response cache when the
+        same model has already answered the same (whitespace-normalized)
+        messages. `prompt_type` selects the cache TTL; pass
+        `use_cache=False` to always call the provider.
+
+        Identical concurrent requests are coalesced into a single provider
+        call whose result every caller receives.
+
+        Messages are trimmed to the model's context window from
+        `ModelRegistry` before anything else.
+
+        Provider calls go through the rate-limit scheduler and are hedged to
+        equivalent models when slow; `priority` selects the scheduler lane,
+        so background work should pass `PRIORITY_BACKGROUND`.
+
+        `response_format` is passed to the provider, e.g. to request JSON
+        output (see `structured_response_format`). With a `schema`, only
+        responses `parse_json_response` can validate against it are cached.
+        """
+        prompt_tokens = count_message_tokens(messages)
+        api_type, model_name = self._resolve_model(prompt_tokens, prompt_type)
+        messages = self._fit_to_model(messages, prompt_tokens, model_name, prompt_type)
+        cache = get_response_cache()
+        cacheable = use_cache and not self.use_tools and cache.is_enabled_for(prompt_type)
+        key = self._cache_key(api_type, model_name, messages, response_format)
+
+        if not cacheable:
+            cache.record_bypass(prompt_type)
+            return await self._coalesce(
+                key,
+                priority,
+                lambda: self._call_llm(
+                    messages, priority, api_type, model_name, response_format
+                ),
+            )
+
+        cached = await cache.get(key, prompt_type)
+        if cached is not None:
+            response = LLMResponse.from_dict(cached)
+            response.cached = True
+            return response
+
+        return await self._coalesce(
+            key,
+            priority,
+            lambda: self._call_and_cache(
+                key,
+                messages,
+                prompt_type,
+                priority,
+                api_type,
+                model_name,
+                response_format,
+                schema,
+            ),
+        )
+
+    async def stream_response(
+        self,
+        messages: List[Dict],
+        prompt_type: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = PRIORITY_INTERACTIVE,
+        response_format: Optional[Dict] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> AsyncIterator[str]:
         """
-        # response = openai.ChatCompletion.create(
-        #     model=self.model_config["name"],
-        #     messages=[{"role": "user", "content": prompt}]
-        # )
-        llm = LLMFactory.get_llm(
-            api_type=self.api_type,
-            config=self.model_config if self.api_type == "openrouter" else None,
-            model=self.model_name,
+        Stream the completion's text as it is generated.
+
+        Models are resolved and messages trimmed as in `generate_response`,
+        and streams share its response cache: a cached response is yielded
+        whole, and a completed stream is stored (with a `schema`, only if
+        it validates). Streams are not coalesced or hedged.
+        """
+        prompt_tokens = count_message_tokens(messages)
+        api_type, model_name = self._resolve_model(prompt_tokens, prompt_type)
+        messages = self._fit_to_model(messages, prompt_tokens, model_name, prompt_type)
+        cache = get_response_cache()
+        cacheable = use_cache and not self.use_tools and cache.is_enabled_for(prompt_type)
+        key = self._cache_key(api_type, model_name, messages, response_format)
+
+        if cacheable:
+            cached = await cache.get(key, prompt_type)
+            if cached is not None:
+                yield LLMResponse.from_dict(cached).text
+                return
+        else:
+            cache.record_bypass(prompt_type)
+
+        llm = LLMFactory.get_resilient_llm(
+            api_type=api_type,
+            model=model_name,
             tool_metadata=self.tool_metadata,
             use_tools=self.use_tools,
+            priority=priority,
+        )
+        chunks = []
+        async for chunk in llm.stream_completion(messages, response_format=response_format):
+            chunks.append(chunk)
+            yield chunk
+
+        if cacheable and self._is_cacheable("".join(chunks), schema):
+            response = LLMResponse(
+                message=LLMMessage("".join(chunks)),
+                model=model_name,
+                provider=api_type,
+                finish_reason="stop",
+            )
+            await cache.set(key, response.to_dict(), prompt_type)
+
+    def _cache_key(
+        self,
+        api_type: str,
+        model_name: str,
+        messages: List[Dict],
+        response_format: Optional[Dict],
+    ) -> str:
+        return ResponseCache.make_key(
+            api_type,
+            model_name,
+            messages,
+            {"use_tools": self.use_tools, "response_format": response_format},
         )
-        response = llm.generate_completion(messages=messages)
-        return response
 
     @staticmethod
-    def parse_json_response(response: str) -> Dict:
+    def _fit_to_model(
+        messages: List[Dict],
+        original_tokens: int,
+        model_name: str,
+        prompt_type: Optional[str],
+    ) -> List[Dict]:
         """
-        Extract and parse the JSON from the response.
+        Trim the messages to the model's context window and record the
+        request's prompt token count.
         """
+        limit = prompt_limit(model_name)
+        prompt_tokens = original_tokens
+        if limit is not None and original_tokens > limit:
+            messages, prompt_tokens = fit_messages(messages, limit)
+        get_token_usage().record(prompt_type, model_name, prompt_tokens, original_tokens)
+        return messages
+
+    def _resolve_model(
+        self, prompt_tokens: int, prompt_type: Optional[str]
+    ) -> Tuple[str, str]:
+        if self.model_name:
+            return self.api_type, self.model_name
+        router = get_model_router()
+        if router is None:
+            model_name = ModelRegistry.TASK_MODELS[prompt_type][0]
+            return ModelRegistry.MODELS[model_name]["provider"], model_name
+        return router.select(prompt_type, prompt_tokens)
+
+    @staticmethod
+    async def _coalesce(
+        key: str, priority: str, call: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        if not LLM_COALESCE_ENABLED:
+            return await call()
+        single_flight = get_single_flight()
+        # Calls are coalesced per scheduler lane, so interactive requests
+        # never wait in the background lane; background requests can join
+        # an interactive call
+        interactive_key = f"{PRIORITY_INTERACTIVE}:{key}"
+        if priority != PRIORITY_INTERACTIVE and single_flight.running(interactive_key):
+            return await single_flight.do(interactive_key, call)
+        return await single_flight.do(f"{priority}:{key}", call)
+
+    async def _call_and_cache(
+        self,
+        key: str,
+        messages: List[Dict],
+        prompt_type: Optional[str],
+        priority: str,
+        api_type: str,
+        model_name: str,
+        response_format: Optional[Dict] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> LLMResponse:
+        """
+        Call the provider and store the result in the response cache,
+        unless it does not validate against `schema`. With
+        cross-worker coalescing, only the worker holding the lease for this
+        key calls the provider; the others wait for its result to appear in
+        the persistent cache tier.
+        """
+        cache = get_response_cache()
+        lease = None
+        if LLM_COALESCE_ACROSS_WORKERS and cache.disk is not None:
+            lease = FileLease(
+                os.path.join(cache.disk.root_dir, "leases"),
+                key,
+                ttl=LLM_COALESCE_LEASE_SECONDS,
+            )
+            if not await asyncio.to_thread(lease.acquire):
+                response = await self._wait_for_peer(key, lease)
+                if response is not None:
+                    return response
+
         try:
-            start_index = response.find("{")
-            end_index = response.rfind("}") + 1
-            json_text = response[start_index:end_index]
-            return json.loads(json_text)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse JSON: {e}")
+            response = await self._call_llm(
+                messages, priority, api_type, model_name, response_format
+            )
+            if not response.message.tool_calls and self._is_cacheable(response.text, schema):
+                await cache.set(key, response.to_dict(), prompt_type)
+            return response
+        finally:
+            if lease is not None:
+                lease.release()
+
+    @staticmethod
+    def _is_cacheable(text: str, schema: Optional[Type[BaseModel]]) -> bool:
+        # Malformed structured responses would be replayed for the whole TTL
+        return schema is None or conforms(text, schema)
+
+    @staticmethod
+    async def _wait_for_peer(key: str, lease: FileLease) -> Optional[LLMResponse]:
+        cache = get_response_cache()
+        while await asyncio.to_thread(lease.is_active):
+            await asyncio.sleep(LLM_COALESCE_POLL_INTERVAL)
+            entry = await asyncio.to_thread(cache.disk.get, key)
+            if entry is not None:
+                break
+        else:
+            entry = await asyncio.to_thread(cache.disk.get, key)
+
+        if entry is None:
+            return None
+        response = LLMResponse.from_dict(entry["value"])
+        response.cached = True
+        return response
+
+    async def _call_llm(
+        self,
+        messages: List[Dict],
+        priority: str = PRIORITY_INTERACTIVE,
+        api_type: str = None,
+        model_name: str = None,
+        response_format: Optional[Dict] = None,
+    ) -> LLMResponse:
+        llm = LLMFactory.get_resilient_llm(
+            api_type=api_type or self.api_type,
+            model=model_name or self.model_name,
+            tool_metadata=self.tool_metadata,
+            use_tools=self.use_tools,
+            priority=priority,
+        )
+        response = await llm.generate_completion(
+            messages=messages, response_format=response_format
+        )
+        return response
+
+    @staticmethod
+    def parse_json_response(
+        response: Union[str, LLMResponse], schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract and parse the JSON from the response, repairing common
+        malformations (prose or code fences around it, comments, trailing
+        commas, truncation). With a `schema`, the result is validated and
+        invalid list items are dropped; raises ValueError when nothing
+        valid can be recovered.
+        """
+        if isinstance(response, LLMResponse):
+            response = response.message.content
+        if schema is not None:
+            return get_structured_output_parser().parse(response, schema)
+        return parse_json(response)
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from configs.config import (
+    LLM_CACHE_DEFAULT_TTL,
+    LLM_CACHE_DIR,
+    LLM_CACHE_DISK_MAX_MB,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MEMORY_SIZE,
+    LLM_CACHE_TTLS,
+)
+from core.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCacheTier:
+    """
+    Persistent cache tier keeping one small JSON file per entry under
+    `root_dir/<aa>/<key>.json`.
+
+    Expired entries are deleted when read, and by a sweep that runs in a
+    background thread at most every `sweep_interval` seconds after a write.
+    The sweep also deletes the least recently written entries while the
+    tier holds more than `max_bytes`.
+    """
+
+    def __init__(
+        self, root_dir: str, max_bytes: int = 512 * 1024 * 1024, sweep_interval: float = 600.0
+    ):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._sweeping = threading.Lock()
+        self.metrics = {"sweeps": 0, "expired_removed": 0, "evicted": 0, "bytes": 0}
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if entry["expires_at"] < time.time():
+            self.delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._maybe_sweep()
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval or self._sweeping.locked():
+            return
+        self._last_sweep = now
+        threading.Thread(target=self.sweep, name="llm-cache-sweep", daemon=True).start()
+
+    def sweep(self):
+        """
+        Delete expired entries, then the oldest entries while the tier is
+        over `max_bytes`.
+        """
+        if not self._sweeping.acquire(blocking=False):
+            return
+        try:
+            now = time.time()
+            entries = []
+            for dirpath, _, filenames in os.walk(self.root_dir):
+                for filename in filenames:
+                    if not filename.endswith(".json"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                        with open(path, "r", encoding="utf-8") as f:
+                            expired = json.load(f)["expires_at"] < now
+                    except FileNotFoundError:
+                        continue
+                    except (OSError, ValueError, KeyError, TypeError):
+                        expired = True
+                    if expired:
+                        self._remove(path)
+                        self.metrics["expired_removed"] += 1
+                    else:
+                        entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                self.metrics["evicted"] += 1
+            self.metrics["bytes"] = total
+            self.metrics["sweeps"] += 1
+        except Exception as e:
+            logger.error(f"LLM cache sweep failed: {e}")
+        finally:
+            self._sweeping.release()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str):
+        self._remove(self._path(key))
+
+
+class ResponseCache:
+    """
+    Two-tier cache of LLM responses: an in-memory LRU in front of a
+    persistent disk tier. Entries expire after a TTL chosen per prompt type.
+    Disk reads and writes run in worker threads, off the event loop.
+    """
+
+    def __init__(
+        self,
+        memory_size: int = 1024,
+        disk_dir: Optional[str] = "temp_db/llm_cache",
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        default_ttl: float = 3600,
+        ttls: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.memory = LRUCache(max_size=memory_size)
+        self.disk = DiskCacheTier(disk_dir, max_bytes=disk_max_bytes) if disk_dir else None
+
+        self.metrics: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(
+        api_type: str, model: str, messages: List[Dict], params: Dict[str, Any] = None
+    ) -> str:
+        """
+        Build a stable key from the model, the messages with whitespace
+        normalized, and any request parameters.
+        """
+        normalized = [
+            {
+                "role": str(message.get("role", "")).lower(),
+                "content": " ".join(str(message.get("content", "")).split()),
+            }
+            for message in messages
+        ]
+        payload = json.dumps(
+            {
+                "api_type": api_type,
+                "model": model,
+                "messages": normalized,
+                "params": params or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, prompt_type: Optional[str]) -> float:
+        return self.ttls.get(prompt_type, self.default_ttl)
+
+    def is_enabled_for(self, prompt_type: Optional[str]) -> bool:
+        return self.enabled and self.ttl_for(prompt_type) > 0
+
+    def _count(self, prompt_type: Optional[str], metric: str):
+        counters = self.metrics.setdefault(
+            prompt_type or "default",
+            {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "bypassed": 0},
+        )
+        counters[metric] += 1
+
+    def record_bypass(self, prompt_type: Optional[str]):
+        self._count(prompt_type, "bypassed")
+
+    async def get(self, key: str, prompt_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            if entry["expires_at"] >= time.time():
+                self._count(prompt_type, "memory_hits")
+                return entry["value"]
+            self.memory.pop(key)
+
+        if self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self.memory.put(key, entry)
+                self._count(prompt_type, "disk_hits")
+                return entry["value"]
+
+        self._count(prompt_type, "misses")
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], prompt_type: Optional[str] = None):
+        entry = {"expires_at": time.time() + self.ttl_for(prompt_type), "value": value}
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, entry)
+            except OSError as e:
+                logger.warning(f"Failed to write LLM cache entry to disk: {e}")
+        self._count(prompt_type, "writes")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        totals = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "bypassed": 0}
+        for counters in self.metrics.values():
+            for metric, value in counters.items():
+                totals[metric] += value
+        lookups = totals["memory_hits"] + totals["disk_hits"] + totals["misses"]
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self.memory),
+            "hit_rate": round((lookups - totals["misses"]) / lookups, 4) if lookups else None,
+            "totals": totals,
+            "by_prompt_type": self.metrics,
+            "disk": self.disk.metrics if self.disk is not None else None,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the process-wide LLM response cache.
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            memory_size=LLM_CACHE_MEMORY_SIZE,
+            disk_dir=LLM_CACHE_DIR or None,
+            disk_max_bytes=LLM_CACHE_DISK_MAX_MB * 1024 * 1024,
+            default_ttl=LLM_CACHE_DEFAULT_TTL,
+            ttls=LLM_CACHE_TTLS,
+            enabled=LLM_CACHE_ENABLED,
+        )
+    return _response_cache
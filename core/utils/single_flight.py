@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls within a worker.
+
+    The first caller for a key starts the call in a task of its own; callers
+    arriving while it is in flight wait for the same result (or exception)
+    instead of issuing a call of their own. A cancelled caller only stops
+    waiting: the call is cancelled once no caller is waiting for it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.metrics = {"leaders": 0, "coalesced": 0, "abandoned": 0}
+
+    def running(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            self.metrics["leaders"] += 1
+            task.add_done_callback(lambda _: self._finish(key, task))
+
+        self._waiters[key] += 1
+        try:
+            # Shield so a cancelled caller does not cancel the shared call
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise
+            if self._inflight.get(key) is task and self._waiters[key] == 1:
+                self.metrics["abandoned"] += 1
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        # Mark the outcome as retrieved in case nobody was waiting any more
+        if not task.cancelled():
+            task.exception()
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+
+class FileLease:
+    """
+    Cross-process lease on a key, held as an exclusively created lock file.
+    Leases older than `ttl` seconds are considered abandoned and broken.
+    """
+
+    def __init__(self, lock_dir: str, key: str, ttl: float = 60.0):
+        self.path = os.path.join(lock_dir, f"{key}.lock")
+        self.ttl = ttl
+        self.held = False
+        os.makedirs(lock_dir, exist_ok=True)
+
+    def _is_stale(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.ttl
+        except FileNotFoundError:
+            return True
+
+    def acquire(self) -> bool:
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode("utf-8"))
+                os.close(fd)
+                self.held = True
+                return True
+            except FileExistsError:
+                if not self._is_stale():
+                    return False
+                # Break an abandoned lease and try once more
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def is_active(self) -> bool:
+        return os.path.exists(self.path) and not self._is_stale()
+
+    def release(self):
+        if self.held:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.held = False
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Return the process-wide single-flight group for LLM calls.
+    """
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
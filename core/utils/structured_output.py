@@ -0,0 +1,402 @@
+import json
+import logging
+import typing
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from configs.config import LLM_STRUCTURED_OUTPUT_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# OpenAI-style JSON mode; Mistral and OpenRouter take it as is and the
+# Gemini provider maps it to the JSON response MIME type
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+CLOSERS = {"{": "}", "[": "]"}
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def structured_response_format() -> Optional[Dict]:
+    """
+    The `response_format` to request JSON completions with, or None when
+    structured output is disabled.
+    """
+    return dict(JSON_RESPONSE_FORMAT) if LLM_STRUCTURED_OUTPUT_ENABLED else None
+
+
+class IncrementalJSONParser:
+    """
+    Error-tolerant JSON object parser that can be fed a completion in chunks.
+
+    Text before the first `{` (prose, code fences) and after the matching
+    `}` is ignored. Comments (`//`, `/* */` and `#`), trailing commas, raw
+    newlines in strings, Python literals and unquoted words (kept as
+    strings, e.g. `1/2`) are repaired on the way. At any point, `partial()`
+    returns the object made of the values completed so far, with open
+    containers closed and unfinished strings, numbers and keys left out, so
+    consumers can act on early items while the rest is still arriving.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self._out: List[str] = []
+        # Open containers as [opening bracket, expecting a key]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        # None, "line" or "block"
+        self._comment: Optional[str] = None
+        self._comment_prev = ""
+        # A "/" that may start a comment, decided by the next character
+        self._slash = False
+        self._token = ""
+        # Output length and open containers after the last completed value
+        self._safe_len = 0
+        self._safe_stack: List[str] = []
+        self._partial_len = -1
+        self._partial: Any = None
+
+    def feed(self, chunk: str) -> Any:
+        """
+        Consume the next chunk of text and return the partial value.
+        """
+        for char in chunk:
+            if self.done:
+                break
+            self._consume(char)
+        return self.partial()
+
+    def _mark_safe(self):
+        self._safe_len = len(self._out)
+        self._safe_stack = [frame[0] for frame in self._stack]
+
+    def _finish_token(self):
+        token = PYTHON_LITERALS.get(self._token, self._token)
+        try:
+            json.loads(token)
+        except ValueError:
+            token = json.dumps(self._token)
+        self._out.extend(token)
+        self._token = ""
+        top = self._stack[-1]
+        if not (top[0] == "{" and top[1]):
+            self._mark_safe()
+
+    def _consume(self, char: str):
+        if not self.started:
+            if char == "{":
+                self.started = True
+                self._open(char)
+            return
+
+        if self._comment == "line":
+            if char == "\n":
+                self._comment = None
+            return
+        if self._comment == "block":
+            if self._comment_prev == "*" and char == "/":
+                self._comment = None
+            self._comment_prev = char
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._out.append(char)
+            elif char == "\\":
+                self._escape = True
+                self._out.append(char)
+            elif char == '"':
+                self._in_string = False
+                self._out.append(char)
+                if not self._string_is_key:
+                    self._mark_safe()
+            else:
+                self._out.append(STRING_ESCAPES.get(char, char))
+            return
+
+        if self._slash:
+            self._slash = False
+            if char in "/*":
+                if self._token:
+                    self._finish_token()
+                self._comment = "line" if char == "/" else "block"
+                self._comment_prev = ""
+                return
+            # A lone slash is part of a value, e.g. 1/2
+            self._token += "/"
+
+        if char == "/":
+            self._slash = True
+            return
+
+        if self._token:
+            if char.isspace() or char in ',:}]#"':
+                self._finish_token()
+            else:
+                self._token += char
+                return
+
+        if char == '"':
+            top = self._stack[-1]
+            self._in_string = True
+            self._string_is_key = top[0] == "{" and top[1]
+            self._out.append(char)
+        elif char in "{[":
+            self._open(char)
+        elif char in "}]":
+            self._close()
+        elif char == ":":
+            self._out.append(char)
+            self._stack[-1][1] = False
+        elif char == ",":
+            self._out.append(char)
+            if self._stack[-1][0] == "{":
+                self._stack[-1][1] = True
+        elif char == "#":
+            self._comment = "line"
+        elif not char.isspace():
+            self._token = char
+
+    def _open(self, char: str):
+        self._stack.append([char, char == "{"])
+        self._out.append(char)
+        self._mark_safe()
+
+    def _close(self):
+        self._strip_trailing_comma(self._out)
+        opening = self._stack.pop()[0]
+        # A mismatched closer closes the innermost container anyway
+        self._out.append(CLOSERS[opening])
+        self._mark_safe()
+        if not self._stack:
+            self.done = True
+
+    @staticmethod
+    def _strip_trailing_comma(out: List[str]):
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+
+    def partial(self) -> Any:
+        """
+        The value parsed so far, or None before the object starts.
+        """
+        if not self.started:
+            return None
+        if self._safe_len != self._partial_len:
+            out = self._out[: self._safe_len]
+            self._strip_trailing_comma(out)
+            out.extend(CLOSERS[opening] for opening in reversed(self._safe_stack))
+            try:
+                self._partial = json.loads("".join(out))
+                self._partial_len = self._safe_len
+            except json.JSONDecodeError:
+                # e.g. an unquoted word; keep the last good snapshot
+                pass
+        return self._partial
+
+    def close(self) -> Any:
+        """
+        Finish parsing and return the value. A truncated completion yields
+        the values completed before the cut.
+        """
+        if self._slash and not self._in_string:
+            self._token += "/"
+        if self._token and not self._in_string and self._stack:
+            self._finish_token()
+        if not self.started:
+            raise ValueError("No JSON object found in the response.")
+        if self.done:
+            try:
+                return json.loads("".join(self._out))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse JSON: {e}")
+        value = self.partial()
+        if value is None:
+            raise ValueError("Failed to parse JSON: no complete value in the response.")
+        return value
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parse the JSON object in a complete response, repairing what
+    `IncrementalJSONParser` can.
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    return parser.close()
+
+
+def _list_item_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    if typing.get_origin(annotation) in (list, List):
+        args = typing.get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0]
+    return None
+
+
+def salvage(value: Any, schema: Type[BaseModel]) -> Any:
+    """
+    Drop the list items of `value` that do not match their item schema, so
+    that one malformed step does not discard a whole follow-up plan.
+    """
+    if not isinstance(value, dict):
+        return value
+    value = dict(value)
+    for name, field in schema.model_fields.items():
+        item_model = _list_item_model(field.annotation)
+        if item_model is None or not isinstance(value.get(name), list):
+            continue
+        items = []
+        for item in value[name]:
+            try:
+                items.append(item_model.model_validate(item).model_dump())
+            except ValidationError:
+                continue
+        value[name] = items
+    return value
+
+
+def conforms(text: str, schema: Type[BaseModel]) -> bool:
+    """
+    Whether `StructuredOutputParser.parse` would recover a valid value from
+    a response, without recording metrics.
+    """
+    try:
+        schema.model_validate(salvage(parse_json(text), schema))
+    except ValueError:
+        # pydantic's ValidationError is a ValueError
+        return False
+    return True
+
+
+class StructuredOutputParser:
+    """
+    Validate LLM responses against a pydantic schema, counting how often
+    responses were valid as is, needed repairs, had invalid items dropped,
+    or could not be used.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, int]] = {}
+
+    def record(self, schema: Type[BaseModel], outcome: str):
+        counters = self.metrics.setdefault(
+            schema.__name__, {"valid": 0, "repaired": 0, "salvaged": 0, "failed": 0}
+        )
+        counters[outcome] += 1
+
+    def parse(self, text: str, schema: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Parse and validate a complete response; raises ValueError when no
+        valid value can be recovered.
+        """
+        try:
+            value = json.loads(text.strip())
+            outcome = "valid"
+        except (json.JSONDecodeError, AttributeError):
+            outcome = "repaired"
+            try:
+                value = parse_json(text)
+            except ValueError:
+                self.record(schema, "failed")
+                raise
+        return self.validate(value, schema, outcome)
+
+    def validate(
+        self, value: Any, schema: Type[BaseModel], outcome: str = "valid"
+    ) -> Dict[str, Any]:
+        try:
+            result = schema.model_validate(value).model_dump()
+        except ValidationError:
+            try:
+                result = schema.model_validate(salvage(value, schema)).model_dump()
+                outcome = "salvaged"
+            except ValidationError as e:
+                self.record(schema, "failed")
+                raise ValueError(f"Response does not match {schema.__name__}: {e}")
+        if outcome != "valid":
+            logger.info(f"Recovered {schema.__name__} from a malformed response ({outcome})")
+        self.record(schema, outcome)
+        return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.metrics
+
+
+async def stream_items(
+    chunks: AsyncIterator[str], schema: Type[BaseModel], field: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse a streamed completion for `schema` and yield the items of its
+    list `field` as soon as each one is complete and valid. An invalid
+    item is skipped once the next item has started. Raises ValueError when
+    the completion has no valid item.
+    """
+    item_model = _list_item_model(schema.model_fields[field].annotation)
+    parser = IncrementalJSONParser()
+    text: List[str] = []
+    next_index = 0
+    emitted = 0
+    skipped = 0
+
+    def completed_items(final: bool) -> List[Dict[str, Any]]:
+        nonlocal next_index, skipped
+        value = parser.partial()
+        items = value.get(field) if isinstance(value, dict) else None
+        ready = []
+        while isinstance(items, list) and next_index < len(items):
+            try:
+                ready.append(item_model.model_validate(items[next_index]).model_dump())
+            except ValidationError:
+                if next_index == len(items) - 1 and not final:
+                    # Possibly still being generated
+                    break
+                skipped += 1
+            next_index += 1
+        return ready
+
+    async for chunk in chunks:
+        text.append(chunk)
+        parser.feed(chunk)
+        for item in completed_items(final=False):
+            emitted += 1
+            yield item
+
+    try:
+        parser.close()
+    except ValueError:
+        pass
+    for item in completed_items(final=True):
+        emitted += 1
+        yield item
+
+    structured_output = get_structured_output_parser()
+    if not emitted:
+        structured_output.record(schema, "failed")
+        raise ValueError(f"Response has no valid {field}.")
+    if skipped:
+        structured_output.record(schema, "salvaged")
+    else:
+        try:
+            json.loads("".join(text).strip())
+            structured_output.record(schema, "valid")
+        except json.JSONDecodeError:
+            structured_output.record(schema, "repaired")
+
+
+_structured_output_parser: Optional[StructuredOutputParser] = None
+
+
+def get_structured_output_parser() -> StructuredOutputParser:
+    """
+    Return the process-wide structured output parser.
+    """
+    global _structured_output_parser
+    if _structured_output_parser is None:
+        _structured_output_parser = StructuredOutputParser()
+    return _structured_output_parser
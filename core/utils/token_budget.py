@@ -0,0 +1,267 @@
+import json
+import logging
+import math
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from configs.config import TOKEN_USAGE_LOG, TOKENIZER_ENCODING
+from models.model_registry import ModelRegistry
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Tokens added per chat message for role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+# Tokens kept free for the completion when fitting a prompt to a model
+DEFAULT_OUTPUT_RESERVE = 1024
+TRUNCATION_MARKER = "\n[...]\n"
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            # e.g. the encoding file cannot be downloaded
+            logger.warning(f"Falling back to approximate token counts: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: Any) -> int:
+    """
+    Count the tokens in `text` with tiktoken when it is installed, or
+    approximate them at about 4 characters per token otherwise. Counts are
+    an estimate for non-OpenAI models either way.
+    """
+    text = text if isinstance(text, str) else str(text)
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _message_text(message: Dict) -> Any:
+    # Chat-completion messages carry `content`, Gemini history carries `parts`
+    return message.get("content", message.get("parts", ""))
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    return sum(
+        count_tokens(_message_text(message)) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """
+    Shorten `text` to about `max_tokens` tokens, keeping its start and end.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    ratio = max_tokens / max(count_tokens(text), 1)
+    keep = max(int(len(text) * ratio) - len(TRUNCATION_MARKER), 0)
+    head = keep // 2
+    return text[:head] + TRUNCATION_MARKER + text[len(text) - (keep - head):]
+
+
+def prompt_limit(
+    model_name: Optional[str], output_reserve: int = DEFAULT_OUTPUT_RESERVE
+) -> Optional[int]:
+    """
+    Tokens available for the prompt of a model, from its context window in
+    `ModelRegistry`; None if the model's window is unknown.
+    """
+    context_window = ModelRegistry.MODELS.get(model_name, {}).get("context_window")
+    if not context_window:
+        return None
+    return max(context_window - output_reserve, 0)
+
+
+def fit_messages(messages: List[Dict], max_tokens: int) -> Tuple[List[Dict], int]:
+    """
+    Trim chat-completion messages to `max_tokens`.
+
+    System messages and the last message are always kept. The oldest other
+    messages are dropped first; if that is not enough, the longest
+    remaining messages are truncated in the middle. Returns the messages
+    to send and their token count.
+    """
+    total = count_message_tokens(messages)
+    if total <= max_tokens:
+        return messages, total
+
+    kept = list(messages)
+    droppable = [i for i, m in enumerate(kept[:-1]) if m.get("role") != "system"]
+    dropped = set()
+    for index in droppable:
+        if total <= max_tokens:
+            break
+        total -= count_message_tokens([kept[index]])
+        dropped.add(index)
+    kept = [m for i, m in enumerate(kept) if i not in dropped]
+
+    for _ in range(len(kept) * 2):
+        if total <= max_tokens:
+            break
+        longest = max(range(len(kept)), key=lambda i: count_tokens(_message_text(kept[i])))
+        content = str(_message_text(kept[longest]))
+        size = count_tokens(content)
+        target = max(size - (total - max_tokens), 0)
+        if target >= size:
+            break
+        kept[longest] = dict(kept[longest], content=truncate_text(content, target))
+        total = count_message_tokens(kept)
+    return kept, total
+
+
+def fit_history(history: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Keep the most recent Gemini chat history entries that fit in
+    `max_tokens`. The kept history always starts with a user turn.
+    """
+    kept = []
+    total = 0
+    for entry in reversed(history):
+        size = count_message_tokens([entry])
+        if total + size > max_tokens:
+            break
+        kept.append(entry)
+        total += size
+    kept.reverse()
+    while kept and kept[0].get("role") != "user":
+        kept.pop(0)
+    return kept
+
+
+def _terms(text: str) -> set:
+    return {term for term in re.findall(r"\w+", text.lower()) if len(term) > 2}
+
+
+class IndexedChunk:
+    """
+    A document chunk with its token count and search terms, computed once
+    when the document is loaded.
+    """
+
+    __slots__ = ("text", "tokens", "terms")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = count_tokens(text)
+        self.terms = frozenset(_terms(text))
+
+
+def index_chunks(chunks: List[str]) -> List[IndexedChunk]:
+    return [IndexedChunk(chunk) for chunk in chunks]
+
+
+def fit_chunks(
+    chunks: List[IndexedChunk], query: str, max_tokens: int
+) -> Tuple[List[str], int, int]:
+    """
+    Select document chunks for a question within `max_tokens`.
+
+    Chunks are ranked by how many of the question's terms they contain and
+    taken best first until the budget is spent; the selected chunks keep
+    their original order. Returns the text of the selected chunks, their
+    token count and the token count of all chunks.
+    """
+    query_terms = _terms(query)
+    ranked = sorted(
+        range(len(chunks)),
+        key=lambda i: (-len(query_terms & chunks[i].terms), i),
+    )
+    selected = []
+    total = 0
+    for index in ranked:
+        if total + chunks[index].tokens > max_tokens:
+            continue
+        selected.append(index)
+        total += chunks[index].tokens
+    return (
+        [chunks[i].text for i in sorted(selected)],
+        total,
+        sum(chunk.tokens for chunk in chunks),
+    )
+
+
+class TokenUsageRecorder:
+    """
+    Aggregate prompt token counts per source (prompt type or flow), and
+    optionally append one JSON line per request to `log_path` for capacity
+    planning.
+    """
+
+    def __init__(self, log_path: Optional[str] = None):
+        self.log_path = log_path
+        self.metrics: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        source: str,
+        model: Optional[str],
+        prompt_tokens: int,
+        original_tokens: Optional[int] = None,
+    ):
+        original_tokens = original_tokens if original_tokens is not None else prompt_tokens
+        counters = self.metrics.setdefault(
+            source or "default",
+            {
+                "requests": 0,
+                "prompt_tokens": 0,
+                "max_prompt_tokens": 0,
+                "trimmed": 0,
+                "tokens_trimmed": 0,
+            },
+        )
+        counters["requests"] += 1
+        counters["prompt_tokens"] += prompt_tokens
+        counters["max_prompt_tokens"] = max(counters["max_prompt_tokens"], prompt_tokens)
+        if original_tokens > prompt_tokens:
+            counters["trimmed"] += 1
+            counters["tokens_trimmed"] += original_tokens - prompt_tokens
+
+        if self.log_path:
+            record = {
+                "timestamp": time.time(),
+                "source": source,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "original_tokens": original_tokens,
+            }
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write token usage record: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "tokenizer": "tiktoken" if _get_encoding() is not None else "approximate",
+            "by_source": self.metrics,
+        }
+
+
+_token_usage: Optional[TokenUsageRecorder] = None
+
+
+def get_token_usage() -> TokenUsageRecorder:
+    """
+    Return the process-wide token usage recorder.
+    """
+    global _token_usage
+    if _token_usage is None:
+        _token_usage = TokenUsageRecorder(log_path=TOKEN_USAGE_LOG or None)
+    return _token_usage
@@ -2,18 +2,22 @@ from dal.mongodb_dal import MongoDBDAL
 from dal.user_dal import UserDAL
 from dal.health_dal import HealthDAL
 from dal.conversation_dal import ConversationDAL
+from dal.tutor_session_dal import TutorSessionDAL
 
 # Create instances of DALs for use throughout the application
 user_dal = UserDAL()
 health_dal = HealthDAL()
 conversation_dal = ConversationDAL()
+tutor_session_dal = TutorSessionDAL()
 
 __all__ = [
     "MongoDBDAL",
     "UserDAL",
     "HealthDAL",
     "ConversationDAL",
+    "TutorSessionDAL",
     "user_dal",
     "health_dal",
     "conversation_dal",
+    "tutor_session_dal",
 ] 
\ No newline at end of file
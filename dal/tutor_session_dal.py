@@ -0,0 +1,115 @@
+from dal.mongodb_dal import MongoDBDAL
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+class TutorSessionDAL(MongoDBDAL):
+    """Data Access Layer for tutor_sessions collection"""
+
+    def __init__(self):
+        super().__init__("tutor_sessions")
+        self._indexes_ready = False
+
+    async def setup_indexes(self):
+        """Setup required indexes for the tutor_sessions collection"""
+        if not self._indexes_ready:
+            await self.create_index([("session_id", 1)], unique=True)
+            await self.create_index([("last_active", 1)])
+            self._indexes_ready = True
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Find a tutor session by its session ID"""
+        try:
+            return self.collection.find_one({"session_id": session_id}, {"_id": 0})
+        except OperationFailure as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database operation failed: {str(e)}"
+            )
+        except PyMongoError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database error while retrieving tutor session: {str(e)}"
+            )
+
+    async def get_session_version(self, session_id: str) -> Optional[int]:
+        """Return the version of a tutor session, or None if it does not exist"""
+        documents = await self.find_all_filtered({"session_id": session_id}, {"version": 1})
+        return documents[0].get("version", 1) if documents else None
+
+    async def get_idle_session_ids(self, idle_before: float) -> List[str]:
+        """Find the IDs of tutor sessions not active since `idle_before`"""
+        filter_dict = {
+            "$or": [
+                {"last_active": {"$lt": idle_before}},
+                {"last_active": {"$exists": False}},
+            ]
+        }
+        documents = await self.find_all_filtered(filter_dict, {"session_id": 1})
+        return [document["session_id"] for document in documents]
+
+    async def create_session(self, session_id: str, data: Dict[str, Any]) -> bool:
+        """
+        Insert a new tutor session at version 1.
+        Returns False if a session with this ID already exists.
+        """
+        try:
+            # Ensure the unique session_id index exists
+            await self.setup_indexes()
+
+            document = dict(data)
+            document["session_id"] = session_id
+            document["version"] = 1
+            self.collection.insert_one(document)
+            return True
+        except DuplicateKeyError:
+            return False
+        except OperationFailure as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database operation failed: {str(e)}"
+            )
+        except PyMongoError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database error while creating tutor session: {str(e)}"
+            )
+
+    async def compare_and_swap(
+        self,
+        session_id: str,
+        expected_version: int,
+        set_fields: Dict[str, Any],
+        appended: Dict[str, List[Any]],
+        unset: List[str],
+    ) -> bool:
+        """
+        Apply a partial update only if the stored version still matches
+        `expected_version`, bumping the version by one.
+        Returns False if another writer updated the session first.
+        """
+        update = {"$set": dict(set_fields, version=expected_version + 1)}
+        if appended:
+            update["$push"] = {key: {"$each": items} for key, items in appended.items()}
+        if unset:
+            update["$unset"] = {key: "" for key in unset}
+
+        try:
+            result = self.collection.update_one(
+                {"session_id": session_id, "version": expected_version}, update
+            )
+            return result.matched_count == 1
+        except OperationFailure as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database operation failed: {str(e)}"
+            )
+        except PyMongoError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Database error while updating tutor session: {str(e)}"
+            )
+
+    async def delete_session(self, session_id: str) -> Dict[str, Any]:
+        """Delete a tutor session by its session ID"""
+        return await self.delete_many({"session_id": session_id})
@@ -9,7 +9,11 @@ from controllers.cached_augmented_generation_controller import router as cag_rou
 from controllers.user_controller import router as user_router
 from controllers.conversation_controller import router as conversation_router
 from controllers.health_controller import router as health_router
+from controllers.cluster_controller import router as cluster_router
 from configs.mongo_config import mongodb, setup_legacy_clients
+from core.llm_services.llm_factory import LLMFactory
+from core.prompt.prompt_registry import get_prompt_registry
+from core.session.store_factory import close_session_store, start_session_background_tasks
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,10 +47,19 @@ async def startup_db_client():
     else:
         logger.warning("Failed to initialize MongoDB connection pool. Some features may not work properly.")
 
+    # Open the session store, then schedule expiry of idle tutor sessions and
+    # session ring membership checks
+    start_session_background_tasks()
+
+    # Load and validate scenario instructions before the first chat request
+    get_prompt_registry().load()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close the database connection on application shutdown"""
     logger.info("Application shutting down...")
+    await close_session_store()
+    await LLMFactory.close_clients()
     mongodb.close()
     logger.info("Closed all connections")
 
@@ -69,6 +82,8 @@ app.include_router(
 
 app.include_router(health_router, prefix="/api/v1/health", tags=["Health"])
 
+app.include_router(cluster_router, prefix="/api/v1/cluster", tags=["Cluster"])
+
 
 @app.get("/")
 def root():
@@ -1,26 +1,147 @@
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from configs.config import LLM_LATENCY_WINDOW
+
+
 class ModelRegistry:
     """
     Registry for multiple models and their configurations.
+
+    `rpm` and `tpm` are the provider's requests-per-minute and
+    tokens-per-minute limits for the model; None means unlimited.
+    `latency_budget` is the number of seconds after which a call is hedged
+    to the first of its `equivalents` (other registry entries that can
+    answer the same prompts). `context_window` is in tokens and prices are
+    in USD per 1,000 tokens.
+
+    Alongside the static configuration, the registry keeps live statistics
+    per model (latency percentiles, error rate, token usage) updated from
+    real calls through `record_call`.
     """
 
     MODELS = {
         "gemini": {
             "name": "google/gemini-2.0-flash-exp:free",
+            "provider": "openrouter",
+            "rpm": 20,
+            "tpm": None,
+            "latency_budget": 8.0,
+            "equivalents": ["learnlm", "mistral-7b"],
+            "supports_tools": False,
+            "context_window": 1048576,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
         },
         "mistral-7b": {
             "name": "mistralai/mistral-7b-instruct:free",
+            "provider": "openrouter",
+            "rpm": 20,
+            "tpm": None,
+            "latency_budget": 8.0,
+            "equivalents": ["phi3-medium", "gemini"],
+            "supports_tools": False,
+            "context_window": 32768,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
         },
         "phi3-mini": {
             "name": "microsoft/phi-3-mini-128k-instruct:free",
+            "provider": "openrouter",
+            "rpm": 20,
+            "tpm": None,
+            "latency_budget": 6.0,
+            "equivalents": ["phi3-medium", "mistral-7b"],
+            "supports_tools": False,
+            "context_window": 128000,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
         },
         "phi3-medium": {
             "name": "microsoft/phi-3-medium-128k-instruct:free",
+            "provider": "openrouter",
+            "rpm": 20,
+            "tpm": None,
+            "latency_budget": 8.0,
+            "equivalents": ["phi3-mini", "mistral-7b"],
+            "supports_tools": False,
+            "context_window": 128000,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
         },
         "learnlm": {
             "name": "google/learnlm-1.5-pro-experimental:free",
+            "provider": "openrouter",
+            "rpm": 20,
+            "tpm": None,
+            "latency_budget": 10.0,
+            "equivalents": ["gemini"],
+            "supports_tools": False,
+            "context_window": 32768,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
+        },
+        "mistral-large-latest": {
+            "name": "mistral-large-latest",
+            "provider": "mistral",
+            "rpm": 60,
+            "tpm": 500000,
+            "latency_budget": 10.0,
+            "equivalents": ["learnlm-1.5-pro-experimental"],
+            "supports_tools": True,
+            "context_window": 131072,
+            "price_per_1k_input": 0.002,
+            "price_per_1k_output": 0.006,
         },
+        "learnlm-1.5-pro-experimental": {
+            "name": "learnlm-1.5-pro-experimental",
+            "provider": "gemini",
+            "rpm": 15,
+            "tpm": 1000000,
+            "latency_budget": 10.0,
+            "equivalents": ["mistral-large-latest"],
+            "supports_tools": False,
+            "context_window": 32768,
+            "price_per_1k_input": 0.0,
+            "price_per_1k_output": 0.0,
+        },
+        "gemini-1.5-flash": {
+            "name": "gemini-1.5-flash",
+            "provider": "gemini",
+            "rpm": 2000,
+            "tpm": 4000000,
+            "latency_budget": 10.0,
+            "equivalents": [],
+            "supports_tools": False,
+            "context_window": 1048576,
+            "price_per_1k_input": 0.000075,
+            "price_per_1k_output": 0.0003,
+        },
+    }
+
+    # Candidate models per pipeline task (prompt type), best quality first
+    TASK_MODELS = {
+        "followup": ["gemini", "learnlm", "mistral-7b", "mistral-large-latest"],
+        "tutor_question": ["phi3-mini", "phi3-medium", "mistral-7b", "gemini"],
+        "check_answer": ["mistral-7b", "phi3-medium", "gemini", "mistral-large-latest"],
+        "tutor_guidance": ["phi3-mini", "phi3-medium", "mistral-7b", "gemini"],
+        "evaluate_answer": ["mistral-7b", "phi3-medium", "gemini", "mistral-large-latest"],
+        # Larger models for low-confidence grading verdicts
+        "check_answer_escalated": ["mistral-large-latest", "gemini-1.5-flash", "gemini"],
+        "evaluate_answer_escalated": ["mistral-large-latest", "gemini-1.5-flash", "gemini"],
+    }
+
+    # Account-wide limits shared by all models of a provider
+    PROVIDER_LIMITS = {
+        "openrouter": {"rpm": 200, "tpm": None},
+        "mistral": {"rpm": 300, "tpm": 2000000},
+        "gemini": {"rpm": 60, "tpm": 4000000},
     }
 
+    # Rolling live statistics per model, see `record_call`
+    _stats: Dict[str, Dict[str, Any]] = {}
+
     @classmethod
     def get_model_config(cls, model_name: str) -> dict:
         """
@@ -29,3 +150,133 @@ class ModelRegistry:
         if model_name not in cls.MODELS:
             raise ValueError(f"Model '{model_name}' not found in the registry.")
         return cls.MODELS[model_name]
+
+    @classmethod
+    def get_equivalents(cls, model_name: str) -> list:
+        """
+        Retrieve the registry names of the models equivalent to a model.
+        """
+        return cls.MODELS.get(model_name, {}).get("equivalents", [])
+
+    @classmethod
+    def get_rate_limits(cls, provider: str, model_name: str) -> dict:
+        """
+        Retrieve the per-model and per-provider rate limits for a call.
+        Unknown models are only subject to the provider limits.
+        """
+        model = cls.MODELS.get(model_name, {})
+        provider_limits = cls.PROVIDER_LIMITS.get(provider, {})
+        return {
+            "model_rpm": model.get("rpm"),
+            "model_tpm": model.get("tpm"),
+            "provider_rpm": provider_limits.get("rpm"),
+            "provider_tpm": provider_limits.get("tpm"),
+        }
+
+    @classmethod
+    def _model_stats(cls, model_name: str) -> Dict[str, Any]:
+        if model_name not in cls._stats:
+            cls._stats[model_name] = {
+                "latencies": deque(maxlen=LLM_LATENCY_WINDOW),
+                "outcomes": deque(maxlen=LLM_LATENCY_WINDOW),
+                "calls": 0,
+                "errors": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "last_call_at": None,
+            }
+        return cls._stats[model_name]
+
+    @classmethod
+    def record_call(
+        cls,
+        model_name: str,
+        latency: Optional[float],
+        success: bool,
+        usage: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Record the outcome of a provider call. Latency is only recorded for
+        successful calls.
+        """
+        stats = cls._model_stats(model_name)
+        stats["calls"] += 1
+        stats["outcomes"].append(success)
+        stats["last_call_at"] = time.time()
+        if not success:
+            stats["errors"] += 1
+            return
+        if latency is not None:
+            stats["latencies"].append(latency)
+        if usage:
+            stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+            stats["completion_tokens"] += usage.get("completion_tokens") or 0
+
+    @classmethod
+    def latency_samples(cls, model_name: str) -> int:
+        return len(cls._stats.get(model_name, {}).get("latencies", ()))
+
+    @classmethod
+    def latency_percentile(cls, model_name: str, pct: float = 95) -> Optional[float]:
+        """
+        Percentile of the model's recent successful call latencies, in seconds.
+        """
+        samples = cls._stats.get(model_name, {}).get("latencies")
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    @classmethod
+    def error_rate(cls, model_name: str) -> Optional[float]:
+        """
+        Share of the model's recent calls that failed.
+        """
+        outcomes = cls._stats.get(model_name, {}).get("outcomes")
+        if not outcomes:
+            return None
+        return outcomes.count(False) / len(outcomes)
+
+    @classmethod
+    def last_call_succeeded(cls, model_name: str) -> Optional[bool]:
+        outcomes = cls._stats.get(model_name, {}).get("outcomes")
+        return outcomes[-1] if outcomes else None
+
+    @classmethod
+    def estimate_cost(
+        cls, model_name: str, prompt_tokens: int, completion_tokens: int = 0
+    ) -> float:
+        """
+        Estimated price in USD of a call with the given token counts.
+        """
+        model = cls.MODELS.get(model_name, {})
+        return (
+            prompt_tokens * (model.get("price_per_1k_input") or 0.0)
+            + completion_tokens * (model.get("price_per_1k_output") or 0.0)
+        ) / 1000
+
+    @classmethod
+    def get_live_stats(cls) -> Dict[str, Dict[str, Any]]:
+        live = {}
+        for model_name, stats in cls._stats.items():
+            p50 = cls.latency_percentile(model_name, 50)
+            p95 = cls.latency_percentile(model_name, 95)
+            error_rate = cls.error_rate(model_name)
+            live[model_name] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "error_rate": round(error_rate, 4) if error_rate is not None else None,
+                "p50_seconds": round(p50, 4) if p50 is not None else None,
+                "p95_seconds": round(p95, 4) if p95 is not None else None,
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "cost_usd": round(
+                    cls.estimate_cost(
+                        model_name, stats["prompt_tokens"], stats["completion_tokens"]
+                    ),
+                    6,
+                ),
+                "last_call_at": stats["last_call_at"],
+            }
+        return live
@@ -0,0 +1,63 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class QuestionAnswer(BaseModel):
+    """
+    One step of a follow-up plan.
+    """
+
+    question: str = Field(min_length=1)
+    answer: str = Field(min_length=1)
+
+    @field_validator("answer", mode="before")
+    @classmethod
+    def stringify_answer(cls, value):
+        # Models often answer numeric steps with bare numbers
+        return str(value) if isinstance(value, (int, float)) else value
+
+
+class FollowUpPlan(BaseModel):
+    """
+    Follow-up questions and expected answers generated for a student
+    question.
+    """
+
+    questions_and_answers: List[QuestionAnswer] = Field(min_length=1)
+
+
+class CheckResult(BaseModel):
+    """
+    Verdict of the LLM answer checker.
+    """
+
+    result: Literal["correct", "incorrect"]
+    # The model's confidence in the verdict, from 0 to 1
+    confidence: Optional[float] = None
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def normalize_result(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def normalize_confidence(cls, value):
+        # Unusable confidences count as unknown rather than failing the verdict
+        try:
+            value = float(str(value).strip().rstrip("%"))
+        except (TypeError, ValueError):
+            return None
+        if 1 < value <= 100:
+            value /= 100
+        return value if 0 <= value <= 1 else None
+
+
+class AnswerEvaluation(CheckResult):
+    """
+    Verdict of the combined answer check, with guidance for incorrect
+    answers.
+    """
+
+    guidance: Optional[str] = None
@@ -1,12 +1,15 @@
 from deep_translator import GoogleTranslator
 from langchain_google_genai import ChatGoogleGenerativeAI
 import logging
-from configs.config import GEMINI_API_KEY
+from configs.config import GEMINI_API_KEY, LLM_PROVIDER_OVERRIDE
+from core.llm_services.llm_factory import LLMFactory
 
 logger = logging.getLogger(__name__)
 
+CAG_MODEL = "gemini-1.5-flash"
 
-def ask_question_to_gemini(context, question, language):
+
+async def ask_question_to_gemini(context, question, language):
     prompt = f"""
     Answer the question based on the following context:
     {context}
@@ -14,10 +17,16 @@ def ask_question_to_gemini(context, question, language):
     Question: {question}
     """
 
+    if LLM_PROVIDER_OVERRIDE == "fake":
+        # Load testing: no provider or translation calls
+        fake_llm = LLMFactory.get_llm("fake", model=CAG_MODEL)
+        result = await fake_llm.generate_completion([{"role": "user", "content": prompt}])
+        return result.text
+
     chat_llm = ChatGoogleGenerativeAI(
-        api_key=GEMINI_API_KEY, model="gemini-1.5-flash", temperature=0.7
+        api_key=GEMINI_API_KEY, model=CAG_MODEL, temperature=0.7
     )
-    result = chat_llm.invoke(prompt)
+    result = await chat_llm.ainvoke(prompt)
     response = (
         result.content
         if hasattr(result, "content")
@@ -1,5 +1,19 @@
 from typing import Dict, Any
 from dal import health_dal
+from core.session.store_factory import get_session_janitor, get_session_store
+from core.llm_services.llm_scheduler import get_llm_scheduler
+from core.llm_services.model_router import get_model_router
+from core.logic.plan_stream import get_plan_streamer
+from core.logic.speculation import get_turn_speculator
+from core.prompt.prompt_registry import get_prompt_registry
+from core.services.local_answer_checker import get_local_answer_checker
+from core.services.tiered_grader import get_tiered_grader
+from core.llm_services.resilience import get_resilience_manager
+from core.utils.response_cache import get_response_cache
+from core.utils.single_flight import get_single_flight
+from core.utils.structured_output import get_structured_output_parser
+from core.utils.token_budget import get_token_usage
+from models.model_registry import ModelRegistry
 
 class HealthService:
     """Service for health check operations"""
@@ -7,4 +21,35 @@ class HealthService:
     @staticmethod
     async def check_database_health() -> Dict[str, Any]:
         """Check the health of the database connection"""
-        return await health_dal.check_database_health() 
\ No newline at end of file
+        return await health_dal.check_database_health()
+
+    @staticmethod
+    async def get_session_metrics() -> Dict[str, Any]:
+        """Get tutor session store and janitor metrics"""
+        store = get_session_store()
+        metrics = {"janitor": get_session_janitor().metrics}
+        if hasattr(store, "get_stats"):
+            metrics["cache"] = store.get_stats()
+        return metrics
+
+    @staticmethod
+    async def get_llm_metrics() -> Dict[str, Any]:
+        """Get LLM call path metrics such as response cache hit rates"""
+        single_flight = get_single_flight()
+        router = get_model_router()
+        local_checker = get_local_answer_checker()
+        return {
+            "response_cache": get_response_cache().get_metrics(),
+            "coalescing": dict(single_flight.metrics, inflight=single_flight.inflight()),
+            "scheduler": get_llm_scheduler().get_stats(),
+            "resilience": get_resilience_manager().get_stats(),
+            "models": ModelRegistry.get_live_stats(),
+            "router": router.get_stats() if router else None,
+            "tokens": get_token_usage().get_metrics(),
+            "speculation": get_turn_speculator().get_stats(),
+            "plan_streaming": get_plan_streamer().get_stats(),
+            "local_grading": local_checker.metrics if local_checker else None,
+            "grading_escalation": get_tiered_grader().get_stats(),
+            "structured_output": get_structured_output_parser().get_metrics(),
+            "prompts": get_prompt_registry().get_stats(),
+        }
@@ -0,0 +1,65 @@
+import asyncio
+import copy
+import unittest
+
+from core.session.cached_session_store import CachedSessionStore
+from core.session.session_state import SessionChanges, SessionState, apply_record
+from core.session.session_store import SessionStore
+
+
+class GatedStore(SessionStore):
+    """
+    In-memory backend whose writes wait until `gate` is set.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.writing = asyncio.Event()
+
+    async def load(self, session_id):
+        if session_id not in self.data:
+            return None
+        session = SessionState(session_id, self.data[session_id], 1)
+        session.mark_clean()
+        return session
+
+    async def _write(self, session: SessionState, changes: SessionChanges) -> int:
+        # Serialized before awaiting, like the real backends
+        record = copy.deepcopy(changes.to_record())
+        self.writing.set()
+        await self.gate.wait()
+        stored = copy.deepcopy(self.data.get(session.session_id, {}))
+        apply_record(stored, record)
+        self.data[session.session_id] = stored
+        return session.version + 1
+
+
+class CachedSessionStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def test_save_during_flush_is_persisted(self):
+        backend = GatedStore()
+        store = CachedSessionStore(backend, flush_interval=3600)
+        session = store.create("s1")
+        session["turns"] = ["t1"]
+        await store.save(session)
+
+        backend.gate.clear()
+        flush = asyncio.ensure_future(store.flush())
+        await backend.writing.wait()
+        session["turns"].append("t2")
+        await store.save(session)
+        backend.gate.set()
+        await flush
+
+        self.assertEqual(backend.data["s1"]["turns"], ["t1"])
+        self.assertEqual(store.get_stats()["dirty"], 1)
+
+        await store.flush()
+        self.assertEqual(backend.data["s1"]["turns"], ["t1", "t2"])
+        self.assertEqual(store.get_stats()["dirty"], 0)
+        await store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from core.services.local_answer_checker import CORRECT, INCORRECT, LocalAnswerChecker
+
+
+class LocalAnswerCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.checker = LocalAnswerChecker()
+
+    def assertGrades(self, cases, expected_result):
+        for expected, answer in cases:
+            with self.subTest(expected=expected, answer=answer):
+                self.assertEqual(self.checker._check(expected, answer), expected_result)
+
+    def test_more_precise_answers_to_rounded_values_are_deferred(self):
+        self.assertGrades(
+            [("0.33", "1/3"), ("3.14", "3.14159"), ("3.14", "pi"), ("1.41", "sqrt(2)"), ("0.67", "2/3")],
+            None,
+        )
+
+    def test_articles_alone_are_compared(self):
+        self.assertGrades([("a", "the")], None)
+        self.assertGrades([("the cat", "cat")], CORRECT)
+
+    def test_clear_numeric_mismatches_are_incorrect(self):
+        self.assertGrades([("3.14", "3.15"), ("3", "4"), ("0.5", "0.25")], INCORRECT)
+
+
+if __name__ == "__main__":
+    unittest.main()